@@ -6,12 +6,11 @@ Usage: ng-make-contours <zarr> <jser>
 
 from PyReconstruct.modules.datatypes.series import Series
 
-from PyReconstruct.modules.backend.autoseg.conversions import getLabelsToObjectsData, importSection
+from PyReconstruct.modules.backend.autoseg.conversions import labelsToObjects
 
 from PyReconstruct.assets.scripts.contours_from_labels.utils import (
     get_zarr_groups,
     make_jser_copy,
-    parallel_import_sections,
     print_help,
     validate_input,
 )
@@ -30,13 +29,8 @@ if __name__ == "__main__":
     for g in get_zarr_groups(zarr_fp):
 
         print(f"Working on group {g}...")
-        
-        zg, secs, start = getLabelsToObjectsData(zarr_fp, g)
-        end = max(secs)
 
-        results = parallel_import_sections(
-            zg, g, start, end, series, num_workers=4
-        )
+        labelsToObjects(series, zarr_fp, g)
 
     ## Save and close series
     series.saveJser()
@@ -4,6 +4,7 @@
 
 import sys
 import os
+import time
 from pathlib import Path
 from datetime import datetime, timezone
 
@@ -35,7 +36,8 @@ from PyReconstruct.assets.scripts.create_ng_zarr.utils import (
     print_flush,
     flatten_list,
     get_sha1sum,
-    print_summary
+    print_summary,
+    print_throughput
 )
 
 
@@ -136,6 +138,12 @@ else:  # request only around group(s)
     if padding: padding *= img_mag  # convert to μm
     window, _ = groupsToVolume(series, groups, padding)
 
+write_kwargs = {
+    "compressor": args.compressor,
+    "compression_level": args.compression_level,
+    "max_processes": args.processes,
+}
+
 additional_attrs = {
     
         "filepath" : str(Path(jser_fp).absolute()),
@@ -145,10 +153,10 @@ additional_attrs = {
         
     }
 
-print_flush("Initializing pyqt...")
-
-if not QApplication.instance():
+## Raw images are rendered with NumPy/OpenCV; only labels need Qt painting
+if groups and not QApplication.instance():
 
+    print_flush("Initializing pyqt...")
     print_flush("Creating QApplication instance...")
     app = QApplication(sys.argv)
 
@@ -160,14 +168,17 @@ if not output_zarr:
 if not labels_only:
 
     ## Create "raw" image dataset
+    start_time = time.perf_counter()
     zarr_fp = seriesToZarr(
         series,
         sections,
         img_mag,
         window=window,
         data_fp=output_zarr,
-        other_attrs=additional_attrs
+        other_attrs=additional_attrs,
+        **write_kwargs
     )
+    print_throughput(zarr_fp, "raw", start_time)
 
 else:
 
@@ -192,6 +203,7 @@ if groups:
 
         section_diff = min(window_group[1]) - raw_section_bounds[0]
         
+        start_time = time.perf_counter()
         seriesToLabels(
             series,
             zarr_fp,
@@ -199,8 +211,10 @@ if groups:
             window=window_group,
             img_mag=img_mag,
             raw_window=window,
-            section_diff=section_diff
+            section_diff=section_diff,
+            **write_kwargs
         )
+        print_throughput(zarr_fp, f"labels_{group}", start_time)
 
 series.close()
 
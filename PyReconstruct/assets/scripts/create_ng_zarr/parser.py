@@ -87,6 +87,29 @@ def get_args ():
         help="Export only labels",
     )
 
+    parser.add_argument(
+        "--compressor",
+        type=str,
+        choices=["blosc", "blosc-zstd", "zstd", "none"],
+        default="blosc",
+        help="chunk compressor (default %(default)s)",
+    )
+
+    parser.add_argument(
+        "--compression_level",
+        type=int,
+        default=5,
+        help="compression level (default %(default)s)",
+    )
+
+    parser.add_argument(
+        "--processes",
+        "-j",
+        type=int,
+        default=None,
+        help="number of worker processes (default cpu count)",
+    )
+
     args = parser.parse_args()
 
     ## Optional toml config file
@@ -1,6 +1,10 @@
+import os
 import json
+import time
 import hashlib
 
+import zarr
+
 
 def print_flush(s: str):
     """Correct I/O buffering."""
@@ -8,6 +12,25 @@ def print_flush(s: str):
     print(s, flush=True)
 
 
+def print_throughput(zarr_fp, dataset_name, start_time):
+    """Print the size of a written dataset on disk and the write speed."""
+
+    seconds = max(time.perf_counter() - start_time, 1e-9)
+
+    ## Bytes written to disk (compressed chunks) and the uncompressed array size
+    disk_mb = sum(
+        os.path.getsize(os.path.join(root, f))
+        for root, _, files in os.walk(os.path.join(zarr_fp, dataset_name))
+        for f in files
+    ) / 1e6
+    array_mb = zarr.open(zarr_fp, "r")[dataset_name].nbytes / 1e6
+
+    print_flush(
+        f"Wrote {dataset_name}: {disk_mb:.1f} MB on disk ({array_mb:.1f} MB uncompressed) "
+        f"in {seconds:.1f} s ({disk_mb / seconds:.1f} MB/s)"
+    )
+
+
 def flatten_list(nested_list):
     """Recursively flatten lists to handle groups."""
 
@@ -0,0 +1,280 @@
+"""Headless batch processing of series from the command line.
+
+    PyReconstruct validate my_series.jser
+    PyReconstruct export csv my_series.jser -o out_dir --format parquet
+    PyReconstruct export meshes my_series.jser -o out_dir --groups dendrites
+    PyReconstruct export zarr my_series.jser --groups dendrites spines
+    PyReconstruct import labels my_series.jser labels.zarr
+    PyReconstruct dedupe my_series.jser --threshold 0.95
+    PyReconstruct smooth my_series.jser --objects d001 d002
+
+Each command opens the series through the Series API and, if it modified the
+series, saves the jser (in place or to --output). No Qt widget is created:
+progress is printed on the console (nothing with --quiet), and CPU-bound work
+is spread over worker processes (--processes).
+"""
+
+import os
+import sys
+import argparse
+
+
+commands = ("validate", "open", "export", "import", "dedupe", "smooth")
+
+
+def getParser() -> argparse.ArgumentParser:
+    """Get the parser for the batch commands."""
+    parser = argparse.ArgumentParser(
+        prog="PyReconstruct",
+        description="Process a series without opening the user interface.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("jser", type=str, help="filepath of the jser file")
+    common.add_argument("--quiet", "-q", action="store_true", help="do not report progress")
+    common.add_argument(
+        "--processes", "-p", type=int, default=None,
+        help="maximum number of worker processes (default cpu count)"
+    )
+
+    modifies = argparse.ArgumentParser(add_help=False)
+    modifies.add_argument(
+        "--output", "-o", type=str, default=None,
+        help="filepath of the jser to save (default overwrite the input)"
+    )
+
+    select = argparse.ArgumentParser(add_help=False)
+    select.add_argument("--objects", nargs="+", default=[], help="object names")
+    select.add_argument("--groups", nargs="+", default=[], help="object groups")
+
+    subparsers.add_parser(
+        "validate", aliases=["open"], parents=[common],
+        help="open a series and check its sections and traces"
+    )
+
+    export_parser = subparsers.add_parser("export", help="export series data")
+    export_sub = export_parser.add_subparsers(dest="export_type", required=True)
+
+    p = export_sub.add_parser("csv", parents=[common], help="export trace, object and z-trace data")
+    p.add_argument("--output", "-o", type=str, default=".", help="output directory")
+    p.add_argument("--format", "-f", choices=["csv", "parquet", "arrow"], default="csv")
+
+    p = export_sub.add_parser("meshes", parents=[common, select], help="export object meshes")
+    p.add_argument("--output", "-o", type=str, default=".", help="output directory")
+    p.add_argument("--type", "-t", type=str, default="obj", help="mesh file type (default %(default)s)")
+
+    p = export_sub.add_parser(
+        "zarr", add_help=False,
+        help="export images and labels to a neuroglancer zarr (see export zarr --help)"
+    )
+    p.add_argument("args", nargs=argparse.REMAINDER)
+
+    import_parser = subparsers.add_parser("import", help="import data into a series")
+    import_sub = import_parser.add_subparsers(dest="import_type", required=True)
+
+    p = import_sub.add_parser("labels", parents=[common, modifies], help="import zarr labels as objects")
+    p.add_argument("zarr", type=str, help="filepath of the zarr")
+    p.add_argument("--groups", nargs="+", default=None, help="label groups (default all labels_* groups)")
+
+    p = subparsers.add_parser("dedupe", parents=[common, modifies], help="delete duplicate traces")
+    p.add_argument("--threshold", "-t", type=float, default=0.95, help="overlap threshold (default %(default)s)")
+    p.add_argument("--include-locked", action="store_true", help="include locked objects")
+
+    p = subparsers.add_parser(
+        "smooth", parents=[common, modifies, select],
+        help="smooth the traces of objects (all objects if none are given)"
+    )
+
+    return parser
+
+
+def main(argv : list = None) -> int:
+    """Run a batch command.
+
+        Params:
+            argv (list): the command line arguments (without the program name)
+        Returns:
+            (int): the exit code
+    """
+    # never open a window (labels are rendered offscreen)
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    args = getParser().parse_args(argv)
+
+    if args.command == "export" and args.export_type == "zarr":
+        return exportZarr(args.args)
+
+    from PyReconstruct.modules.backend.threading import WorkerError
+    from PyReconstruct.modules.gui.utils import setProgressMode
+    setProgressMode("quiet" if args.quiet else "console")
+
+    if not os.path.isfile(args.jser):
+        print(f"File not found: {args.jser}")
+        return 1
+
+    series = openSeries(args.jser)
+    modifies = args.command in ("import", "dedupe", "smooth")
+    if modifies and series.leave_open:
+        print(f"{args.jser} is open in another window: close it before modifying it.")
+        return 1
+
+    try:
+        if args.command in ("validate", "open"):
+            return validate(series)
+        elif args.command == "export" and args.export_type == "csv":
+            return exportCSV(series, args.output, args.format)
+        elif args.command == "export" and args.export_type == "meshes":
+            return exportMeshes(series, getObjects(series, args), args.output, args.type)
+        elif args.command == "import":
+            importLabels(series, args.zarr, args.groups, args.processes)
+        elif args.command == "dedupe":
+            removed = series.deleteDuplicateTraces(
+                args.threshold,
+                args.include_locked,
+                max_processes=args.processes
+            )
+            n = sum(len(names) for names in removed.values())
+            print(f"Removed duplicates from {n} contour(s) on {len(removed)} section(s).")
+        elif args.command == "smooth":
+            smoothObjects(series, getObjects(series, args), args.processes)
+
+        series.saveJser(args.output)
+        print(f"Saved {args.output or series.jser_fp}")
+        return 0
+    except WorkerError as e:
+        print(e)
+        print(f"{args.jser} was not saved.")
+        return 1
+    finally:
+        series.close()
+
+
+def openSeries(jser_fp : str):
+    """Open a series from a jser file."""
+    from PyReconstruct.modules.datatypes import Series
+
+    series = Series.openJser(jser_fp)
+    series.jser_fp = jser_fp
+    return series
+
+
+def getObjects(series, args) -> list:
+    """Get the objects requested with --objects and --groups (all objects if neither)."""
+    if not args.objects and not args.groups:
+        return sorted(series.data["objects"].keys())
+
+    names = set(args.objects)
+    for group in args.groups:
+        names |= series.object_groups.getGroupObjects(group)
+    return sorted(n for n in names if n in series.data["objects"])
+
+
+def validate(series) -> int:
+    """Load every section of a series and check its traces.
+
+        Returns:
+            (int): 0 if no problems were found, 1 otherwise
+    """
+    from PyReconstruct.modules.gui.utils import getProgbar
+
+    problems = []
+    n_traces = 0
+    snums = sorted(series.sections.keys())
+    progbar = getProgbar("Validating sections...", cancel=False, maximum=len(snums))
+
+    for i, snum in enumerate(snums):
+        try:
+            section = series.loadSection(snum)
+        except Exception as e:
+            problems.append(f"section {snum}: could not be loaded ({e})")
+            continue
+        for name, contour in section.contours.items():
+            for index, trace in enumerate(contour):
+                n_traces += 1
+                n_points = len(trace.points)
+                if n_points < (3 if trace.closed else 2):
+                    problems.append(f"section {snum}: {name} trace {index} has {n_points} point(s)")
+        progbar.setValue(i + 1)
+
+    print(
+        f"{series.name}: {len(snums)} sections, {len(series.data['objects'])} objects, "
+        f"{n_traces} traces, {len(series.ztraces)} ztraces"
+    )
+    for problem in problems:
+        print(problem)
+
+    return 1 if problems else 0
+
+
+def exportCSV(series, output_dir : str, fmt : str) -> int:
+    """Export the trace, object and z-trace data."""
+    os.makedirs(output_dir, exist_ok=True)
+    for name, export in (
+        ("traces", series.data.exportTracesCSV),
+        ("objects", series.exportObjectsCSV),
+        ("ztraces", series.exportZtracesCSV)
+    ):
+        fp = os.path.join(output_dir, f"{series.code or series.name}_{name}.{fmt}")
+        export(fp)
+        print(f"Exported {fp}")
+    return 0
+
+
+def exportMeshes(series, obj_names : list, output_dir : str, mesh_type : str) -> int:
+    """Export the meshes of objects."""
+    from PyReconstruct.modules.backend.volume.export_volumes import export3DObjects
+
+    os.makedirs(output_dir, exist_ok=True)
+    export3DObjects(series, obj_names, output_dir, mesh_type, notify_user=False)
+    print(f"Exported {len(obj_names)} object(s) to {os.path.abspath(output_dir)}")
+    return 0
+
+
+def exportZarr(script_args : list) -> int:
+    """Run the neuroglancer zarr export with its own arguments."""
+    import runpy
+
+    from PyReconstruct.modules.constants import assets_dir
+    script = os.path.join(assets_dir, "scripts", "create_ng_zarr", "create_ng_zarr.py")
+
+    argv = sys.argv
+    sys.argv = ["PyReconstruct export zarr"] + list(script_args)
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        return e.code or 0
+    finally:
+        sys.argv = argv
+    return 0
+
+
+def importLabels(series, zarr_fp : str, groups : list = None, processes : int = None):
+    """Import the labels in a zarr as objects."""
+    from PyReconstruct.modules.backend.autoseg.conversions import labelsToObjects
+
+    if groups is None:
+        groups = sorted(
+            d for d in os.listdir(zarr_fp)
+            if d.startswith("labels") and os.path.isdir(os.path.join(zarr_fp, d))
+        )
+    for group in groups:
+        labelsToObjects(series, zarr_fp, group, max_processes=processes)
+        print(f"Imported {group}")
+
+
+def smoothObjects(series, obj_names : list, processes : int = None):
+    """Smooth the traces of objects, computing each section in a worker process.
+
+        Params:
+            series (Series): the series
+            obj_names (list): the names of the objects to smooth
+            processes (int): the maximum number of worker processes
+    """
+    skipped = series.smoothObject(obj_names, max_processes=processes)
+
+    for record in skipped:
+        print(
+            f"section {record['section']}: {record['name']} trace {record['index']} "
+            f"was not smoothed ({record['reason'].lower()})"
+        )
@@ -3,6 +3,10 @@ import subprocess
 import sys
 
 
+# kept in sync with PyReconstruct.batch.commands (not imported here to keep startup light)
+_batch_commands = ("validate", "open", "export", "import", "dedupe", "smooth")
+
+
 def _version_string():
     """Best-effort version string, without importing the heavy constants package."""
     try:
@@ -33,7 +37,15 @@ def _repo_info():
 
 def main():
 
-    parser = argparse.ArgumentParser(description='Open a jser file in PyReconstruct')
+    ## Headless batch commands (see PyReconstruct/batch.py)
+    if len(sys.argv) > 1 and sys.argv[1] in _batch_commands:
+        from PyReconstruct.batch import main as batch_main
+        sys.exit(batch_main(sys.argv[1:]))
+
+    parser = argparse.ArgumentParser(
+        description='Open a jser file in PyReconstruct',
+        epilog=f"batch commands (run without the interface): {', '.join(_batch_commands)} (see PyReconstruct <command> --help)"
+    )
 
     parser.add_argument('-f', '--filename', type=str, required=False, default=None, help='The file path for the jser')
     parser.add_argument('-u', '--update', action='store_true', help='Update PyReconstruct')
@@ -7,10 +7,19 @@ from typing import Union, List, Tuple
 
 import cv2
 import zarr
+from scipy import ndimage
+from skimage.draw import polygon
 
 from PyReconstruct.modules.datatypes import Series, Transform, Trace
-from PyReconstruct.modules.backend.view import SectionLayer
-from PyReconstruct.modules.backend.threading import ThreadPoolProgBar
+from PyReconstruct.modules.backend.view import (
+    SectionLayer,
+    getImageSource,
+    warpImageSource
+)
+from PyReconstruct.modules.backend.view.image_layer import readImageSource
+from PyReconstruct.modules.backend.view.trace_layer import hashName
+from PyReconstruct.modules.backend.threading import ProcessPoolProgBar
+from PyReconstruct.modules.gui.utils import getProgbar
 from PyReconstruct.modules.calc import reducePoints
 
 from .palette import DEFAULT_AUTOSEG_PALETTE, palette_color
@@ -245,8 +254,15 @@ def seriesToZarr(series : Series,
                  data_fp: str = None,
                  output_dir: str = None,
                  other_attrs: dict = None,
-                 chunk_size: tuple = (1, 256, 256)):
+                 chunk_size: tuple = (1, 256, 256),
+                 compressor: str = "blosc",
+                 compression_level: int = 5,
+                 max_processes: int = None):
     """Convert a series of images into a neuroglancer-compatible zarr.
+
+    Images are rendered and written by worker processes, each owning a
+    z-chunk-aligned block of sections written in chunk-aligned bands; only
+    this process writes metadata.
     
         Params:
             series (Series): the series to convert
@@ -256,9 +272,13 @@ def seriesToZarr(series : Series,
             data_fp (str): filename of output zarr
             output_dir (str): directory to store zarr
             other_attrs (dict): other infoformation to store in .zattrs
+            chunk_size (tuple): the zarr chunk shape (z, y, x)
+            compressor (str): the compressor name (see getCompressor)
+            compression_level (int): the compression level
+            max_processes (int): the maximum number of worker processes (cpu count if None)
 
         Returns:
-            the filepath for the zarr, the threadpool
+            the filepath for the zarr
     """
 
     ## Calculate field attributes
@@ -289,7 +309,8 @@ def seriesToZarr(series : Series,
         "raw",
         shape=shape,
         chunks=chunk_size,
-        dtype=np.uint8
+        dtype=np.uint8,
+        compressor=getCompressor(compressor, compression_level)
     )
 
     raw = data_zg["raw"]
@@ -324,21 +345,24 @@ def seriesToZarr(series : Series,
         for k, v in other_attrs.items():
             data_zg.attrs[k] = v
     
-    ## Create threadpool and interate through series
-    threadpool = ThreadPoolProgBar()
+    ## Create process pool and iterate through z-chunk-aligned blocks of sections
+    image_sources = [
+        getImageSource(series.loadSection(snum), series) for snum in sections
+    ]
+    processpool = ProcessPoolProgBar(max_processes)
     
-    for i, snum in enumerate(sections):
-        threadpool.createWorker(
-            exportSection,
-            data_zg,
-            snum,
-            series,
-            i,
+    for z_start, z_end in getChunkBlocks(len(sections), raw.chunks[0]):
+        processpool.createWorker(
+            exportSectionBlock,
+            data_fp,
+            z_start,
+            image_sources[z_start:z_end],
             window,
-            pixmap_dim
+            pixmap_dim,
+            name=f"sections {sections[z_start]}-{sections[z_end - 1]}"
         )
-        
-    threadpool.startAll("Converting series to zarr...")
+    
+    processpool.startAll("Converting series to zarr...")
 
     return data_fp
     
@@ -350,13 +374,24 @@ def seriesToLabels(series: Series,
                    img_mag: float = 0.00254,
                    chunk_size: tuple = (1, 256, 256),
                    raw_window: Union[List, None] = None,
-                   section_diff: int=0):
+                   section_diff: int=0,
+                   compressor: str = "blosc",
+                   compression_level: int = 5,
+                   max_processes: int = None):
     """Export contours as labels to an existing zarr.
+
+    Traces are gathered (and the series modified) in this process; worker
+    processes rasterize and write z-chunk-aligned blocks. The label lookup is
+    written once, by this process.
     
         Params:
             series (Series): the series
             data_fp (str): the filepath for the zarr
             group (str): the group to export as labels (None if retraining)
+            chunk_size (tuple): the zarr chunk shape (z, y, x)
+            compressor (str): the compressor name (see getCompressor)
+            compression_level (int): the compression level
+            max_processes (int): the maximum number of worker processes (cpu count if None)
     """
 
     # extract data from raw
@@ -414,7 +449,8 @@ def seriesToLabels(series: Series,
         dataset_name,
         shape=shape,
         chunks=chunk_size,
-        dtype=np.uint64
+        dtype=np.uint64,
+        compressor=getCompressor(compressor, compression_level)
     )
     
     data_zg[dataset_name].attrs["offset"] = offset
@@ -422,25 +458,43 @@ def seriesToLabels(series: Series,
     data_zg[dataset_name].attrs["axis_names"] = ["z", "y", "x"]
     data_zg[dataset_name].attrs["units"] = ["nm", "nm", "nm"]
 
-    # create threadpool
-    threadpool = ThreadPoolProgBar()
+    # gather the traces for each section as pixel polygons
+    progbar = getProgbar("Gathering contours...", cancel=False, maximum=len(sections))
+    section_labels = []
+    gt_lookup = {}
 
     for i, snum in enumerate(sections):
-        threadpool.createWorker(
-            exportTraces,
-            data_zg,
+        labels, sec_id_dict = getSectionLabels(
             snum,
             series,
             group_or_tag,
             is_group,
-            i,
             window,
             pixmap_dim,
             del_group,
             alignment[str(snum)]
         )
+        section_labels.append(labels)
+        gt_lookup.update(sec_id_dict)
+        progbar.setValue(i + 1)
+
+    # create process pool and iterate through z-chunk-aligned blocks of sections
+    processpool = ProcessPoolProgBar(max_processes)
+
+    for z_start, z_end in getChunkBlocks(len(sections), chunk_size[0]):
+        processpool.createWorker(
+            exportLabelsBlock,
+            data_fp,
+            dataset_name,
+            z_start,
+            section_labels[z_start:z_end],
+            pixmap_dim,
+            name=f"sections {sections[z_start]}-{sections[z_end - 1]}"
+        )
 
-    threadpool.startAll("Converting contours to zarr...")
+    processpool.startAll("Converting contours to zarr...")
+
+    data_zg[dataset_name].attrs["gt_lookup"] = gt_lookup
 
     if del_group:
         series.object_groups.removeGroup(del_group)
@@ -464,48 +518,55 @@ def getLabelsToObjectsData(data_fp: str, group: str) -> tuple:
     return data_zg, sections, section_start
 
 
-def labelsToObjects(series : Series, data_fp : str, group : str, ids: list = None) -> None:
+def labelsToObjects(series : Series, data_fp : str, group : str, ids: list = None, max_processes: int = None) -> None:
     """Convert labels in a zarr file to objects in a series.
+
+    Label extraction runs in a process pool; the series is only modified by
+    the main process, one section at a time in section order.
     
         Params:
             series (Series): the series to import zarr data into
-            data_zg (str): the filepath for the zarr group
+            data_fp (str): the filepath for the zarr group
             group (str): the name of the group with labels of interest
             ids (list): the labels to import (will import all if None)
-        Returns:
-            the threadpool
+            max_processes (int): the maximum number of worker processes (cpu count if None)
     """
 
     data_zg, sections, section_start = getLabelsToObjectsData(data_fp, group)
 
-    ## Create threadpool and iterate across sections
+    ## Compute traces in worker processes; apply them here, in section order
     setDT()
-    threadpool = ThreadPoolProgBar()
+    processpool = ProcessPoolProgBar(max_processes)
 
     for snum in range(section_start, max(sections) + 1):
-        threadpool.createWorker(
-            importSection,
-            data_zg,
+        processpool.createWorker(
+            getSectionTraces,
+            data_fp,
             group,
             snum,
-            series,
-            ids
+            ids,
+            name=f"section {snum}"
         )
 
-    threadpool.startAll(f"Converting {group} to contours...")
+    processpool.startAll(
+        f"Converting {group} to contours...",
+        result_fn=lambda section_traces: applySectionTraces(series, group, section_traces)
+    )
 
 
-def getExteriors(mask : np.ndarray) -> list[np.ndarray]:
+def getExteriors(mask : np.ndarray, offset : tuple = (0, 0)) -> list[np.ndarray]:
     """Get exteriors from a mask.
     
         Params:
             mask (np.ndarray): the mask to extract exteriors from
+            offset (tuple): the (x, y) pixel offset of the mask within its full image
         Returns:
             (list[np.ndarray]): the list of exteriors
     """
     cv_detected, hierarchy = cv2.findContours(
         mask.astype(np.uint8),
-        cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE
+        cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE,
+        offset=tuple(int(o) for o in offset)
     )
     
     exteriors = []
@@ -522,6 +583,49 @@ def getExteriors(mask : np.ndarray) -> list[np.ndarray]:
     return exteriors
 
 
+def getLabelExteriors(arr : np.ndarray, ids : list = None) -> list[tuple]:
+    """Get the exteriors for every label in a label array in a single pass.
+
+    Each label's bounding box is found once (scipy.ndimage.find_objects) and
+    contours are only extracted from that crop, so the cost scales with the
+    number of labeled pixels rather than labels x image size.
+    
+        Params:
+            arr (np.ndarray): the 2D label array
+            ids (list): the labels to include (all non-zero labels if None)
+        Returns:
+            (list[tuple]): (label id, list of exteriors) for each label found
+    """
+    label_ids, compact = np.unique(arr, return_inverse=True)
+    # shift by one so that find_objects does not treat the first label as background
+    compact = compact.reshape(arr.shape) + 1
+    boxes = ndimage.find_objects(compact)
+
+    index = {label_id: i for i, label_id in enumerate(label_ids)}
+    if ids is None:
+        ids = label_ids
+
+    label_exteriors = []
+
+    for id in ids:
+
+        if id == 0 or id not in index:
+            continue
+
+        i = index[id]
+        box = boxes[i]
+        if box is None:
+            continue
+
+        ys, xs = box
+        mask = compact[box] == i + 1
+        exteriors = getExteriors(mask, offset=(xs.start, ys.start))
+
+        label_exteriors.append((id, exteriors))
+
+    return label_exteriors
+
+
 def exterior_to_points(ext: list[np.ndarray], offset, resolution, raw, window, tform, mag):
     """Convert exterior to trace points."""
 
@@ -548,61 +652,114 @@ def exterior_to_points(ext: list[np.ndarray], offset, resolution, raw, window, t
     return trace_points
 
 
-def exportSection(data_zg,
-                  snum : int,
-                  series : Series,
-                  z : int,
-                  window : list,
-                  pixmap_dim : tuple):
-    """Export the raw data for a single section.
+def getCompressor(compressor : str = "blosc", level : int = 5):
+    """Get a numcodecs compressor for zarr datasets.
     
         Params:
-            data_zg: the zarr group
-            snum (int): the section number
-            series (Series): the series
-            z (int): the z-level of the section in the zarr
-            window (list): the frame for the raw export
-            pixmap_dim (tuple): the w and h in pixels for the arr output
+            compressor (str): "blosc" (lz4), "blosc-zstd", "zstd", or "none" (or a numcodecs codec)
+            level (int): the compression level
+        Returns:
+            the numcodecs codec (None for no compression)
     """
-    # print(f"Section {snum} exporting started")
-    section = series.loadSection(snum)
-    slayer = SectionLayer(section, series)
+    from numcodecs import Blosc, Zstd
+
+    if compressor is None or compressor == "none":
+        return None
+    elif not isinstance(compressor, str):
+        return compressor
+    elif compressor == "blosc":
+        return Blosc(cname="lz4", clevel=level, shuffle=Blosc.SHUFFLE)
+    elif compressor == "blosc-zstd":
+        return Blosc(cname="zstd", clevel=level, shuffle=Blosc.BITSHUFFLE)
+    elif compressor == "zstd":
+        return Zstd(level=level)
+    else:
+        raise ValueError(f"Unknown compressor: {compressor}")
 
-    arr = slayer.generateImageArray(
-        pixmap_dim, 
-        window,
-        bc=False
-    )
 
-    data_zg["raw"][z] = arr
+def getChunkBlocks(n : int, chunk : int) -> list[tuple]:
+    """Split a z range into chunk-aligned (start, end) blocks."""
 
+    return [(z, min(z + chunk, n)) for z in range(0, n, chunk)]
 
-def exportTraces(data_zg,
-                 snum : int,
-                 series : Series,
-                 group_or_tag : str,
-                 is_group : bool,
-                 z : int,
-                 window : list,
-                 pixmap_dim : tuple,
-                 del_group : str = None,
-                 tform_list=None):
-    """Export the traces as labels for a single section.
+
+def getBandWindow(window : list, pixmap_dim : tuple, y0 : int, y1 : int) -> tuple:
+    """Get the field window and pixel dimensions for a band of rows in an output array.
+    
+        Params:
+            window (list): the x, y, w, and h of the full field window
+            pixmap_dim (tuple): the w and h of the full array
+            y0 (int): the first row of the band (from the top)
+            y1 (int): the row after the last row of the band
+        Returns:
+            (tuple): the band window and the band pixmap_dim
+    """
+    wx, wy, ww, wh = tuple(window)
+    pmw, pmh = tuple(pixmap_dim)
+    row_h = wh / pmh
+
+    return [wx, wy + wh - y1 * row_h, ww, (y1 - y0) * row_h], (pmw, y1 - y0)
+
+
+def exportSectionBlock(data_fp : str,
+                       z_start : int,
+                       image_sources : list,
+                       window : list,
+                       pixmap_dim : tuple):
+    """Export the raw data for a z-chunk-aligned block of sections (worker process).
+
+    Each band of chunk rows is rendered for every section in the block and
+    written at once, so every chunk is written whole by a single process.
+    
+        Params:
+            data_fp (str): the filepath for the zarr
+            z_start (int): the z-level of the first section in the zarr
+            image_sources (list): the image source (see getImageSource) for each section
+            window (list): the frame for the raw export
+            pixmap_dim (tuple): the w and h in pixels for the arr output
+    """
+    raw = zarr.open(data_fp, "r+")["raw"]
+    pmw, pmh = tuple(pixmap_dim)
+    band_h = raw.chunks[1]
+
+    images = [readImageSource(source, pixmap_dim, window) for source in image_sources]
+
+    for y0 in range(0, pmh, band_h):
+        y1 = min(y0 + band_h, pmh)
+        band_window, band_dim = getBandWindow(window, pixmap_dim, y0, y1)
+        band = np.stack([
+            warpImageSource(source, band_dim, band_window, image)
+            for source, image in zip(image_sources, images)
+        ])
+        raw[z_start:z_start + len(image_sources), y0:y1, :] = band
+
+
+def getSectionLabels(snum : int,
+                     series : Series,
+                     group_or_tag : str,
+                     is_group : bool,
+                     window : list,
+                     pixmap_dim : tuple,
+                     del_group : str = None,
+                     tform_list=None):
+    """Gather the traces to export as labels for a single section.
     
         Params:
-            data_zg: the zarr group
             snum (int): the section number
             series (Series): the series
             group_or_tag (str): the group or tag to include as labels
             is_group (bool): True if the previous entry is a group, False if tag
-            z (int): the z position of the section in the zarr
             window (list): the frame for the raw export
             pixmap_dim (tuple): the w and h in pixels for the arr output
             del_group (str): the group to delete
             tform_list (list): the transform to apply to the traces
+        Returns:
+            (tuple): list of (label, x pixel coords, y pixel coords) and the name : label lookup
     """
     section = series.loadSection(snum)
     slayer = SectionLayer(section, series, load_image_layer=False)
+    slayer.series.window = window
+    slayer.pixmap_dim = pixmap_dim
     if tform_list:
         tform = Transform(tform_list)
     else:
@@ -625,17 +782,14 @@ def exportTraces(data_zg,
                     if tag in trace.tags:
                         traces.append(trace)
 
-    array, sec_id_dict = slayer.generateLabelsArray(
-            pixmap_dim,
-            window,
-            traces,
-            tform=tform
-    )
+    labels = []
+    sec_id_dict = {}
 
-    labels_name = f"labels_{group_or_tag}"
-
-    data_zg[labels_name][z] = array
-    data_zg[labels_name].attrs["gt_lookup"] = sec_id_dict
+    for trace in traces:
+        name_id = hashName(trace.name)
+        points = np.array(slayer.traceToPix(trace, tform=tform), dtype=np.int64).reshape(-1, 2)
+        labels.append((name_id, points[:,0], points[:,1]))
+        sec_id_dict[trace.name] = name_id
 
     # delete group if requested
     if not is_group:
@@ -648,6 +802,38 @@ def exportTraces(data_zg,
                 trace.setHidden(True)
                 section.addTrace(trace)
             section.save()
+    
+    return labels, sec_id_dict
+
+
+def exportLabelsBlock(data_fp : str,
+                      dataset_name : str,
+                      z_start : int,
+                      section_labels : list,
+                      pixmap_dim : tuple):
+    """Rasterize and write labels for a z-chunk-aligned block of sections (worker process).
+    
+        Params:
+            data_fp (str): the filepath for the zarr
+            dataset_name (str): the name of the labels dataset
+            z_start (int): the z-level of the first section in the zarr
+            section_labels (list): the output of getSectionLabels for each section
+            pixmap_dim (tuple): the w and h in pixels for the arr output
+    """
+    labels_array = zarr.open(data_fp, "r+")[dataset_name]
+    pmw, pmh = tuple(pixmap_dim)
+    band_h = labels_array.chunks[1]
+
+    for y0 in range(0, pmh, band_h):
+        y1 = min(y0 + band_h, pmh)
+        band = np.zeros((len(section_labels), y1 - y0, pmw), dtype=labels_array.dtype)
+        for z, labels in enumerate(section_labels):
+            for label, xs, ys in labels:
+                if not len(ys) or ys.max() < y0 or ys.min() >= y1:
+                    continue
+                yy, xx = polygon(ys - y0, xs, band.shape[1:])
+                band[z, yy, xx] = label
+        labels_array[z_start:z_start + len(section_labels), y0:y1, :] = band
 
 
 def importSection(data_zg, group, snum, series, ids=None):
@@ -660,6 +846,26 @@ def importSection(data_zg, group, snum, series, ids=None):
             series (Series): the series
             ids (list): the ids to include in importing
     """
+    section_traces = getSectionTraces(data_zg, group, snum, ids)
+    applySectionTraces(series, group, section_traces)
+
+
+def getSectionTraces(data_zg, group, snum, ids=None):
+    """Compute the trace points for the labels on a single section.
+
+    Does not touch the series, so it can run in a worker process.
+    
+        Params:
+            data_zg: the zarr group (or the filepath to the zarr)
+            group: the name of the zarr group with data to import
+            snum (int): the section number
+            ids (list): the ids to include in importing
+        Returns:
+            (tuple): the section number and a list of (label id, list of trace points)
+                     (None if the section is not in the zarr)
+    """
+    if isinstance(data_zg, (str, Path)):
+        data_zg = zarr.open(str(data_zg), "r")
     
     labels_array = get_zarr_array(data_zg, group)
     resolution = get_resolution(labels_array)
@@ -681,8 +887,7 @@ def importSection(data_zg, group, snum, series, ids=None):
     except KeyError:
         return
 
-    ## Load section and corresponding data
-    section = series.loadSection(snum)
+    ## Load corresponding data
     z = sections.index(snum)
 
     try:
@@ -735,38 +940,55 @@ def importSection(data_zg, group, snum, series, ids=None):
     # )
     # arr[exclude_arr != 0] = 0
 
-    ## Iterate through label ids
-    if ids is None:
-        ids = np.unique(arr)
+    ## Iterate through label ids (exteriors found in a single labeling pass)
+    label_traces = []
+
+    for id, exteriors in getLabelExteriors(arr, ids):
+        
+        label_traces.append((
+            int(id),
+            [exterior_to_points(ext, offset, resolution, raw, window, tform, mag) for ext in exteriors]
+        ))
+
+    return snum, label_traces
+
+
+def applySectionTraces(series, group, section_traces):
+    """Add computed label traces to a section (main process only).
+    
+        Params:
+            series (Series): the series
+            group: the name of the zarr group the labels were imported from
+            section_traces (tuple): the output of getSectionTraces
+    """
+    if section_traces is None:
+        return
+    
+    snum, label_traces = section_traces
+    section = series.loadSection(snum)
 
     ## Resolve the trace-color palette + seed once for this section.
     ## An empty/unset override falls back to the shipped curated default.
     palette = series.getOption("autoseg_color_palette") or DEFAULT_AUTOSEG_PALETTE
     color_seed = series.getOption("autoseg_color_seed") or 0
 
-    for id in ids:
-        
-        if id == 0:
-            continue
+    for id, traces_points in label_traces:
 
-        ## Get exteriors for ID
-        exteriors = getExteriors(arr == id)
+        trace_name = f"autoseg_{id}"
+        trace_color = palette_color(id, palette, color_seed)
 
         ## Add exteriors as traces
-        for ext in exteriors:
-
-            trace_name = f"autoseg_{id}"
-            trace_color = palette_color(id, palette, color_seed)
+        for points in traces_points:
 
             trace = Trace(name=trace_name, color=trace_color)
-            trace.points = exterior_to_points(ext, offset, resolution, raw, window, tform, mag)
+            trace.points = points
             trace.fill_mode = ("transparent", "unselected")
             
             section.addTrace(trace)
 
         ## Add trace to group
-        series.object_groups.add(f"seg_{dt}", f"autoseg_{id}")
-        series.object_groups.add(f"seg_{group}", f"autoseg_{id}")
+        series.object_groups.add(f"seg_{dt}", trace_name)
+        series.object_groups.add(f"seg_{group}", trace_name)
 
     section.save()
 
@@ -1,6 +1,8 @@
 import os
-import json
 import time
+import zlib
+import bisect
+import pickle
 from copy import deepcopy
 
 from PyReconstruct.modules.datatypes import (
@@ -8,9 +10,29 @@ from PyReconstruct.modules.datatypes import (
     Section,
     Contour,
     Ztrace,
-    Trace
+    Transform
 )
 
+def encodeState(obj) -> bytes:
+    """Encode state data into compact (compressed) bytes.
+    
+        Params:
+            obj: the (picklable) object to encode
+        Returns:
+            (bytes): the encoded object
+    """
+    return zlib.compress(pickle.dumps(obj, pickle.HIGHEST_PROTOCOL), 1)
+
+def decodeState(data : bytes):
+    """Decode state data (returns a fresh copy of the encoded object).
+    
+        Params:
+            data (bytes): the encoded object
+        Returns:
+            the decoded object
+    """
+    return pickle.loads(zlib.decompress(data))
+
 class FieldState():
 
     def __init__(
@@ -24,6 +46,9 @@ class FieldState():
             updated_ztraces=None
         ):
         """Create a field state with traces and the transform.
+
+        Only the modified contours and ztraces (the delta from the previous
+        state) are kept, each encoded as compressed bytes.
         
             Params:
                 contours (dict): all the contours on a section
@@ -41,101 +66,190 @@ class FieldState():
             else:
                 updated_contours = contours.keys()
 
-        # store contours in memory if no fp provided
-        if not self.contours_fp:  
+        if contours is None and self.contours_fp:  # assume stored already
+            self.contours = None
+            self.contour_names = set(self.loadContours().keys())
+        else:
             for contour_name in updated_contours:
                 if contour_name in contours:
-                    self.contours[contour_name] = contours[contour_name].copy()
+                    self.contours[contour_name] = encodeState(contours[contour_name])
                 else:  # empty Contour
-                    self.contours[contour_name] = Contour(contour_name)
-        # store contours in json
-        elif contours is None:  # assume stored in JSON already
-            self.contours = None
-        else:  # store contours if provided with both fp and contours
-            for contour_name in updated_contours:
-                self.contours[contour_name] = [trace.getList() for trace in contours[contour_name]]
-            with open(self.contours_fp, "w") as f:
-                json.dump(self.contours, f)
-            self.contours = None
+                    self.contours[contour_name] = encodeState(Contour(contour_name))
+            self.contour_names = set(self.contours.keys())
+            # store contours on disk if fp provided
+            if self.contours_fp:
+                with open(self.contours_fp, "wb") as f:
+                    pickle.dump(self.contours, f, pickle.HIGHEST_PROTOCOL)
+                self.contours = None
         
         self.ztraces = {}
         # first state made for a section (or copy)
         if updated_ztraces is None:
-            for ztrace_name in ztraces:
-                self.ztraces[ztrace_name] = ztraces[ztrace_name].copy()
-        # added another state
-        else:
-            for ztrace_name in updated_ztraces:
-                self.ztraces[ztrace_name] = ztraces[ztrace_name].copy()
+            updated_ztraces = ztraces.keys()
+        for ztrace_name in updated_ztraces:
+            self.ztraces[ztrace_name] = encodeState(ztraces[ztrace_name])
         
         # save tforms
         self.tforms = {}
         for alignment_name in tforms:
-            self.tforms[alignment_name] = tforms[alignment_name].copy()
+            self.tforms[alignment_name] = tforms[alignment_name].getList()
         
         # save flags
-        self.flags = []
-        for flag in flags:
-            self.flags.append(flag.copy())
+        self.flags = encodeState(flags)
+
+        self.updateSize()
     
     def copy(self):
-        return FieldState(self.contours, self.ztraces, self.tforms, self.flags, self.contours_fp)
+        """Return a copy of the state (the encoded data is immutable and shared)."""
+        state = FieldState.__new__(FieldState)
+        state.__dict__ = self.__dict__.copy()
+        state.contour_names = self.contour_names.copy()
+        return state
+    
+    def updateSize(self):
+        """Recount the number of bytes the state holds in memory."""
+        self.nbytes = (
+            (sum(len(b) for b in self.contours.values()) if self.contours else 0) +
+            sum(len(b) for b in self.ztraces.values()) +
+            len(self.flags) +
+            48 * len(self.tforms)
+        )
+    
+    def loadContours(self) -> dict:
+        """Get the encoded contours (contour name : bytes) stored in the state."""
+        if self.contours is None:
+            with open(self.contours_fp, "rb") as f:
+                return pickle.load(f)
+        else:
+            return self.contours
+    
+    def getContour(self, cname : str) -> Contour:
+        """Get a single contour stored in the state (None if not stored)."""
+        if cname not in self.contour_names:
+            return None
+        return decodeState(self.loadContours()[cname])
     
     def getContours(self):
         contours = {}
-        if self.contours_fp:
-            with open(self.contours_fp, "r") as f:
-                contours = json.load(f)
-                for cname, contour in contours.items():
-                    contours[cname] = Contour(cname, [Trace.fromList(trace) for trace in contour])
-            return contours
-        else:
-            for cname in self.contours:
-                contours[cname] = self.contours[cname].copy()
-            return contours
+        for cname, data in self.loadContours().items():
+            contours[cname] = decodeState(data)
+        return contours
+    
+    def getZtrace(self, zname : str) -> Ztrace:
+        """Get a single ztrace stored in the state (None if not stored)."""
+        if zname not in self.ztraces:
+            return None
+        return decodeState(self.ztraces[zname])
     
     def getZtraces(self):
         ztraces = {}
-        for zname in self.ztraces:
-            ztraces[zname] = self.ztraces[zname].copy()
+        for zname, data in self.ztraces.items():
+            ztraces[zname] = decodeState(data)
         return ztraces
     
     def getModifiedContours(self):
-        if self.contours_fp:
-            with open(self.contours_fp, "r") as f:
-                contours = json.load(f)
-            return set(contours.keys())
-        else:
-            return set(self.contours.keys())
+        return self.contour_names.copy()
     
     def getModifiedZtraces(self):
         return set(self.ztraces.keys())
     
     def getTforms(self):
-        return self.tforms.copy()
+        tforms = {}
+        for alignment_name, tform_list in self.tforms.items():
+            tforms[alignment_name] = Transform(tform_list.copy())
+        return tforms
 
     def getFlags(self):
-        return self.flags.copy()
+        return decodeState(self.flags)
     
     def updateTime(self):
         self.time = round(time.time()*10)  # keep track of time when added to state list
+    
+    # STATIC METHOD
+    def fold(states : list):
+        """Fold a run of consecutive states into a single full state.
+
+        The result holds the newest version of every contour and ztrace in the
+        states and the transforms and flags of the last state. It is stored in
+        the contours file of the first state (if it has one).
+        
+            Params:
+                states (list): the states, oldest first (the first should be a full state)
+            Returns:
+                (FieldState): the folded state
+        """
+        base = states[0]
+        contours = base.loadContours().copy()
+        ztraces = base.ztraces.copy()
+        for state in states[1:]:
+            contours.update(state.loadContours())
+            ztraces.update(state.ztraces)
+        
+        folded = states[-1].copy()
+        folded.contours_fp = base.contours_fp
+        folded.contour_names = set(contours.keys())
+        folded.ztraces = ztraces
+        if folded.contours_fp:
+            with open(folded.contours_fp, "wb") as f:
+                pickle.dump(contours, f, pickle.HIGHEST_PROTOCOL)
+            folded.contours = None
+        else:
+            folded.contours = contours
+        folded.updateSize()
+
+        return folded
 
 class SectionStates():
 
-    def __init__(self, section : Section = None, series : Series = None):
+    def __init__(self, section : Section = None, series : Series = None, manager=None):
         """Create the section state manager.
+
+        Undo states are stored as deltas (only the contours modified by each
+        action). An index from each contour name to the positions of the states
+        storing it keeps an undo independent of the depth of the stack.
         
             Params:
                 section (Section): the section object to store states for
                 series (Series): the series that contains the sections
+                manager (SeriesStates): the series states enforcing the global undo budget
         """
         self.initialized = False
-        self.current_state = None
-        self.undo_states = []
-        self.redo_states = []
+        self.manager = manager
+        self.snum = None
+        self._current_state = None
+        self._undo_states = []
+        self._redo_states = []
+        self.n_undos = 0
+        self.n_redos = 0
+        self.n_trimmed = 0  # the number of oldest states folded into the first undo state
+        self.contour_index = {}  # contour name : positions of undo states storing it
+        self.ztrace_index = {}  # ztrace name : positions of undo states storing it
+        self.nbytes = 0  # bytes held in memory
+        self.spill_fp = None  # file containing the states if spilled to disk
+        self.last_used = 0
         if section and series:
             self.initialize(section, series)
     
+    @property
+    def current_state(self) -> FieldState:
+        self.load()
+        return self._current_state
+    
+    @property
+    def undo_states(self) -> list[FieldState]:
+        self.load()
+        return self._undo_states
+    
+    @property
+    def redo_states(self) -> list[FieldState]:
+        self.load()
+        return self._redo_states
+    
+    @property
+    def depth(self) -> int:
+        """The number of undo states ever stacked (including those folded away)."""
+        return self.n_trimmed + self.n_undos
+    
     def initialize(self, section : Section, series : Series):
         """Create the section state manager.
         
@@ -143,8 +257,10 @@ class SectionStates():
                 section (Section): the section object to store states for
                 series (Series): the series that contains the sections
         """
+        self.load()
+        self.snum = section.n
         contours_fp = os.path.join(series.hidden_dir, f"{series.sections[section.n]}.s0")
-        self.current_state = FieldState(
+        self._current_state = FieldState(
             section.contours, 
             series.ztraces, 
             section.tforms, 
@@ -152,6 +268,66 @@ class SectionStates():
             contours_fp
         )
         self.initialized = True
+        self.updateSize()
+        if self.manager:
+            self.manager.touch(self)
+    
+    def indexState(self, state : FieldState, pos : int, remove=False):
+        """Add (or remove) an undo state to the contour and ztrace indices.
+        
+            Params:
+                state (FieldState): the state
+                pos (int): the absolute position of the state in the undo stack
+                remove (bool): True if the state (the last one indexed) should be removed
+        """
+        for index, names in (
+            (self.contour_index, state.contour_names),
+            (self.ztrace_index, state.ztraces.keys())
+        ):
+            for name in names:
+                if remove:
+                    positions = index[name]
+                    positions.pop()
+                    if not positions:
+                        del(index[name])
+                else:
+                    index.setdefault(name, []).append(pos)
+    
+    def pushUndo(self, state : FieldState):
+        """Push a state onto the undo stack."""
+        self.indexState(state, self.depth)
+        self._undo_states.append(state)
+        self.n_undos += 1
+    
+    def popUndo(self) -> FieldState:
+        """Pop the most recent state off of the undo stack."""
+        state = self._undo_states.pop()
+        self.n_undos -= 1
+        self.indexState(state, self.depth, remove=True)
+        return state
+    
+    def getLatestState(self, index : dict, name : str) -> FieldState:
+        """Get the most recent undo state storing a contour or ztrace.
+        
+            Params:
+                index (dict): the contour or ztrace index
+                name (str): the name of the contour or ztrace
+            Returns:
+                (FieldState): the state (None if no state stores the name)
+        """
+        positions = index.get(name)
+        if not positions:
+            return None
+        return self._undo_states[positions[-1] - self.n_trimmed]
+    
+    def updateSize(self):
+        """Recount the number of bytes held in memory by the states."""
+        if self.spill_fp:
+            self.nbytes = 0
+            return
+        self.nbytes = sum(state.nbytes for state in self._undo_states + self._redo_states)
+        if self._current_state:
+            self.nbytes += self._current_state.nbytes
     
     def addState(self, section : Section, series : Series):
         """Add a new undo state (called when an action is performed).
@@ -159,17 +335,19 @@ class SectionStates():
             Params:
                 section (Section): the section object
         """
+        self.load()
         # clear redo states
-        self.redo_states = []
+        self._redo_states = []
+        self.n_redos = 0
         # push current state to undo states
-        self.current_state.updateTime()  # keep track of when added to undos
-        self.undo_states.append(self.current_state)
+        self._current_state.updateTime()  # keep track of when added to undos
+        self.pushUndo(self._current_state)
         # get the names of the updated contours
         updated_contours = section.getAllModifiedNames()
         # get the updated ztraces
         updated_ztraces = series.modified_ztraces.copy()
         # set the new current state
-        self.current_state = FieldState(
+        self._current_state = FieldState(
             section.contours,
             series.ztraces,
             section.tforms,
@@ -178,6 +356,96 @@ class SectionStates():
             updated_contours,
             updated_ztraces
         )
+        self.updateSize()
+
+        # keep the history within the undo budget
+        self.trim(
+            series.getOption("undo_section_states"),
+            int(series.getOption("undo_section_mb") * 2**20)
+        )
+        if self.manager:
+            self.manager.enforceBudget(self)
+    
+    def trim(self, max_states : int, max_bytes : int = 0):
+        """Fold the oldest undo states together to bring the section within budget.
+        
+            Params:
+                max_states (int): the maximum number of undo states (unlimited if 0)
+                max_bytes (int): the maximum number of bytes held in memory (unlimited if 0)
+        """
+        over_states = max_states and self.n_undos > max_states
+        over_bytes = max_bytes and self.nbytes > max_bytes
+        if not (over_states or over_bytes) or self.n_undos < 2:
+            return
+        
+        # fold in batches so that a full stack is not rewritten on every action
+        target_states = self.n_undos
+        if over_states:
+            target_states = max(1, max_states - max_states // 10)
+        n_fold = self.n_undos - target_states
+        if over_bytes:
+            target_bytes = max_bytes - max_bytes // 10
+            nbytes = self.nbytes
+            for state in self._undo_states[1:n_fold+1]:
+                nbytes -= state.nbytes
+            while nbytes > target_bytes and n_fold < self.n_undos - 1:
+                n_fold += 1
+                nbytes -= self._undo_states[n_fold].nbytes
+        if n_fold < 1:
+            return
+        
+        # spilled states are folded and spilled again (not kept in memory)
+        spill_fp = self.spill_fp
+        self.load()
+        
+        folded = FieldState.fold(self._undo_states[:n_fold+1])
+        self._undo_states = [folded] + self._undo_states[n_fold+1:]
+        self.n_trimmed += n_fold
+        self.n_undos -= n_fold
+
+        # update the indices: names stored in the folded state now point to it
+        for index, names in (
+            (self.contour_index, folded.contour_names),
+            (self.ztrace_index, folded.ztraces.keys())
+        ):
+            for name in names:
+                positions = index.get(name, [])
+                positions = positions[bisect.bisect_left(positions, self.n_trimmed):]
+                if not positions or positions[0] != self.n_trimmed:
+                    positions.insert(0, self.n_trimmed)
+                index[name] = positions
+        
+        self.updateSize()
+        if spill_fp:
+            self.spill(spill_fp)
+    
+    def spill(self, spill_fp : str):
+        """Move the states to disk to free memory (loaded back when next used).
+        
+            Params:
+                spill_fp (str): the file to store the states in
+        """
+        if self.spill_fp or not self.initialized:
+            return
+        with open(spill_fp, "wb") as f:
+            pickle.dump(
+                (self._current_state, self._undo_states, self._redo_states),
+                f,
+                pickle.HIGHEST_PROTOCOL
+            )
+        self._current_state, self._undo_states, self._redo_states = None, [], []
+        self.spill_fp = spill_fp
+        self.updateSize()
+    
+    def load(self):
+        """Load the states back into memory if they were spilled to disk."""
+        if not self.spill_fp:
+            return
+        with open(self.spill_fp, "rb") as f:
+            self._current_state, self._undo_states, self._redo_states = pickle.load(f)
+        os.remove(self.spill_fp)
+        self.spill_fp = None
+        self.updateSize()
         
     def undoState(self, section : Section, series : Series) -> set:
         """Restore an undo state on the section.
@@ -189,52 +457,43 @@ class SectionStates():
                 (set): the names of modified contours
         """
         # if there are not undo states
-        if len(self.undo_states) == 0:
+        if self.n_undos == 0:
             return
+        self.load()
         
+        modified_contours = self._current_state.getModifiedContours()
+        modified_ztraces = self._current_state.getModifiedZtraces()
+
         # if only one undo state exists
-        if len(self.undo_states) == 1:
-            state = self.undo_states[0]
+        if self.n_undos == 1:
+            state = self._undo_states[0]
             # restore contours
-            modified_contours = self.current_state.getModifiedContours()
             section.contours = state.getContours()
             # restore ztraces
-            modified_ztraces = self.current_state.getModifiedZtraces()
             for zname in modified_ztraces:
                 series.ztraces[zname] = restoreZtraceOnSection(
                     series.ztraces[zname],
-                    state.ztraces[zname],
+                    state.getZtrace(zname),
                     section.n
                 )
 
         # if there are multiple undo states
         else:
-            # iterate backwards and find the last ieration of the recently changed contours
-            last_changed_contours = self.current_state.getModifiedContours().copy()
-            last_changed_ztraces = self.current_state.getModifiedZtraces().copy()
-            modified_contours = last_changed_contours.copy()
-            modified_ztraces = last_changed_ztraces.copy()
-            for state in reversed(self.undo_states):
-                state_contours = state.getContours()
-                state_ztraces = state.getZtraces()
-                for contour in last_changed_contours.copy():
-                    if contour in state_contours:
-                        section.contours[contour] = state_contours[contour]
-                        last_changed_contours.remove(contour)
-                for ztrace in last_changed_ztraces.copy():
-                    if ztrace in state_ztraces:
-                        series.ztraces[ztrace] = restoreZtraceOnSection(
-                            series.ztraces[ztrace],
-                            state_ztraces[ztrace],
-                            section.n
-                        )
-                        last_changed_ztraces.remove(ztrace)
-                if not last_changed_contours and not last_changed_ztraces:
-                    break
-            # if the contour was not found (aka it was just created)
-            if last_changed_contours:
-                for contour in last_changed_contours:
-                    section.contours[contour] = Contour(contour)
+            # look up the last iteration of the recently changed contours
+            for cname in modified_contours:
+                state = self.getLatestState(self.contour_index, cname)
+                if state is None:  # the contour was just created
+                    section.contours[cname] = Contour(cname)
+                else:
+                    section.contours[cname] = state.getContour(cname)
+            for zname in modified_ztraces:
+                state = self.getLatestState(self.ztrace_index, zname)
+                if state is not None:
+                    series.ztraces[zname] = restoreZtraceOnSection(
+                        series.ztraces[zname],
+                        state.getZtrace(zname),
+                        section.n
+                    )
             
         # update the series log
         for cname in modified_contours:
@@ -243,13 +502,13 @@ class SectionStates():
             series.addLog(zname, section.n, "Modify ztrace")
 
         # restore the transforms
-        restored_tforms = self.undo_states[-1].getTforms()
+        restored_tforms = self._undo_states[-1].getTforms()
         section.tforms = restored_tforms
         if section.tformsModified():
             series.addLog(None, section.n, "Modify transform")
 
         # restore the flags
-        restored_flags = self.undo_states[-1].getFlags()
+        restored_flags = self._undo_states[-1].getFlags()
         # check if flag changes should be logged
         flist_1 = [len(f.comments) for f in section.flags]
         flist_2 = [len(f.comments) for f in restored_flags]
@@ -258,13 +517,16 @@ class SectionStates():
         section.flags = restored_flags
 
         # edit the undo/redo stacks and the current state
-        self.redo_states.append(self.current_state)
-        self.current_state = self.undo_states.pop().copy()
+        self._redo_states.append(self._current_state)
+        self.n_redos += 1
+        self._current_state = self.popUndo().copy()
 
         # add the modified contours to the section object
         section.modified_contours = section.modified_contours.union(modified_contours)
         # add modified ztrace names to the series object
         series.modified_ztraces = series.modified_ztraces.union(modified_ztraces)
+        if self.manager:
+            self.manager.touch(self)
     
     def redoState(self, section : Section, series : Series) -> set:
         """Restore a redo state on the section.
@@ -274,9 +536,10 @@ class SectionStates():
             Returns:
                 (set): the names of modified contours
         """
-        if len(self.redo_states) == 0:
+        if self.n_redos == 0:
             return
-        redo_state = self.redo_states[-1]
+        self.load()
+        redo_state = self._redo_states[-1]
         # restore the contours on the section
         state_contours = redo_state.getContours()
         modified_contours = redo_state.getModifiedContours()
@@ -313,13 +576,16 @@ class SectionStates():
         section.flags = restored_flags
 
         # edit the undo/redo stacks and the current state
-        self.undo_states.append(self.current_state)
-        self.current_state = self.redo_states.pop()
+        self.pushUndo(self._current_state)
+        self._current_state = self._redo_states.pop()
+        self.n_redos -= 1
 
         # add the modified contours to the section object
         section.modified_contours = section.modified_contours.union(modified_contours)
         # add modified ztrace names to the series object
         series.modified_ztraces = series.modified_ztraces.union(modified_ztraces)
+        if self.manager:
+            self.manager.touch(self)
 
 def restoreZtraceOnSection(orig_ztrace : Ztrace, new_ztrace : Ztrace, snum : int) -> Ztrace:
     """Restore the ztrace for a specific section.
@@ -408,6 +674,13 @@ class SeriesState():
                 continue  # only replace obj columns under specific circumstances (below)
             setattr(series, attr, value)
 
+        # the objects whose attributes were restored must be written to the attribute store
+        pre_obj_attrs, post_obj_attrs = pre_series_attrs["obj_attrs"], self.series_attrs["obj_attrs"]
+        series.modified_obj_attrs.update(
+            name for name in set(pre_obj_attrs.keys()).union(post_obj_attrs.keys())
+            if pre_obj_attrs.get(name) != post_obj_attrs.get(name)
+        )
+
         # specific case: no sections modified but the series data needs to be refreshed bc preferred alignments changed
         if not self.undo_lens and alignmentPreferencesChanged(pre_series_attrs, self.series_attrs):
             series.data.refresh()
@@ -453,9 +726,10 @@ class SeriesStates():
         self.series = series
         self.section_states_dict : dict[int, SectionStates] = {}
         for snum in self.series.sections:
-            self.section_states_dict[snum] = SectionStates()
+            self.section_states_dict[snum] = SectionStates(manager=self)
         self.undos : list[SeriesState] = []
         self.redos : list[SeriesState] = []
+        self.use_count = 0  # used to find the least recently used section states
     
     def __iter__(self):
         """Return the iterator object for the series states"""
@@ -491,12 +765,70 @@ class SeriesStates():
             Params:
                 snum (int): the section number
         """
-        self.undos[-1].undo_lens[snum] = len(self[snum].undo_states)
+        self.undos[-1].undo_lens[snum] = self[snum].depth
+
+    def touch(self, section_states : SectionStates):
+        """Mark section states as the most recently used."""
+        self.use_count += 1
+        section_states.last_used = self.use_count
+    
+    def enforceBudget(self, section_states : SectionStates = None):
+        """Keep the undo history of the series within the global undo budget.
+
+        The oldest states of the least recently used sections are folded away
+        until the total number of states is within budget, and cold sections
+        are spilled to disk until the memory held is within budget.
+        
+            Params:
+                section_states (SectionStates): the section states that were just used (kept in memory)
+        """
+        if section_states:
+            self.touch(section_states)
+        max_states = self.series.getOption("undo_series_states")
+        max_bytes = int(self.series.getOption("undo_series_mb") * 2**20)
+
+        all_states = [s for s in self.section_states_dict.values() if s.initialized]
+        n_states = sum(s.n_undos for s in all_states)
+        nbytes = sum(s.nbytes for s in all_states)
+        if not (
+            max_states and n_states > max_states or
+            max_bytes and nbytes > max_bytes
+        ):
+            return
+        
+        # least recently used first
+        all_states.sort(key=lambda s : s.last_used)
+
+        if max_states and n_states > max_states:
+            # leave room so that the history is not trimmed on every action
+            excess = n_states - (max_states - max_states // 10)
+            for states in all_states:
+                if excess <= 0:
+                    break
+                if states.n_undos < 2:
+                    continue
+                n_undos = states.n_undos
+                states.trim(max(1, n_undos - excess))
+                excess -= n_undos - states.n_undos
+            nbytes = sum(s.nbytes for s in all_states)
+        
+        if max_bytes and nbytes > max_bytes:
+            for states in all_states:
+                if nbytes <= max_bytes:
+                    break
+                if states is section_states or states.spill_fp:
+                    continue
+                nbytes -= states.nbytes
+                states.spill(os.path.join(
+                    self.series.hidden_dir,
+                    f"{self.series.sections[states.snum]}.undo"
+                ))
 
     def clear(self):
         """Clear all state tracking."""
-        for snum in self.section_states_dict:
-            self.section_states_dict[snum] = SectionStates()
+        for snum, section_states in self.section_states_dict.items():
+            section_states.load()  # remove any spilled states from disk
+            self.section_states_dict[snum] = SectionStates(manager=self)
         self.undos = []
         self.redos = []
     
@@ -514,8 +846,9 @@ class SeriesStates():
             return (False, False, False)
         
         series_states = self.redos if redo else self.undos
-        cs_undos = self[current_section].undo_states
-        cs_redos = self[current_section].redo_states
+        cs_states = self[current_section]
+        cs_undos = cs_states.n_undos
+        cs_redos = cs_states.n_redos
         # neither section nor series undo is populated
         if not series_states and (
             redo and not cs_redos or
@@ -532,13 +865,17 @@ class SeriesStates():
             all_sections_match = True
             for snum, undo_len in undo_lens.items():
                 states = self[snum]
-                if not states.initialized or len(states.undo_states) != undo_len - (1 if redo else 0):
+                if (
+                    not states.initialized or 
+                    states.depth != undo_len - (1 if redo else 0) or
+                    not (states.n_redos if redo else states.n_undos)  # state folded away
+                ):
                     all_sections_match = False
                     break
             # check if state numbers match on the current section
             current_section_match = bool(
                 current_section in undo_lens and 
-                len(cs_undos) == undo_lens[current_section] - (1 if redo else 0)
+                cs_states.depth == undo_lens[current_section] - (1 if redo else 0)
             )
             # check if 2D undo is part of any unbreakable set
             is_in_unbreakable = False
@@ -546,7 +883,7 @@ class SeriesStates():
                 if (
                     not state.breakable and
                     current_section in state.undo_lens and 
-                    len(cs_undos) == state.undo_lens[current_section] - (1 if redo else 0)
+                    cs_states.depth == state.undo_lens[current_section] - (1 if redo else 0)
                 ):
                     is_in_unbreakable = True
                     break
@@ -637,7 +974,7 @@ class SeriesStates():
         for state in states.copy():
             if (
                 section.n in state.undo_lens and (
-                    len(self[snum].undo_states) == state.undo_lens[snum] - (1 if redo else 0)
+                    self[snum].depth == state.undo_lens[snum] - (1 if redo else 0)
                 )
             ):
                 if state.breakable:
@@ -660,16 +997,9 @@ class SeriesStates():
         """
         # check if a series undo has been overwritten
         if self.undos and snum in self.undos[-1].undo_lens:
-            if self.undos[-1].undo_lens[snum] == len(self[snum].undo_states):
+            if self.undos[-1].undo_lens[snum] == self[snum].depth:
                 self.undos.pop()
         # clear series redos
         for redo in self.redos.copy():
             if snum in redo.undo_lens:
                 self.redos.remove(redo)
-
-    
-
-
-
-
-
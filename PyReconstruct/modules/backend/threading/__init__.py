@@ -1 +1,2 @@
-from .threading import ThreadPool, ThreadPoolProgBar, Worker
\ No newline at end of file
+from .threading import ThreadPool, ThreadPoolProgBar, Worker
+from .processes import ProcessPoolProgBar, WorkerError
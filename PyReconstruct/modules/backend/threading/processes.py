@@ -0,0 +1,130 @@
+"""Process pool for CPU-bound work that cannot share the GUI's Python state.
+
+Worker functions run in separate processes (so they are not limited by the
+GIL) and must be top-level, picklable functions that take and return plain
+data. They never touch the Series: their results are handed back to the main
+process in the order the workers were created, where they can be applied
+safely. Workers that raise do not stop the others: once the pool has drained,
+their errors are raised together as a WorkerError.
+"""
+
+import os
+import traceback
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from PySide6.QtWidgets import QApplication
+
+from PyReconstruct.modules.gui.utils import getProgbar
+
+
+class WorkerError(Exception):
+
+    def __init__(self, failures : list, results : list):
+        """Raised after a process pool has drained if any of its workers raised.
+
+            Params:
+                failures (list): (worker name, traceback string) for each worker that raised
+                results (list): the results of all the workers (None for the failed ones)
+        """
+        self.failures = failures
+        self.results = results
+        lines = [f"{len(failures)} of {len(results)} task(s) failed:"]
+        for name, tb in failures:
+            lines.append(f"{name}: {tb.strip().splitlines()[-1]}")
+        super().__init__("\n".join(lines))
+
+
+class ProcessPoolProgBar():
+
+    def __init__(self, max_processes : int = None):
+        """Create the process pool.
+
+            Params:
+                max_processes (int): the maximum number of worker processes (cpu count if None)
+        """
+        self.max_processes = max_processes or os.cpu_count() or 1
+        self.workers = []
+
+    def createWorker(self, fn, *args, name : str = None):
+        """Queue a function to be run in a worker process.
+
+            Params:
+                fn (function): the top-level function for the worker to run
+                *args: the (picklable) args to be passed into the function
+                name (str): what the worker processes (reported if it fails, e.g. "section 3")
+        """
+        if name is None:
+            name = f"{fn.__name__} task {len(self.workers)}"
+        self.workers.append((fn, args, name))
+
+    def startAll(self, text="", result_fn=None, cancel=False):
+        """Run all queued workers and collect their results in creation order.
+
+            Params:
+                text (str): the text for the progress bar
+                result_fn (function): called in the main process with each result, in creation order
+                cancel (bool): True if the progress bar is cancelable
+            Returns:
+                (list): the results (None for workers that were canceled before they ran)
+            Raises:
+                WorkerError: once every worker is done, if any of them raised
+        """
+        final_value = len(self.workers)
+        results = [None] * final_value
+        failures = []
+        if not final_value:
+            return results
+
+        progbar = getProgbar(text, cancel=cancel, maximum=final_value)
+        n_processes = min(self.max_processes, final_value)
+
+        # spawn (rather than fork) so workers never inherit the Qt state of the GUI process
+        with ProcessPoolExecutor(
+            n_processes,
+            mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            futures = [executor.submit(fn, *args) for fn, args, name in self.workers]
+            pending = set(futures)
+            canceled = False
+            n_done = 0
+
+            for i, future in enumerate(futures):
+
+                # wait for this worker while keeping the GUI responsive
+                while not canceled and not future.done():
+                    done, pending = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+                    n_done += len(done)
+                    progbar.setValue(n_done)
+                    if QApplication.instance():
+                        QApplication.processEvents()
+                    if cancel and progbar.wasCanceled():
+                        # running workers finish (and are collected below), queued workers are dropped
+                        canceled = True
+                        executor.shutdown(wait=True, cancel_futures=True)
+
+                if future.cancelled():
+                    continue
+
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    failures.append((
+                        self.workers[i][2],
+                        "".join(traceback.format_exception(type(e), e, e.__traceback__))
+                    ))
+                    continue
+
+                if result_fn:
+                    result_fn(results[i])
+
+        if canceled:
+            progbar.close()
+        elif n_done < final_value:
+            progbar.setValue(final_value)
+        self.workers = []
+
+        if failures:
+            raise WorkerError(failures, results)
+
+        return results
@@ -7,9 +7,10 @@ https://www.pythonguis.com/tutorials/multithreading-pyside6-applications-qthread
 """
 
 import sys
+import time
 import traceback
 
-from PySide6.QtWidgets import QProgressDialog, QProgressBar, QApplication, QLabel
+from PySide6.QtWidgets import QProgressDialog, QProgressBar, QLabel
 
 from PyReconstruct.modules.gui.utils import getProgbar
 
@@ -19,6 +20,7 @@ from PySide6.QtCore import (
     Signal,
     QObject,
     QThreadPool,
+    QEventLoop,
     Qt
 )
 
@@ -68,6 +70,11 @@ class Worker(QRunnable, QObject):
         self.fn = fn
         self.args = args
         self.signals = WorkerSignals()
+        self.canceled = False
+
+    def cancel(self):
+        """Skip this worker if it has not started running yet."""
+        self.canceled = True
 
     @Slot()
     def run(self):
@@ -77,6 +84,8 @@ class Worker(QRunnable, QObject):
 
         # Retrieve args/kwargs here; and fire processing using them
         try:
+            if self.canceled:
+                return
             result = self.fn(*self.args)
         except:
             traceback.print_exc()
@@ -88,20 +97,31 @@ class Worker(QRunnable, QObject):
             self.signals.finished.emit()
 
 class ThreadPool(QThreadPool):
-    """Extended from QThreadPool class."""
+    """Extended from QThreadPool class.
+
+    Emits progress (number of finished workers) and finished (once every
+    started worker is done) on the GUI thread, so callers can react to
+    completion instead of polling.
+    """
 
-    def __init__(self):
+    progress = Signal(int)
+    finished = Signal()
+
+    def __init__(self, max_threads : int = 10):
         """Overwritten from parent class.
         
         Params:
-            update (function): the update functino for a loading bar
+            max_threads (int): the maximum number of workers running at once
         """
         super().__init__()
-        if self.maxThreadCount() > 10:
-            self.setMaxThreadCount(10)
+        if self.maxThreadCount() > max_threads:
+            self.setMaxThreadCount(max_threads)
         self.workers = []
         self.n_finished = 0
-        self.finished_fn = None
+        self.n_started = 0
+        self.canceled = False
+        self.start_time = None
+        self.elapsed = None
 
     def createWorker(self, fn, *args):
         """Create and return a worker object.
@@ -112,22 +132,75 @@ class ThreadPool(QThreadPool):
         w = Worker(fn, *args)
         self.workers.append(w)
         return w
+    
+    def _workerFinished(self):
+        """Count a finished worker (runs on the GUI thread)."""
+        self.n_finished += 1
+        self.progress.emit(self.n_finished)
+        if self.n_finished == self.n_started:
+            self.elapsed = time.perf_counter() - self.start_time
+            self.finished.emit()
+    
+    def startWorkers(self):
+        """Start all the created workers without waiting for them."""
+        self.n_finished = 0
+        self.n_started = len(self.workers)
+        self.canceled = False
+        self.start_time = time.perf_counter()
+        self.elapsed = None
 
-class MemoryInt():
+        if not self.workers:
+            self.elapsed = 0
+            self.finished.emit()
+            return
 
-    def __init__(self):
-        self.n = 0
+        for worker in self.workers:
+            worker.signals.finished.connect(self._workerFinished)
+            self.start(worker)
+    
+    def isFinished(self) -> bool:
+        """Return True if all started workers are done."""
+        return self.n_finished >= self.n_started
     
-    def inc(self):
-        self.n += 1
+    def wait(self):
+        """Block until all started workers are done, while still processing GUI events."""
+        if self.isFinished():
+            return
+        loop = QEventLoop()
+        self.finished.connect(loop.quit)
+        loop.exec()
+        self.finished.disconnect(loop.quit)
+    
+    def cancel(self):
+        """Skip all the workers that have not started running yet."""
+        self.canceled = True
+        for worker in self.workers:
+            worker.cancel()
+    
+    @property
+    def throughput(self) -> float:
+        """The number of workers finished per second (None if still running)."""
+        if self.elapsed is None:
+            return None
+        return self.n_finished / max(self.elapsed, 1e-9)
 
 class ThreadPoolProgBar(ThreadPool):
 
-    def startAll(self, text="", status_bar=None):
+    def startAll(self, text="", status_bar=None, cancel=False, wait=True):
+        """Start all the workers with a progress indicator.
+        
+            Params:
+                text (str): the text for the progress indicator
+                status_bar (QStatusBar): show progress in this status bar instead of a dialog
+                cancel (bool): True if the progress dialog is cancelable
+                wait (bool): True if this should not return until all workers are done
+        """
         final_value = len(self.workers)
         maximum = final_value if final_value >= 4 else 0
         if status_bar is None:
-            progbar = getProgbar(text, cancel=False, maximum=maximum)
+            progbar = getProgbar(text, cancel=cancel, maximum=maximum)
+            if cancel and hasattr(progbar, "canceled"):
+                progbar.canceled.connect(self.cancel)
         else:  # custom progbar for status bar
             lbl = QLabel()
             lbl.setText(text)
@@ -138,17 +211,23 @@ class ThreadPoolProgBar(ThreadPool):
             status_bar.addPermanentWidget(lbl)
             status_bar.addPermanentWidget(progbar)
         
-        counter = MemoryInt()
-        for worker in self.workers:
-            QApplication.processEvents()
-            worker.signals.finished.connect(counter.inc)
-            worker.signals.finished.connect(lambda : progbar.setValue(counter.n))
-            self.start(worker)
+        def onFinished():
+            if maximum == 0:
+                progbar.close()
+            if status_bar:
+                lbl.close()
+                status_bar.showMessage(
+                    f"{text} {self.n_finished} task(s) in {self.elapsed:.1f} s",
+                    5000
+                )
+            # the next startAll gets its own progress indicator and workers
+            self.progress.disconnect(progbar.setValue)
+            self.finished.disconnect(onFinished)
+            self.workers = []
         
-        while counter.n < final_value:
-            QApplication.processEvents()
-        
-        if maximum == 0:
-            progbar.close()
-        if status_bar:
-            lbl.close()
+        self.progress.connect(progbar.setValue)
+        self.finished.connect(onFinished)
+        self.startWorkers()
+
+        if wait:
+            self.wait()
@@ -4,4 +4,9 @@ from .zarr_layer import ZarrLayer
 from .optimize_bc import adjustPixelsToStats, optimizeSectionBC, optimizeSeriesBC
 from .snap_trace import snapTrace
 from .trace_layer import drawArrow
-from .image_layer import suppressStderr
\ No newline at end of file
+from .image_layer import (
+    suppressStderr,
+    getImageSource,
+    warpImageSource,
+    warpSectionImage
+)
\ No newline at end of file
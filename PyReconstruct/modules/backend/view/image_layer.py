@@ -1,6 +1,7 @@
 import os
 import sys
 import math
+import cv2
 import zarr
 import subprocess
 import contextlib
@@ -44,7 +45,7 @@ from PyReconstruct.modules.datatypes import (
     Section,
     Transform
 )
-from PyReconstruct.modules.calc import fieldPointToPixmap
+from PyReconstruct.modules.calc import fieldPointToPixmap, warpImageToWindow
 from PyReconstruct.modules.constants import assets_dir
 
 class ImageLayer():
@@ -370,6 +371,112 @@ class ImageLayer():
 
         return arr
 
+def getImageSource(section : Section, series : Series) -> dict:
+    """Get a picklable description of where and how a section image is stored.
+    
+        Params:
+            section (Section): the section object
+            series (Series): the series object
+        Returns:
+            (dict): the image source (used by warpImageSource)
+    """
+    is_zarr = series.src_dir.endswith("zarr")
+    return {
+        "src_dir": series.src_dir,
+        "src": section.src,
+        "is_zarr": is_zarr,
+        "scales": sorted(section.zarr_scales, reverse=True) if is_zarr and os.path.isdir(series.src_dir) else [],
+        "mag": section.mag,
+        "tform": section.tform.getList(),
+    }
+
+def readImageSource(source : dict, pixmap_dim : tuple, window : list):
+    """Read the source image best suited to a window (no Qt).
+    
+        Params:
+            source (dict): the image source from getImageSource
+            pixmap_dim (tuple): the w and h of the 2D array
+            window (list): the x, y, w, and h of the field window
+        Returns:
+            (tuple): the image (np.ndarray or zarr array), its full-resolution height, and its scale level
+                     (None if the image was not found)
+    """
+    if source["is_zarr"]:
+        if not os.path.isdir(source["src_dir"]):
+            return None
+        zg = zarr.open(source["src_dir"], "r")
+        scales = source["scales"]
+        if not scales:
+            if source["src"] not in zg:
+                return None
+            image = zg[source["src"]]  # zarr in previous format
+            return image, image.shape[0], 1
+        # get the applicable zarr scale (same choice as the image layer)
+        scaling = pixmap_dim[0] / (window[2] / source["mag"])
+        scale_level = scales[-1]
+        for scale in scales[:-1]:
+            if (1 / scaling) > scale:
+                scale_level = scale
+                break
+        image = zg[f"scale_{scale_level}"][source["src"]]
+        ih = zg[f"scale_{scales[-1]}"][source["src"]].shape[0] * scales[-1]
+        return image, ih, scale_level
+    else:
+        image = cv2.imread(os.path.join(source["src_dir"], source["src"]), cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            return None
+        return image, image.shape[0], 1
+
+def warpImageSource(source : dict, pixmap_dim : tuple, window : list, image : tuple = None):
+    """Render an image source in a field window without Qt (no brightness/contrast).
+    
+        Params:
+            source (dict): the image source from getImageSource
+            pixmap_dim (tuple): the w and h of the 2D array
+            window (list): the x, y, w, and h of the field window
+            image (tuple): the output of readImageSource, if already read
+        Returns:
+            (numpy.ndarray) the image as a numpy array
+    """
+    pmw, pmh = tuple(pixmap_dim)
+    if image is None:
+        image = readImageSource(source, pixmap_dim, window)
+    if image is None:
+        return np.zeros((pmh, pmw), dtype=np.uint8)
+    
+    image, ih, scale_level = image
+    return warpImageToWindow(
+        image,
+        window,
+        (pmw, pmh),
+        source["tform"],
+        source["mag"],
+        ih,
+        scale_level
+    )
+
+def warpSectionImage(section : Section, series : Series, pixmap_dim : tuple, window : list):
+    """Render a section image in a field window without Qt (no brightness/contrast).
+
+    The window is mapped straight back to the source image with a single
+    cv2.warpAffine, reading only the covered region of the best zarr scale,
+    so it is safe to call from worker threads, worker processes and headless
+    scripts.
+    
+        Params:
+            section (Section): the section object
+            series (Series): the series object
+            pixmap_dim (tuple): the w and h of the 2D array
+            window (list): the x, y, w, and h of the field window
+        Returns:
+            (numpy.ndarray) the image as a numpy array
+    """
+    return warpImageSource(
+        getImageSource(section, series),
+        pixmap_dim,
+        window
+    )
+
 def getBounds(points : list):
     """Get the bounding rectangle and shift in origin for a set of points.
     
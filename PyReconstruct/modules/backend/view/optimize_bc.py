@@ -1,9 +1,8 @@
 import os
-import cv2
-import zarr
 import numpy as np
 
 from PyReconstruct.modules.datatypes import Series, Section
+from PyReconstruct.modules.datatypes.image_stats import getImagePath
 from .section_layer import SectionLayer
 
 # just here for reference, not actually used
@@ -46,6 +45,21 @@ def adjustPixelsToStats(image, desired_mean, desired_std):
     current_mean = np.mean(image)
     current_std = np.std(image)
 
+    return adjustStatsToStats(current_mean, current_std, desired_mean, desired_std)
+
+def adjustStatsToStats(current_mean, current_std, desired_mean, desired_std):
+    """Get the brightness and contrast that take pixel statistics to the desired ones.
+
+    Params:
+        current_mean (float): The current mean of the pixels.
+        current_std (float): The current standard deviation of the pixels.
+        desired_mean (float): The target mean for the adjusted pixels.
+        desired_std (float): The target standard deviation for the adjusted pixels.
+
+    Returns:
+        brightness (float): The calculated brightness adjustment (-100 to 100).
+        contrast (float): The calculated contrast adjustment (-100 to 100).
+    """
     # Calculate the required brightness and contrast adjustments
     if abs(current_mean) > 1e-6:
         brightness = ((desired_mean - current_mean) / current_mean) * 100
@@ -74,26 +88,17 @@ def optimizeSectionBC(section : Section, desired_mean=128, desired_std=60, windo
     if not (os.path.isfile(fp) or os.path.isdir(fp)):
         return
     
-    # get the image array
-    if window is None:
-        try:
-            if os.path.isfile(fp):
-                image = cv2.imread(fp, cv2.IMREAD_GRAYSCALE)
-            else:  # get the smallest image if using a zarr
-                if lowest_res:
-                    scale_zg = f"scale_{max(section.zarr_scales)}"
-                else:
-                    scale_zg = f"scale_{min(section.zarr_scales)}"
-                fp = os.path.join(
-                    section.series.src_dir,
-                    scale_zg,
-                    section.src
-                )
-                image = zarr.open(fp, "r")[:]
-            cv2.resize(image, (1024, 1024))
-        except:
-            print(f"Image at {fp} is corrupt. Skipping...")
+    # get desired brightness and contrast
+    if window is None:  # from the stored histogram of the full image
+        fp = getImagePath(section.series.src_dir, section.src, lowest_res)
+        stats = section.series.getImageStats().getStats(fp) if fp else None
+        if stats is None:
             return
+        new_brightness, new_contrast = adjustStatsToStats(
+            *stats,
+            desired_mean,
+            desired_std
+        )
     else:
         slayer = SectionLayer(section, section.series)
         pixmap_dim = round(window[2] / section.mag), round(window[3] / section.mag)
@@ -101,32 +106,58 @@ def optimizeSectionBC(section : Section, desired_mean=128, desired_std=60, windo
         section.brightness, section.contrast = 0, 0  # reset the brightness and contrast
         image = slayer.generateImageArray(pixmap_dim, window, get_crop_only=True)
         section.brightness, section.contrast = b, c
+        new_brightness, new_contrast = adjustPixelsToStats(
+            image,
+            desired_mean,
+            desired_std
+        )
 
-    # get desired brightness and contrast
-    new_brightness, new_contrast = adjustPixelsToStats(
-        image,
-        desired_mean,
-        desired_std
-    )
     if new_brightness is not None:
         section.brightness = new_brightness
     if new_contrast is not None:
         section.contrast = new_contrast
     
-def optimizeSeriesBC(series : Series, desired_mean=128, desired_std=60, section_nums=None, window=None):
+def optimizeSeriesBC(series : Series, desired_mean=128, desired_std=60, section_nums=None, window=None, max_processes=None):
     """Optimize the brightness and contrast of the images for a series.
+
+    Full images are measured in worker processes (at the lowest zarr scale)
+    and their histograms are stored with the images, so optimizing the same
+    images again only applies the new targets.
     
         Params:
             series (Series): the series to optimize the brightness and contrast for
             desired_mean (int): the desired pixel average
             desired_std (float): the desired pixel standard deviation
-            section_nums (list): the section numbers to optimize
+            section_nums (list): the section numbers to optimize (all if None)
             window (list): the x, y, w, h window (None if using full images)
+            max_processes (int): the maximum number of worker processes (cpu count if None)
     """
-    for snum, section in series.enumerateSections():
-        if section_nums is not None and snum in section_nums:
+    if section_nums is None:
+        section_nums = list(series.sections.keys())
+    section_nums = [snum for snum in section_nums if snum in series.sections]
+    
+    ## The window view depends on each section's transform (measured here)
+    if window is not None:
+        for snum, section in series.enumerateSections(snums=section_nums):
             optimizeSectionBC(section, desired_mean, desired_std, window)
             section.save()
+        return
     
-        
+    ## Measure the images that have not been measured (canceled or unreadable images are skipped)
+    fps = series.updateImageStats(section_nums, max_processes=max_processes)
+    image_stats = series.getImageStats()
 
+    for snum, section in series.enumerateSections(
+        message="Optimizing images...",
+        snums=list(fps.keys())
+    ):
+        new_brightness, new_contrast = adjustStatsToStats(
+            *image_stats.getStats(fps[snum]),
+            desired_mean,
+            desired_std
+        )
+        if new_brightness is not None:
+            section.brightness = new_brightness
+        if new_contrast is not None:
+            section.contrast = new_contrast
+        section.save()
@@ -325,7 +325,7 @@ class TraceLayer():
                 trace_layer (QPixmap): the pixmap to draw the point
                 points (list): the list of points to draw
         """
-        points, lines = ztrace.getSectionData(self.series, self.section)
+        points, lines = self.series.ztrace_index.getSectionData(ztrace, self.section)
         # convert to screen coordinates
         qpoints = []
         for pt in points:
@@ -5,6 +5,7 @@ import trimesh
 
 from PyReconstruct.modules.calc import centroid
 from PyReconstruct.modules.datatypes import Trace, Transform, Series
+from PyReconstruct.modules.datatypes.ztrace import getFieldPoints, mapPoints
 
 
 def exportMesh(tm, output_file, export_type):
@@ -336,21 +337,13 @@ class Ztrace3D(Object3D):
         thickness = self.series.avg_thickness
 
         ztrace = self.series.ztraces[self.name]
-        pts = []
-        for pt in ztrace.points:
-            # get coords
-            x, y, s = pt
+        for x, y, s in ztrace.points:
             self.addToExtremes(x, y, s)
 
-            # get appropriate tform
-            alignment = self.series.getAttr(self.name, "alignment", ztrace=True)
-            if not alignment: alignment = self.series.alignment
-            tform = self.series.data["sections"][s]["tforms"][alignment]
-
-            # get real field coord point
-            x, y = tform.map(x, y)
-            z = s * thickness
-            pts.append((x, y, z))
+        # get real field coord points (transforms looked up in the section table)
+        field_pts, snums, tforms, _ = getFieldPoints(self.series, [ztrace])
+        field_pts = mapPoints(field_pts, tforms)
+        pts = [(x, y, s * thickness) for (x, y), s in zip(field_pts.tolist(), snums.tolist())]
         
         d = ztrace.getDistance(self.series)
         color = ztrace.color
@@ -17,7 +17,9 @@ from .quantification import (
     colorize,
     ellipseFromPair,
     rolling_average,
-    interpolate_points
+    moving_average,
+    interpolate_points,
+    interpolate_array
 )
 from .feret import (
     feret
@@ -30,6 +32,8 @@ from .grid import (
 )
 from .image import (
     getImgDims,
-    point_list_2_pix
+    point_list_2_pix,
+    toGrayscale8,
+    warpImageToWindow
 )
 from .correlation import correlate
@@ -1,7 +1,7 @@
 import cv2
 import numpy as np
 
-from .polygon import cut_closed_traces, cut_open_traces
+from .polygon import cut_closed_traces, cut_open_traces, merge_closed_traces
 
 
 class Grid():
@@ -258,14 +258,22 @@ def getExterior(points : list) -> list:
     else:
         return []
 
-def mergeTraces(trace_list : list) -> list:
+def mergeTraces(trace_list : list, vector : bool = False) -> list:
     """Get the exterior(s) of a set of traces.
+
+    The raster merge draws integer (pixel) traces on a grid and traces the
+    outline; the vector merge takes the exact polygon union and works on
+    traces in any (e.g. field) coordinates.
     
         Params:
             trace_list (list): set of traces
+            vector (bool): True if the traces should be merged as polygons
         Returns:
             (list) merged set of traces
     """
+    if vector:
+        return merge_closed_traces(trace_list)
+    
     grid = Grid(trace_list)
     new_traces = grid.getExterior()
     for i in range(len(new_traces)):
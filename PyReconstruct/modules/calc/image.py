@@ -3,6 +3,7 @@ from typing import List, Tuple, Sequence, Union
 
 import cv2
 import zarr
+import numpy as np
 
 width = int
 height = int
@@ -54,3 +55,137 @@ def point_list_2_pix(
     return list(mapped_points)
                 
         
+
+
+def windowToImageMatrix(
+        window: Sequence[float],
+        pixmap_dim: Tuple[width, height],
+        tform_list: Sequence[float],
+        mag: float,
+        img_height: float,
+        scale: int = 1
+) -> np.ndarray:
+    """Return the 3x3 matrix mapping output pixels in a field window to source image pixels.
+
+        Params:
+            window (list): the x, y, w, and h of the field window
+            pixmap_dim (tuple): the w and h of the output array
+            tform_list (list): the six-number section transform
+            mag (float): the microns per pixel of the full-resolution image
+            img_height (float): the height (in pixels) of the full-resolution image
+            scale (int): the downsampling factor of the source image (zarr scale level)
+        Returns:
+            (np.ndarray): the 3x3 affine matrix (output col, row -> source col, row)
+    """
+    wx, wy, ww, wh = window
+    pmw, pmh = pixmap_dim
+
+    # output pixel centers -> field coordinates (y axis up)
+    sx, sy = ww / pmw, wh / pmh
+    out_to_field = np.array([
+        [sx, 0, wx + 0.5 * sx],
+        [0, -sy, wy + wh - 0.5 * sy],
+        [0, 0, 1]
+    ])
+
+    # field coordinates -> untransformed image coordinates (microns)
+    t = tform_list
+    field_to_img = np.linalg.inv(np.array([
+        [t[0], t[1], t[2]],
+        [t[3], t[4], t[5]],
+        [0, 0, 1]
+    ]))
+
+    # microns -> source pixel centers (y axis down)
+    k = 1 / (mag * scale)
+    img_to_src = np.array([
+        [k, 0, -0.5],
+        [0, -k, img_height / scale - 0.5],
+        [0, 0, 1]
+    ])
+
+    return img_to_src @ field_to_img @ out_to_field
+
+
+def toGrayscale8(image: np.ndarray) -> np.ndarray:
+    """Convert image pixels to the 8-bit grayscale values that are displayed.
+
+        Params:
+            image (np.ndarray): the image pixels (the first channel is used for color images)
+        Returns:
+            (np.ndarray): the uint8 pixels (16-bit values are scaled down)
+    """
+    if image.ndim == 3:
+        image = image[:, :, 0]
+    if image.dtype == np.uint16:
+        image = (image // 257).astype(np.uint8)
+    elif image.dtype != np.uint8:
+        image = np.clip(image, 0, 255).astype(np.uint8)
+    return image
+
+
+def warpImageToWindow(
+        image,
+        window: Sequence[float],
+        pixmap_dim: Tuple[width, height],
+        tform_list: Sequence[float],
+        mag: float,
+        img_height: float,
+        scale: int = 1,
+        interpolation: int = cv2.INTER_NEAREST
+) -> np.ndarray:
+    """Render the part of a transformed image that falls in a field window.
+
+    Only the region of the source covered by the window is read, so image can
+    be a lazily-loaded array (e.g. a zarr array). Areas outside the image are
+    black.
+
+        Params:
+            image: the 2D source image (np.ndarray or zarr array)
+            window (list): the x, y, w, and h of the field window
+            pixmap_dim (tuple): the w and h of the output array
+            tform_list (list): the six-number section transform
+            mag (float): the microns per pixel of the full-resolution image
+            img_height (float): the height (in pixels) of the full-resolution image
+            scale (int): the downsampling factor of image relative to full resolution
+            interpolation (int): the cv2 interpolation flag
+        Returns:
+            (np.ndarray): the (h, w) uint8 output array
+    """
+    pmw, pmh = pixmap_dim
+    out = np.zeros((pmh, pmw), dtype=np.uint8)
+
+    matrix = windowToImageMatrix(window, pixmap_dim, tform_list, mag, img_height, scale)
+
+    # find the source region covered by the window
+    corners = np.array([
+        [-0.5, -0.5, 1],
+        [pmw - 0.5, -0.5, 1],
+        [pmw - 0.5, pmh - 0.5, 1],
+        [-0.5, pmh - 0.5, 1]
+    ]).T
+    src_corners = (matrix @ corners)[:2]
+    ih, iw = image.shape[:2]
+    c0, r0 = (max(int(np.floor(n)) - 1, 0) for n in src_corners.min(axis=1))
+    c1 = min(int(np.ceil(src_corners[0].max())) + 2, iw)
+    r1 = min(int(np.ceil(src_corners[1].max())) + 2, ih)
+    if c0 >= c1 or r0 >= r1:
+        return out
+
+    crop = np.ascontiguousarray(toGrayscale8(image[r0:r1, c0:c1]))
+
+    # shift the matrix into the crop's coordinates
+    matrix[0, 2] -= c0
+    matrix[1, 2] -= r0
+
+    cv2.warpAffine(
+        crop,
+        matrix[:2],
+        (pmw, pmh),
+        dst=out,
+        flags=interpolation | cv2.WARP_INVERSE_MAP,
+        borderMode=cv2.BORDER_CONSTANT,
+        borderValue=0
+    )
+
+    return out
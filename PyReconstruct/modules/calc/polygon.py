@@ -3,6 +3,7 @@
 from typing import Any, List
 import numpy as np
 
+from shapely import make_valid, unary_union
 from shapely.geometry import (
     Polygon,
     GeometryCollection,
@@ -13,6 +14,43 @@ from shapely.geometry import (
 )
 
 
+def merge_closed_traces(trace_list) -> List[Any]:
+    """Merge closed polygons into the exteriors of their union."""
+
+    polys = []
+
+    for trace in trace_list:
+
+        if len(trace) < 3:
+            continue
+
+        poly = Polygon(trace)
+
+        # Repair self-intersecting traces rather than skipping them
+        if not poly.is_valid:
+            poly = make_valid(poly)
+
+        polys.append(poly)
+
+    if not polys:
+        return []
+
+    union = unary_union(polys)
+
+    # Collect the polygons (make_valid may leave lines or points behind)
+    if isinstance(union, Polygon):
+        parts = [union]
+    elif hasattr(union, "geoms"):
+        parts = [g for g in union.geoms if isinstance(g, Polygon)]
+    else:
+        parts = []
+
+    # Holes are dropped, as with the raster merge
+    return [
+        list(p.exterior.coords)[:-1] for p in parts if not p.is_empty
+    ]
+
+
 def cut_closed_traces(trace_list, cut_trace, del_threshold=0.0) -> List[Any]:
     """Cut closed polygons."""
 
@@ -6,8 +6,6 @@ import cv2
 import numpy as np
 from typing import List
 
-from scipy.interpolate import interp1d
-
 
 def area(pts : list) -> float:
     """Find the area of a closed contour.
@@ -278,68 +276,101 @@ def get_window_points(points, idx, max_size, edge_mode):
         return window_x, window_y
 
 
-def rolling_average(points, window=10, edge_mode="padded"):
-    """Smooth z-trace with configurable edge handling.
+def moving_average(points : np.ndarray, window=10, edge_mode="padded") -> np.ndarray:
+    """Get the moving average of an array of points (same windows as get_window_points).
     
     Params:
-        series (Series): the series object (contains transform data)
-        smooth (int): the smoothing factor
+        points (np.ndarray): (n, 2) array of x and y coordinates
+        window (int): the maximum window size
         edge_mode (str): how to handle edges - "padded", "shrinking", or "circular"
+    Returns:
+        (np.ndarray): (n, 2) array of averaged coordinates
     """
     if edge_mode not in ["padded", "shrinking", "circular"]:
         raise ValueError("edge_mode must be 'padded', 'shrinking', or 'circular'")
+    
+    n = len(points)
+    half = window // 2
+    if n == 0:
+        return np.zeros((0, 2))
 
-    new_points = [None] * len(points)
+    if edge_mode == "shrinking":
 
-    # Process each point
-    for i in range(len(points)):
-        
-        ## Get window points
-        window_x, window_y = get_window_points(points, i, window, edge_mode)
+        ## Window half-size grows from 0 at the ends up to half in the middle
+        idx = np.arange(n)
+        halves = np.minimum(np.minimum(idx, n - 1 - idx), half)
+        sums = np.zeros((n + 1, 2))
+        np.cumsum(points, axis=0, out=sums[1:])
         
-        ## Calculate moving average
-        window_size = len(window_x)  # window len variable depending on edge mode
-        xMA = sum(window_x) / window_size
-        yMA = sum(window_y) / window_size
-        
-        ## Update point with smoothed values
-        new_points[i] = (
-            round(xMA, 4),
-            round(yMA, 4)
-        )
+        return (sums[idx + halves + 1] - sums[idx - halves]) / (2 * halves + 1)[:, None]
+    
+    ## Extend the points past the ends and convolve with a flat kernel
+    idx = np.arange(-half, n + half)
+    if edge_mode == "circular":
+        idx %= n
+    else:  # padded
+        idx = np.clip(idx, 0, n - 1)
+    extended = points[idx]
+    kernel = np.ones(2 * half + 1)
 
-    return new_points
+    return np.column_stack([
+        np.convolve(extended[:, 0], kernel, mode="valid"),
+        np.convolve(extended[:, 1], kernel, mode="valid"),
+    ]) / (2 * half + 1)
 
 
-def interpolate_points(points: List[tuple], spacing=0.01):
-    """Interpolate points around a path."""
+def rolling_average(points, window=10, edge_mode="padded"):
+    """Smooth z-trace with configurable edge handling.
+    
+    Params:
+        points (list): list of (x, y) points
+        window (int): the maximum window size
+        edge_mode (str): how to handle edges - "padded", "shrinking", or "circular"
+    Returns:
+        (list): the averaged points, rounded to four decimals
+    """
+    if edge_mode not in ["padded", "shrinking", "circular"]:
+        raise ValueError("edge_mode must be 'padded', 'shrinking', or 'circular'")
+    
+    if len(points) == 0:
+        return []
 
-    x, y = zip(*points)
+    arr = np.array([p[:2] for p in points], dtype=float)
+    averages = np.round(moving_average(arr, window, edge_mode), 4)
 
-    ## Calculate cumulative arc lengths (distances between consecutive points)
-    distances = [0]
+    return [tuple(p) for p in averages.tolist()]
+
+
+def interpolate_array(points : np.ndarray, spacing=0.01) -> np.ndarray:
+    """Resample a path at equal arc-length intervals.
     
-    for i in range(1, len(points)):
-        
-        distances.append(
-            distances[-1] + euclidean_distance(points[i-1], points[i])
-        )
+    Params:
+        points (np.ndarray): (n, 2) array of points along the path
+        spacing (float): the approximate distance between new points
+    Returns:
+        (np.ndarray): (m, 2) array of points (rounded to five decimals)
+    """
+    ## Calculate cumulative arc lengths (distances between consecutive points)
+    distances = np.zeros(len(points))
+    np.cumsum(np.hypot(*np.diff(points, axis=0).T), out=distances[1:])
 
     ## Total path length
     total_length = distances[-1]
 
-    ## Interpolate curve using parametric functions
-    interp_x = interp1d(distances, x)
-    interp_y = interp1d(distances, y)
-
     # Generate new distances at equal intervals
     num_new_points = int(total_length / spacing)
     new_distances = np.linspace(0, total_length, num_new_points)
 
     # Interpolate new points at these distances
-    x_new = [round(elem, 5) for elem in interp_x(new_distances)]
-    y_new = [round(elem, 5) for elem in interp_y(new_distances)]
+    return np.round(np.column_stack([
+        np.interp(new_distances, distances, points[:, 0]),
+        np.interp(new_distances, distances, points[:, 1]),
+    ]), 5)
 
-    return list(
-        zip(x_new, y_new)
-    )
+
+def interpolate_points(points: List[tuple], spacing=0.01):
+    """Interpolate points around a path."""
+
+    interpolated = interpolate_array(np.array(points, dtype=float), spacing)
+
+    return [tuple(p) for p in interpolated.tolist()]
@@ -3,12 +3,14 @@ from .section import Section
 from .transform import Transform
 from .contour import Contour
 from .trace import Trace
-from .ztrace import Ztrace
+from .ztrace import Ztrace, ZtraceIndex
 from .flag import Flag
 from .points import Points
 
 from .obj_group_dict import ObjGroupDict
+from .attr_store import AttrStore
+from .image_stats import ImageStats
 
 from .series_data import SeriesData, ObjectData, TraceData
 
-from .log import LogSet, LogSetPair, Log
+from .log import LogSet, LogSetPair, LogCSV, Log
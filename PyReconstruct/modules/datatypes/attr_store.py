@@ -0,0 +1,188 @@
+import json
+import sqlite3
+from contextlib import closing
+
+
+class AttrStore():
+
+    keys = ("obj_attrs", "object_groups", "host_tree", "user_columns")
+
+    def __init__(self, db_fp : str):
+        """Create the SQLite store for the object attributes of a series.
+
+        Holds the object attributes, object groups, host tree and user columns
+        in place of the series JSON. Writes are transactional; the object rows
+        are rewritten only for the objects the series marks as modified.
+
+            Params:
+                db_fp (str): the filepath to the SQLite database
+        """
+        self.db_fp = db_fp
+        self.written = None  # the groups, hosts and user columns as last written/loaded (to find changes)
+
+        with closing(self.connect()) as conn, conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS obj_attrs (
+                    name TEXT PRIMARY KEY,
+                    attrs TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS user_col_values (
+                    name TEXT NOT NULL,
+                    col TEXT NOT NULL,
+                    value TEXT,
+                    PRIMARY KEY (name, col)
+                );
+                CREATE TABLE IF NOT EXISTS object_groups (
+                    grp TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    PRIMARY KEY (grp, name)
+                );
+                CREATE TABLE IF NOT EXISTS hosts (
+                    name TEXT NOT NULL,
+                    host TEXT NOT NULL,
+                    PRIMARY KEY (name, host)
+                );
+                CREATE TABLE IF NOT EXISTS user_columns (
+                    col TEXT PRIMARY KEY,
+                    opts TEXT NOT NULL
+                );
+            """)
+
+    def connect(self) -> sqlite3.Connection:
+        """Open a connection to the database (closed after each operation so
+        that the hidden folder can be moved)."""
+        return sqlite3.connect(self.db_fp)
+
+    # STATIC METHOD
+    def getRows(data : dict, names : set) -> dict:
+        """Get the rows for each table from the series attribute data.
+
+            Params:
+                data (dict): the obj_attrs, object_groups, host_tree and user_columns (in JSON format)
+                names (set): the objects to get the attribute rows for
+            Returns:
+                (dict): table name : row data
+        """
+        obj_attrs = {
+            name : json.dumps(data["obj_attrs"][name], sort_keys=True)
+            for name in names if name in data["obj_attrs"]
+        }
+        user_col_values = set()
+        for name in obj_attrs:
+            for col, value in data["obj_attrs"][name].get("user_columns", {}).items():
+                user_col_values.add((name, col, value))
+        object_groups = set()
+        for group, group_names in data["object_groups"].items():
+            for name in group_names:
+                object_groups.add((group, name))
+        hosts = set()
+        for name, obj_hosts in data["host_tree"].items():
+            for host in obj_hosts:
+                hosts.add((name, host))
+        user_columns = {
+            col : json.dumps(opts)
+            for col, opts in data["user_columns"].items()
+        }
+
+        return {
+            "obj_attrs" : obj_attrs,
+            "user_col_values" : user_col_values,
+            "object_groups" : object_groups,
+            "hosts" : hosts,
+            "user_columns" : user_columns
+        }
+
+    def write(self, data : dict, names : set = None):
+        """Write the series attributes to the store in a single transaction.
+
+            Params:
+                data (dict): the obj_attrs, object_groups, host_tree and user_columns (in JSON format)
+                names (set): the objects whose attributes changed since the last write (None if every object should be written)
+        """
+        if self.written is None:
+            self.load()
+        old = self.written
+
+        with closing(self.connect()) as conn, conn:
+            if names is None:
+                names = set(data["obj_attrs"]).union(
+                    name for name, in conn.execute("SELECT name FROM obj_attrs")
+                )
+            rows = AttrStore.getRows(data, names)
+
+            # object rows: rewrite the changed objects
+            for table in ("obj_attrs", "user_col_values"):
+                conn.executemany(
+                    f"DELETE FROM {table} WHERE name = ?",
+                    [(name,) for name in names]
+                )
+            conn.executemany(
+                "INSERT INTO obj_attrs (name, attrs) VALUES (?, ?)",
+                rows["obj_attrs"].items()
+            )
+            conn.executemany(
+                "INSERT INTO user_col_values (name, col, value) VALUES (?, ?, ?)",
+                rows["user_col_values"]
+            )
+
+            # user columns: replace changed options and delete removed columns
+            conn.executemany(
+                "DELETE FROM user_columns WHERE col = ?",
+                [(col,) for col in old["user_columns"].keys() - rows["user_columns"].keys()]
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO user_columns (col, opts) VALUES (?, ?)",
+                [(col, opts) for col, opts in rows["user_columns"].items() if old["user_columns"].get(col) != opts]
+            )
+
+            # set tables: delete removed rows and insert added rows
+            for table, columns in (
+                ("object_groups", ("grp", "name")),
+                ("hosts", ("name", "host"))
+            ):
+                conn.executemany(
+                    f"DELETE FROM {table} WHERE " + " AND ".join(f"{c} = ?" for c in columns),
+                    old[table] - rows[table]
+                )
+                conn.executemany(
+                    f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                    rows[table] - old[table]
+                )
+
+        self.written = {
+            "object_groups" : rows["object_groups"],
+            "hosts" : rows["hosts"],
+            "user_columns" : rows["user_columns"]
+        }
+
+    def load(self) -> dict:
+        """Load the series attributes from the store.
+
+            Returns:
+                (dict): the obj_attrs, object_groups, host_tree and user_columns (in JSON format)
+        """
+        with closing(self.connect()) as conn:
+            obj_attrs = dict(conn.execute("SELECT name, attrs FROM obj_attrs"))
+            object_groups = set(conn.execute("SELECT grp, name FROM object_groups"))
+            hosts = set(conn.execute("SELECT name, host FROM hosts"))
+            user_columns = dict(conn.execute("SELECT col, opts FROM user_columns"))
+
+        self.written = {
+            "object_groups" : object_groups,
+            "hosts" : hosts,
+            "user_columns" : user_columns
+        }
+
+        groups_dict = {}
+        for group, name in object_groups:
+            groups_dict.setdefault(group, []).append(name)
+        host_dict = {}
+        for name, host in hosts:
+            host_dict.setdefault(name, []).append(host)
+
+        return {
+            "obj_attrs" : {name : json.loads(attrs) for name, attrs in obj_attrs.items()},
+            "object_groups" : groups_dict,
+            "host_tree" : host_dict,
+            "user_columns" : {col : json.loads(opts) for col, opts in user_columns.items()}
+        }
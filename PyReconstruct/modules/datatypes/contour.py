@@ -1,3 +1,5 @@
+import numpy as np
+
 from .trace import Trace
 from .flag import Flag
 
@@ -112,6 +114,131 @@ class Contour():
 
         return (xmax + xmin) / 2, (ymax + ymin) / 2
 
+    def findDuplicates(self, threshold : float, max_cells : int = 64) -> list:
+        """Find the traces that duplicate a later trace in the contour.
+
+        Each trace is compared against the earlier surviving traces, nearest
+        first, and the first one that it overlaps is marked as removed (the
+        same pairs as checking every trace against every earlier trace). The
+        traces are bucketed on a grid of their bounding boxes so only traces
+        with intersecting bounds are candidates. Candidates with identical
+        points are matched without an overlap check, and candidates whose
+        areas bound the overlap ratio below the threshold are skipped.
+        
+            Params:
+                threshold (float): the overlap threshold (see Trace.overlaps)
+                max_cells (int): traces covering more grid cells are compared with every trace
+            Returns:
+                (list): (removed index, kept index) pairs, in the order they were found
+        """
+        n = len(self.traces)
+        if n < 2:
+            return []
+        
+        ## Gather the bounds, areas and perimeters
+        bounds = np.empty((n, 4))
+        areas = np.empty(n)
+        perimeters = np.empty(n)
+        closed = np.empty(n, dtype=bool)
+        keys = []
+        for i, trace in enumerate(self.traces):
+            pts = np.array(trace.points, dtype=float).reshape(-1, 2)
+            bounds[i] = (*pts.min(axis=0), *pts.max(axis=0))
+            x, y = pts[:,0], pts[:,1]
+            xn, yn = np.roll(x, -1), np.roll(y, -1)
+            areas[i] = abs(np.dot(x, yn) - np.dot(xn, y)) / 2
+            perimeters[i] = np.hypot(xn - x, yn - y).sum()
+            closed[i] = trace.closed
+            keys.append((trace.closed, np.round(pts, 2).tobytes()))
+        
+        ## Grid of bounding boxes (cell size is the median trace extent)
+        extents = np.maximum(bounds[:,2] - bounds[:,0], bounds[:,3] - bounds[:,1])
+        cell_size = float(np.median(extents)) or 1.0
+        cells = np.floor(bounds / cell_size).astype(np.int64)
+        grid = {}
+        large = []
+
+        alive = np.ones(n, dtype=bool)
+        by_key = {}
+        pairs = []
+
+        for i in range(n):
+            cx0, cy0, cx1, cy1 = cells[i]
+            covered = (cx1 - cx0 + 1) * (cy1 - cy0 + 1)
+            if covered > max_cells:
+                candidates = set(range(i))
+            else:
+                candidates = set(large)
+                for cx in range(cx0, cx1 + 1):
+                    for cy in range(cy0, cy1 + 1):
+                        candidates.update(grid.get((cx, cy), ()))
+            
+            # the nearest earlier trace with the same points is a match
+            match = None
+            for j in reversed(by_key.get(keys[i], ())):
+                if alive[j]:
+                    match = j
+                    break
+            
+            # only traces nearer than that match need an overlap check
+            candidates = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+            if match is not None:
+                candidates = candidates[candidates > match]
+            candidates = candidates[alive[candidates] & (closed[candidates] == closed[i])]
+            candidates = candidates[
+                Contour.getOverlapBound(bounds, areas, perimeters, i, candidates) > threshold
+            ]
+            for j in np.sort(candidates)[::-1]:
+                if self.traces[i].overlaps(self.traces[j], threshold=threshold):
+                    match = int(j)
+                    break
+            
+            if match is not None:
+                alive[match] = False
+                pairs.append((match, i))
+            
+            # add the trace to the index
+            by_key.setdefault(keys[i], []).append(i)
+            if covered > max_cells:
+                large.append(i)
+            else:
+                for cx in range(cx0, cx1 + 1):
+                    for cy in range(cy0, cy1 + 1):
+                        grid.setdefault((cx, cy), []).append(i)
+        
+        return pairs
+    
+    # STATIC METHOD
+    def getOverlapBound(bounds, areas, perimeters, i, candidates):
+        """Get an upper bound on the overlap ratio of trace i with each candidate.
+
+        The ratio is at most the smaller of the two areas (or the intersection
+        of the bounding boxes) over the larger area. Each area is padded by
+        two pixels of a 1e4 pixel raster over the combined bounds along its
+        perimeter, so the bound also holds for raster overlap ratios.
+        """
+        b = bounds[candidates]
+        xmin = np.minimum(b[:,0], bounds[i,0])
+        ymin = np.minimum(b[:,1], bounds[i,1])
+        xmax = np.maximum(b[:,2], bounds[i,2])
+        ymax = np.maximum(b[:,3], bounds[i,3])
+        pixel = np.sqrt((xmax - xmin) * (ymax - ymin) / 1e4)
+        pad = 2 * pixel
+
+        inter_w = np.minimum(b[:,2], bounds[i,2]) - np.maximum(b[:,0], bounds[i,0]) + 2 * pad
+        inter_h = np.minimum(b[:,3], bounds[i,3]) - np.maximum(b[:,1], bounds[i,1]) + 2 * pad
+        inter = np.clip(inter_w, 0, None) * np.clip(inter_h, 0, None)
+
+        hi_i = areas[i] + pad * perimeters[i]
+        hi_c = areas[candidates] + pad * perimeters[candidates]
+        lo = np.maximum(
+            areas[i] - pad * perimeters[i],
+            areas[candidates] - pad * perimeters[candidates]
+        )
+        upper = np.minimum(np.minimum(hi_i, hi_c), inter)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(lo > 0, upper / np.where(lo > 0, lo, 1), np.inf)
+
     def importTraces(self, other, threshold : float = 0.95, keep_above : str = "self"):
         """Import all of the traces from another contour.
         
@@ -151,20 +278,26 @@ class Contour():
         # gather remaining traces that aren't the same between series
         rem_s_traces = self[i:]
         rem_o_traces = other[i:]
-        first_comparison = True
-        for o_trace in rem_o_traces.copy():
-            found_i = None
-            for i, s_trace in enumerate(rem_s_traces):
-                if first_comparison:  # skip the first comparison -- we already know its false
-                    first_comparison = False
-                    continue
-                if s_trace.overlaps(o_trace, threshold=0.95):
-                    addDuplicate(s_trace, o_trace, traces)
-                    found_i = i
+
+        # find all of the overlapping pairs at once
+        candidates = {}  # other index : sorted self indices
+        for si, oi in Trace.getOverlappingPairs(rem_s_traces, rem_o_traces, threshold=0.95):
+            if si == oi == 0:  # skip the first comparison -- we already know its false
+                continue
+            candidates.setdefault(oi, []).append(si)
+        
+        # match each other trace to the first unmatched self trace it overlaps
+        matched_s = set()
+        matched_o = set()
+        for oi, o_trace in enumerate(rem_o_traces):
+            for si in candidates.get(oi, ()):
+                if si not in matched_s:
+                    addDuplicate(rem_s_traces[si], o_trace, traces)
+                    matched_s.add(si)
+                    matched_o.add(oi)
                     break
-            if found_i is not None:
-                rem_s_traces.pop(found_i)
-                rem_o_traces.remove(o_trace)
+        rem_s_traces = [t for si, t in enumerate(rem_s_traces) if si not in matched_s]
+        rem_o_traces = [t for oi, t in enumerate(rem_o_traces) if oi not in matched_o]
         traces += rem_s_traces + rem_o_traces
         
         # replace traces list with new list
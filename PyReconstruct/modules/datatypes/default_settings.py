@@ -46,6 +46,12 @@ default_settings = {
     "utc": False,  # MFO
     "cpu_max": 100, 
 
+    # undo history (0 = unlimited)
+    "undo_section_states": 200,  # undo states kept per section
+    "undo_section_mb": 64.0,  # memory held by a section's undo states
+    "undo_series_states": 10000,  # undo states kept across all sections
+    "undo_series_mb": 512.0,  # memory held before cold sections are moved to disk
+
     # view
     "3D_xy_res": 0,  # 0-100  # MFO
     "3D_smoothing": "humphrey",  # MFO
@@ -61,6 +67,7 @@ default_settings = {
     # mouse tools
     "pointer": ["lasso", "exc"],  # MFO
     "auto_merge": False,  # MFO
+    "vector_merge": True,  # MFO
     "roll_average": False,
     "roll_window": 10,
     "roll_knife_average": False,
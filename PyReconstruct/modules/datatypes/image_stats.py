@@ -0,0 +1,223 @@
+import os
+import sqlite3
+from contextlib import closing
+
+import cv2
+import zarr
+import numpy as np
+
+from PyReconstruct.modules.calc import toGrayscale8
+
+
+def getImagePath(src_dir : str, src : str, lowest_res=True):
+    """Get the filepath of a section image (the lowest or highest zarr scale).
+
+        Params:
+            src_dir (str): the image directory of the series
+            src (str): the image name of the section
+            lowest_res (bool): True if the lowest resolution zarr scale should be used
+        Returns:
+            (str): the image filepath (None if the image does not exist)
+    """
+    if src_dir.endswith("zarr"):
+        if not os.path.isdir(src_dir):
+            return None
+        scales = [
+            int(s.split("_")[1])
+            for s in os.listdir(src_dir)
+            if (
+                s.startswith("scale_") and
+                s.split("_")[1].isnumeric() and
+                os.path.exists(os.path.join(src_dir, s, src))
+            )
+        ]
+        if not scales:
+            return None
+        scale = max(scales) if lowest_res else min(scales)
+        return os.path.join(src_dir, f"scale_{scale}", src)
+    else:
+        fp = os.path.join(src_dir, src)
+        return fp if os.path.isfile(fp) else None
+
+def getImageHistogram(fp : str, max_pixels : int = 2**22):
+    """Get the 256-bin grayscale histogram of an image (run in a worker process).
+
+    Images with more than max_pixels pixels are sampled on a regular grid.
+
+        Params:
+            fp (str): the image filepath (an image file or a zarr array)
+            max_pixels (int): the maximum number of pixels to count
+        Returns:
+            (np.ndarray): the pixel count for each value 0-255 (None if the image cannot be read)
+    """
+    try:
+        if os.path.isfile(fp):
+            image = cv2.imread(fp, cv2.IMREAD_GRAYSCALE)
+            shape = image.shape
+        else:
+            image = zarr.open(fp, "r")
+            shape = image.shape
+        step = max(1, int(np.ceil(np.sqrt(shape[0] * shape[1] / max_pixels))))
+        sample = np.asarray(image[::step, ::step])
+    except Exception:
+        print(f"Image at {fp} is corrupt. Skipping...")
+        return None
+
+    # count the values as they are displayed
+    return np.bincount(toGrayscale8(sample).ravel(), minlength=256)
+
+
+class ImageStats():
+
+    fname = ".pyrecon_image_stats.db"
+    version = 2  # stored histograms from other versions are measured again
+
+    def __init__(self, src_dir : str, fallback_dir : str):
+        """Create the persistent histogram cache for the images of a series.
+
+        The histograms are kept in a SQLite database in the image directory (or
+        in the fallback directory if the image directory cannot be written to).
+        Each image (each scale of a zarr) is keyed by its path relative to the
+        image directory and is measured again only if its modification time
+        changes.
+
+            Params:
+                src_dir (str): the image directory of the series
+                fallback_dir (str): the directory for the database if src_dir is read-only
+        """
+        self.src_dir = src_dir
+        if os.path.isdir(src_dir) and os.access(src_dir, os.W_OK):
+            self.db_fp = os.path.join(src_dir, ImageStats.fname)
+        else:
+            self.db_fp = os.path.join(fallback_dir, ImageStats.fname)
+        self.hists = None  # (relative path, mtime) : histogram (the whole database, read once)
+
+        with closing(self.connect()) as conn, conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] != ImageStats.version:
+                conn.execute("DROP TABLE IF EXISTS histograms")
+                conn.execute(f"PRAGMA user_version = {ImageStats.version}")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS histograms (
+                    path TEXT PRIMARY KEY,
+                    mtime INTEGER NOT NULL,
+                    hist BLOB NOT NULL
+                )
+            """)
+
+    def connect(self) -> sqlite3.Connection:
+        """Open a connection to the database (closed after each operation)."""
+        return sqlite3.connect(self.db_fp)
+
+    def load(self) -> dict:
+        """Read every stored histogram in a single query.
+
+            Returns:
+                (dict): (relative path, mtime) : histogram
+        """
+        if self.hists is None:
+            with closing(self.connect()) as conn:
+                self.hists = {
+                    (path, mtime) : np.frombuffer(hist, dtype=np.int64)
+                    for path, mtime, hist in conn.execute("SELECT path, mtime, hist FROM histograms")
+                }
+        return self.hists
+
+    def getKey(self, fp : str):
+        """Get the cache key for an image.
+
+            Params:
+                fp (str): the image filepath
+            Returns:
+                (tuple): the path relative to the image directory and the modification time
+        """
+        return (
+            os.path.relpath(fp, self.src_dir).replace(os.sep, "/"),
+            os.stat(fp).st_mtime_ns
+        )
+
+    def getHistogram(self, fp : str, measure=True):
+        """Get the histogram of an image.
+
+            Params:
+                fp (str): the image filepath
+                measure (bool): True if the image should be read if its histogram is not stored
+            Returns:
+                (np.ndarray): the 256-bin histogram (None if not stored and not measured)
+        """
+        if not os.path.exists(fp):
+            return None
+        key = self.getKey(fp)
+        hists = self.load()
+        if key not in hists and measure:
+            hist = getImageHistogram(fp)
+            if hist is None:
+                return None
+            self.setHistograms({fp : hist})
+
+        return hists.get(key)
+
+    def setHistograms(self, hists : dict):
+        """Store the histograms of a set of images in a single transaction.
+
+            Params:
+                hists (dict): image filepath : 256-bin histogram
+        """
+        stored = self.load()
+        rows = []
+        for fp, hist in hists.items():
+            key = self.getKey(fp)
+            hist = np.asarray(hist, dtype=np.int64)
+            stored[key] = hist
+            rows.append((*key, hist.tobytes()))
+        with closing(self.connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO histograms (path, mtime, hist) VALUES (?, ?, ?)",
+                rows
+            )
+
+    def getMissing(self, fps : list) -> list:
+        """Get the existing images that do not have a stored histogram.
+
+            Params:
+                fps (list): the image filepaths
+            Returns:
+                (list): the filepaths that have to be measured
+        """
+        hists = self.load()
+        return [
+            fp for fp in fps
+            if os.path.exists(fp) and self.getKey(fp) not in hists
+        ]
+
+    def getStats(self, fp : str):
+        """Get the pixel mean and standard deviation of an image.
+
+            Params:
+                fp (str): the image filepath
+            Returns:
+                (float): the pixel mean
+                (float): the pixel standard deviation
+                (None if the image cannot be read)
+        """
+        hist = self.getHistogram(fp)
+        if hist is None:
+            return None
+        return ImageStats.histStats(hist)
+
+    # STATIC METHOD
+    def histStats(hist : np.ndarray):
+        """Get the mean and standard deviation of the pixels counted in a histogram.
+
+            Params:
+                hist (np.ndarray): the 256-bin histogram
+            Returns:
+                (float): the pixel mean
+                (float): the pixel standard deviation
+        """
+        n = hist.sum()
+        if n == 0:
+            return 0.0, 0.0
+        values = np.arange(len(hist))
+        mean = (hist * values).sum() / n
+        std = np.sqrt((hist * (values - mean) ** 2).sum() / n)
+        return float(mean), float(std)
@@ -1,4 +1,7 @@
+import os
 import re
+import bisect
+import pickle
 from pathlib import Path
 from datetime import datetime
 
@@ -182,6 +185,57 @@ class LogSet():
         """Create the log set."""
         self.dyn_logs = {}  # organized by name and event
         self.all_logs = []
+        self.obj_index = {}  # object name : sorted positions of its logs in all_logs
+        self.indexed_len = 0  # the number of logs in the index
+    
+    def updateIndex(self):
+        """Bring the object index up to date with the log list.
+        
+        New logs are indexed incrementally; the index is rebuilt if logs were
+        removed from (or otherwise reordered in) the list.
+        """
+        n = len(self.all_logs)
+        if n < self.indexed_len:
+            self.obj_index = {}
+            self.indexed_len = 0
+        for i in range(self.indexed_len, n):
+            self.obj_index.setdefault(self.all_logs[i].obj_name, []).append(i)
+        self.indexed_len = n
+    
+    def getObjectIndices(self, obj_name : str, snum : int = None, min_index : int = 0) -> list:
+        """Get the positions of the logs associated with an object.
+        
+            Params:
+                obj_name (str): the name of the object
+                snum (int): only include logs containing this section (or no section) if provided
+                min_index (int): only include logs at or after this position
+            Returns:
+                (list): the sorted positions of the logs in all_logs
+        """
+        self.updateIndex()
+        indices = self.obj_index.get(obj_name, [])
+        if min_index > 0:
+            indices = indices[bisect.bisect_left(indices, min_index):]
+        if snum is not None:
+            indices = [
+                i for i in indices if (
+                    self.all_logs[i].section_ranges is None or 
+                    self.all_logs[i].containsSection(snum)
+                )
+            ]
+        return list(indices)
+    
+    def removeLogs(self, indices : list):
+        """Remove the logs at the given positions.
+        
+            Params:
+                indices (list): the sorted positions of the logs to remove
+        """
+        for i in reversed(indices):
+            del(self.all_logs[i])
+        if indices:
+            self.obj_index = {}
+            self.indexed_len = 0
     
     def addLog(self, user : str, obj_name : str, snum : int, event : str):
         """Add a log to the set.
@@ -228,9 +282,10 @@ class LogSet():
                 if obj_name in self.dyn_logs:
                     del(self.dyn_logs[obj_name])
                 # remove all previous logs associated with the object
-                for l in self.all_logs.copy():
-                    if l.obj_name == obj_name and "Create object" not in l.event:
-                        self.all_logs.remove(l)
+                self.removeLogs([
+                    i for i in self.getObjectIndices(obj_name)
+                    if "Create object" not in self.all_logs[i].event
+                ])
                 self.all_logs.append(log)
             # non-special cases
             else:
@@ -305,28 +360,29 @@ class LogSet():
             Params:
                 obj_name (str): the name of the object to remove curation for
         """
-        for log in self.all_logs.copy():
-            if (obj_name == log.obj_name and 
-                ("curated" in log.event or "curation" in log.event)):
-                self.all_logs.remove(log)
+        self.removeLogs([
+            i for i in self.getObjectIndices(obj_name)
+            if "curated" in self.all_logs[i].event or "curation" in self.all_logs[i].event
+        ])
     
-    def getLastIndex(self, snum : int, cname : str):
+    def getLastIndex(self, snum : int, cname : str, min_index : int = 0):
         """Scan the history and return the date for a contour on a given section.
         
             Params:
                 snum (int): the section number
                 cname (str): the contour name
+                min_index (int): the first position to consider
+            Returns:
+                (int): the position of the last log for the contour (-1 if none)
         """
-        i = len(self.all_logs) - 1
-        for log in reversed(self.all_logs):
+        for i in reversed(self.getObjectIndices(cname, min_index=min_index)):
+            log = self.all_logs[i]
             if (
-                log.obj_name == cname and 
                 ("ztrace" not in log.event) and 
-                (log.containsSection(snum) or (log.section_ranges is None))
+                (log.section_ranges is None or log.containsSection(snum))
             ):
                 return i
-            i -= 1
-        return i
+        return -1
 
     @staticmethod
     def exportLogHistory(hidden_dir: str, output_fp: str, older_than: int) -> None:
@@ -364,6 +420,102 @@ class LogSet():
         new_log.replace(existing_log)  # overwrite old log
                         
 
+class LogCSV():
+
+    def __init__(self, csv_fp : str):
+        """Create a cached reader for a log CSV file (such as existing_log.csv).
+
+        The parsed rows are kept in memory and in a sidecar file next to the
+        CSV, so the history is only parsed again when the CSV changes.
+        
+            Params:
+                csv_fp (str): the filepath to the log CSV file
+        """
+        self.csv_fp = csv_fp
+        self.index_fp = csv_fp + ".idx"
+        self.key = None  # the (size, mtime) of the CSV when the rows were parsed
+        self.rows = None
+
+    def getKey(self) -> tuple:
+        """Get the key identifying the current version of the CSV."""
+        stat = os.stat(self.csv_fp)
+        return (stat.st_size, stat.st_mtime_ns)
+    
+    def getRows(self) -> list:
+        """Get the parsed rows of the CSV (parsed again only if the CSV changed).
+        
+            Returns:
+                (list): (date, time, user, obj_name, section_ranges, event) tuples
+        """
+        key = self.getKey()
+        if key == self.key:
+            return self.rows
+        
+        # check the sidecar file
+        rows = None
+        if os.path.isfile(self.index_fp):
+            try:
+                with open(self.index_fp, "rb") as f:
+                    index_key, rows = pickle.load(f)
+                if index_key != key:
+                    rows = None
+            except Exception:
+                rows = None
+        
+        if rows is None:
+            rows = LogCSV.parse(self.csv_fp)
+            try:
+                with open(self.index_fp, "wb") as f:
+                    pickle.dump((key, rows), f, pickle.HIGHEST_PROTOCOL)
+            except OSError:
+                pass  # the sidecar is only a cache
+        
+        self.key, self.rows = key, rows
+        return rows
+    
+    def getLogSet(self) -> LogSet:
+        """Get the logs in the CSV as a new log set."""
+        log_set = LogSet()
+        for date, time, user, obj_name, section_ranges, event in self.getRows():
+            if section_ranges is not None:
+                section_ranges = list(section_ranges)
+            log_set.all_logs.append(Log(date, time, user, obj_name, section_ranges, event))
+        return log_set
+    
+    # STATIC METHOD
+    def parse(csv_fp : str) -> list:
+        """Stream through a log CSV file and parse its rows.
+        
+            Params:
+                csv_fp (str): the filepath to the log CSV file
+            Returns:
+                (list): (date, time, user, obj_name, section_ranges, event) tuples
+        """
+        rows = []
+        with open(csv_fp, "r") as f:
+            next(f, None)  # skip the header
+            log_str = ""
+            for line in f:
+                if not log_str and not line.strip():
+                    continue
+                # check for corrupt log strings (return key in name)
+                log_str += line.strip() if log_str else line
+                if len(log_str.split(",")) < 6:
+                    continue
+                log = Log.fromStr(log_str)
+                rows.append((
+                    log.date,
+                    log.time,
+                    log.user,
+                    log.obj_name,
+                    tuple(log.section_ranges) if log.section_ranges else None,
+                    log.event
+                ))
+                log_str = ""
+        
+        return rows
+
+
 class LogSetPair():
 
     def __init__(self, logset0 : LogSet, logset1 : LogSet):
@@ -381,7 +533,10 @@ class LogSetPair():
         while (
             i < len(self.logset0.all_logs) and
             i < len(self.logset1.all_logs) and
-            self.logset0.all_logs[i] == self.logset1.all_logs[i]
+            (
+                self.logset0.all_logs[i] is self.logset1.all_logs[i] or
+                self.logset0.all_logs[i] == self.logset1.all_logs[i]
+            )
         ):
             i += 1
         
@@ -456,6 +611,38 @@ class LogSetPair():
             for obj_name, (user, dt) in last_user_data.items():
                 series.setAttr(obj_name, "last_user", user)
     
+    def getModifiedSinceDivergeSections(self, snums : list) -> dict:
+        """Get the contours modified since diverge for many sections at once.
+
+        Equivalent to getModifiedSinceDiverge for every contour on every
+        section, with a single pass through the logs after the diverge.
+        
+            Params:
+                snums (list): the section numbers to check
+            Returns:
+                (dict): section number : {contour name : (logset0 True/False, logset1 True/False)} for the contours modified in either logset
+        """
+        snums = sorted(snums)
+        modified = {}
+        for i, ls in enumerate((self.logset0, self.logset1)):
+            for log in ls.all_logs[self.last_shared_index + 1:]:
+                if not log.obj_name or "ztrace" in log.event:
+                    continue
+                if log.section_ranges is None:
+                    log_snums = snums
+                else:
+                    log_snums = set()
+                    for n1, n2 in log.section_ranges:
+                        log_snums.update(snums[bisect.bisect_left(snums, n1):bisect.bisect_right(snums, n2)])
+                for snum in log_snums:
+                    modified.setdefault(snum, {}).setdefault(log.obj_name, [False, False])[i] = True
+        
+        for section_modified in modified.values():
+            for cname, m in section_modified.items():
+                section_modified[cname] = tuple(m)
+        
+        return modified
+    
     def getModifiedSinceDiverge(self, cname : str, snum : int):
         """Get the information on which contours have been modified since diverge.
             Params:
@@ -467,7 +654,8 @@ class LogSetPair():
         # determine which series have been modified since diverge
         modified_since_diverge = [False, False]
         for i, ls in enumerate((self.logset0, self.logset1)):
-            last_index = ls.getLastIndex(snum, cname)
+            # only the logs after the diverge need to be checked
+            last_index = ls.getLastIndex(snum, cname, self.last_shared_index + 1)
             if last_index > self.last_shared_index:
                 modified_since_diverge[i] = True
         return tuple(modified_since_diverge)
@@ -1,3 +1,6 @@
+from .table_export import writeTable
+
+
 class Objects():
 
     def __init__(self, series):
@@ -22,32 +25,17 @@ class Objects():
         """Return all of the object names."""
         return list(sorted(self.series.data["objects"].keys()))
 
-    def exportCSV(self, out_fp : str = None):
-        """Export a CSV containing the quantitative data for all objects.
+    def iterCSVRows(self, sep : str = "|"):
+        """Iterate through the rows of the object data export.
         
             Params:
-                out_fp (str): filepath for newly created CSV (function returns str if filepath not provided)
+                sep (str): the separator (removed from comments)
         """
-        sep = "|"
-        
-        out_str = f"Series{sep}Name{sep}Start{sep}End{sep}Count{sep}Flat_Area{sep}Volume{sep}Groups{sep}"
-        out_str += f"Trace_Tags{sep}Last_User{sep}Curation_Status{sep}Curation_User{sep}"
-        out_str += f"Curation_Date{sep}Alignment{sep}Comment\n"
-
         series_code = self.series.code
+        data = self.series.data
+
+        for obj_name in sorted(data["objects"].keys()):
 
-        for obj_name in sorted(self.series.data["objects"].keys()):
-
-            out_str += f"{series_code}{sep}"
-            out_str += f"{obj_name}{sep}"
-            out_str += f"{self.series.data.getStart(obj_name)}{sep}"
-            out_str += f"{self.series.data.getEnd(obj_name)}{sep}"
-            out_str += f"{self.series.data.getCount(obj_name)}{sep}"
-            out_str += f"{self.series.data.getFlatArea(obj_name)}{sep}"
-            out_str += f"{self.series.data.getVolume(obj_name)}{sep}"
-            out_str += f"{':'.join(self.series.object_groups.getObjectGroups(obj_name))}{sep}"
-            out_str += f"{':'.join(self.series.data.getTags(obj_name))}{sep}"
-            out_str += f"{self.series.getAttr(obj_name, 'last_user')}{sep}"
             curation = self.series.getAttr(obj_name, "curation")
 
             if curation:
@@ -59,22 +47,51 @@ class Objects():
             else:
                 status = user = date = ""
 
-            out_str += f"{status}{sep}{user}{sep}{date}{sep}"
-
             alignment = self.series.getAttr(obj_name, "alignment")
             if not alignment: alignment = ""
-            out_str += f"{alignment}{sep}"
 
             ## Remove seperator from comments
             comments = self.series.getAttr(obj_name, "comment").replace(sep, "_")
-            out_str += comments + "\n"
-            
-        if out_fp:
-            
-            with open(out_fp, "w") as f:
-                f.write(out_str)
-
-        return out_str
+
+            yield [
+                series_code,
+                obj_name,
+                data.getStart(obj_name),
+                data.getEnd(obj_name),
+                data.getCount(obj_name),
+                data.getFlatArea(obj_name),
+                data.getVolume(obj_name),
+                ':'.join(self.series.object_groups.getObjectGroups(obj_name)),
+                ':'.join(data.getTags(obj_name)),
+                self.series.getAttr(obj_name, 'last_user'),
+                status,
+                user,
+                date,
+                alignment,
+                comments
+            ]
+
+    def exportCSV(self, out_fp : str = None):
+        """Export a CSV containing the quantitative data for all objects.
+
+        The rows are written as they are computed (.parquet/.arrow/.feather
+        filepaths are written with pyarrow).
+        
+            Params:
+                out_fp (str): filepath for newly created CSV (function returns str if filepath not provided)
+        """
+        sep = "|"
+        header = [
+            "Series", "Name", "Start", "End", "Count", "Flat_Area", "Volume", "Groups",
+            "Trace_Tags", "Last_User", "Curation_Status", "Curation_User",
+            "Curation_Date", "Alignment", "Comment"
+        ]
+        types = [
+            "str", "str", "int", "int", "int", "float", "float", "str",
+            "str", "str", "str", "str",
+            "str", "str", "str"
+        ]
+        return writeTable(out_fp, header, types, self.iterCSVRows(sep), delimiter=sep)
 
     def getSourceAttrs(self, source_obj) -> tuple:
         """Get relavant source obj attrs."""
@@ -58,25 +58,7 @@ class Section():
             self.tforms[a] = Transform(section_data["tforms"][a])
         
         self.thickness = section_data["thickness"]
-        self.contours : dict[str, Contour] = {}
-
-        for name in section_data["contours"]:
-            
-            trace_list = []
-            
-            for trace_data in section_data["contours"][name]:
-                trace = Trace.fromList(trace_data, name)
-                # screen for defective traces
-                l = len(trace.points)
-                if l == 2:
-                    trace.closed = False
-                if l > 1:
-                    trace_list.append(trace)
-                    
-            self.contours[name] = Contour(
-                name,
-                trace_list
-            )
+        self.contours : dict[str, Contour] = loadContours(section_data["contours"])
         
         self.flags = [Flag.fromList(l, self.n) for l in section_data["flags"]]
 
@@ -628,15 +610,15 @@ class Section():
         
         # check for ztrace points close by
         if self.series.getOption("show_ztraces"):
+            ztrace_index = self.series.ztrace_index
             for ztrace in self.series.ztraces.values():
-                for i, pt in enumerate(ztrace.points):
-                    if pt[2] == self.n:
-                        x, y = tform.map(*pt[:2])
-                        dist = distance(field_x, field_y, x, y)
-                        if closest is None or dist < min_distance:
-                            min_distance = dist
-                            closest = (ztrace, i)
-                            closest_type = "ztrace_pt"
+                for i in ztrace_index.getSectionPoints(ztrace, self.n):
+                    x, y = tform.map(*ztrace.points[i][:2])
+                    dist = distance(field_x, field_y, x, y)
+                    if closest is None or dist < min_distance:
+                        min_distance = dist
+                        closest = (ztrace, i)
+                        closest_type = "ztrace_pt"
         
         # check for flags close by
         show_flags = self.series.getOption("show_flags")
@@ -899,7 +881,7 @@ class Section():
             # apply reverse transform
             x, y = tform.map(x, y, inverted=True)
             # replace point
-            ztrace.points[i] = (x, y, snum)
+            ztrace.setPoint(i, (x, y, snum))
             # keep track of modified ztrace
             self.series.modified_ztraces.add(ztrace.name)
             if log_event:
@@ -952,108 +934,42 @@ class Section():
         if group_filters:
 
             other_groups = other.series.object_groups.getGroupDict()
+            group_names = set()
+            for gf in group_filters:
+                group_names |= set(other_groups[gf])
         
-        for cname in all_contour_names:
-
-            if regex_filters:
-
-                passes_filter = False
-
-                for rf in regex_filters:
-                
-                    if bool(re.fullmatch(rf, cname)):
-                        passes_filter = True
-
-                if not passes_filter:
-
-                    continue
-
-            if group_filters:
-
-                passes_filter = False
-
-                for gf in group_filters:
-
-                    if cname in other_groups[gf]:
-                        passes_filter = True
-
-                if not passes_filter:
-
-                    continue
-
-            ## Flag as modified
-            self.modified_contours.add(cname)
-
-            ## Create empty contour if does not exist
-            if cname not in self.contours:
-                self.contours[cname] = Contour(cname, [])
-                
-            if cname not in other.contours:
-                other.contours[cname] = Contour(cname, [])
-            
-            ## Adjust contours in other series to match current series mag
-            mags_match = abs(other.mag - self.mag) <= 1e-8
-
-            if not mags_match:
-                
-                for trace in other.contours[cname]:
-                    trace.magScale(other.mag, self.mag)
-
-            # check the histories to find which contour has been modified since diverge
-            if histories and not histories.complete_match and histories.last_shared_index >= 0:
-                # determine which series have been modified since diverge
-                modified_since_diverge = histories.getModifiedSinceDiverge(cname, self.n)
-                
-                # if only one of the contours has been modified since diverge, use that one
-                if modified_since_diverge[0] != modified_since_diverge[1]:
-                    # if the other series is the one modified, replace contour and move to next
-                    if modified_since_diverge[1]:
-                        self.contours[cname] = other.contours[cname]
-                    if self.contours[cname].isEmpty(): del(self.contours[cname])  # remove contour from self if empty
-                    continue
-                elif not any(modified_since_diverge):  # if neither contour has been modified since diverge, skip completely (risky)
-                    if self.contours[cname].isEmpty(): del(self.contours[cname])  # remove contour from self if empty
-                    continue
-
-            # import the contour
-            conflict_traces_s, conflict_traces_o = self.contours[cname].importTraces(other.contours[cname], threshold, keep_above)
+        else:
 
-            # if one or both series have no conflicts, no need to flag them or check for favor below the threshold
-            if not conflict_traces_s or not conflict_traces_o:
-                if self.contours[cname].isEmpty(): del(self.contours[cname])  # remove contour from self if empty
-                continue
+            group_names = None
+        
+        cnames = filterContourNames(all_contour_names, regex_filters, group_names)
 
-            # iterate through conflict pool and favor the requested traces
-            if keep_below in ("self", "other"):
-                # set traces1 variable to be favored traces and traces2 to be unfavored traces
-                if keep_below == "self":
-                    traces1, traces2 = conflict_traces_s, conflict_traces_o
-                elif keep_below == "other":
-                    traces1, traces2 = conflict_traces_o, conflict_traces_s
-                # iterate through traces and delete overlaps in unfavored series
-                for trace1 in traces1:
-                    for trace2 in traces2.copy():
-                        if trace1.overlaps(trace2, threshold=0):
-                            traces2.remove(trace2)
-                            self.contours[cname].remove(trace2)
-                # clear favored traces, as they will never be conflicts
-                traces1.clear()
-                # any traces left in unfavored traces will be flagged
-            
-            # flag the remaining conflicts
-            if flag_conflicts:                                     
-                for trace in conflict_traces_s:
-                    if dt_str:
-                        trace.tags.add(f"{dt_str}-ic1")
-                    x, y = trace.getCentroid()
-                    self.flags.append(Flag(f"import-conflict_{trace.name}", x, y, self.n, trace.color))
-                for trace in conflict_traces_o:
-                    if dt_str:
-                        trace.tags.add(f"{dt_str}-ic2")
-                    x, y = trace.getCentroid()
-                    self.flags.append(Flag(f"import-conflict_{trace.name}", x, y, self.n, trace.color))
-            
-            if self.contours[cname].isEmpty(): del(self.contours[cname])  # remove contour from self if empty
+        # check the histories to find which contours have been modified since diverge
+        if histories and not histories.complete_match and histories.last_shared_index >= 0:
+            modified_since_diverge = dict(
+                (cname, histories.getModifiedSinceDiverge(cname, self.n))
+                for cname in cnames
+            )
+        else:
+            modified_since_diverge = None
+
+        ## Flag as modified
+        self.modified_contours.update(cnames)
+
+        self.flags += importContours(
+            self.contours,
+            other.contours,
+            cnames,
+            self.mag,
+            other.mag,
+            self.n,
+            threshold,
+            flag_conflicts,
+            modified_since_diverge,
+            keep_above,
+            keep_below,
+            dt_str
+        )
         
         self.save()
     
@@ -1080,6 +996,272 @@ class Section():
         return export_png(self, png_fp, scale)
         
 
+def loadContours(contour_data : dict) -> dict:
+    """Create the contours from section file data (defective traces are screened).
+    
+        Params:
+            contour_data (dict): contour name : list of trace lists
+        Returns:
+            (dict): contour name : Contour
+    """
+    contours = {}
+
+    for name in contour_data:
+        
+        trace_list = []
+        
+        for trace_data in contour_data[name]:
+            trace = Trace.fromList(trace_data, name)
+            # screen for defective traces
+            l = len(trace.points)
+            if l == 2:
+                trace.closed = False
+            if l > 1:
+                trace_list.append(trace)
+                
+        contours[name] = Contour(
+            name,
+            trace_list
+        )
+    
+    return contours
+
+
+def filterContourNames(cnames : list, regex_filters : list = [], group_names : set = None) -> list:
+    """Get the contour names that pass the import filters.
+    
+        Params:
+            cnames (list): the contour names
+            regex_filters (list): regex filters for objects (a name must match one)
+            group_names (set): the names of the objects in the filtered groups (None if not filtering by group)
+        Returns:
+            (list): the names that pass the filters
+    """
+    passing = []
+
+    for cname in cnames:
+
+        if regex_filters and not any(bool(re.fullmatch(rf, cname)) for rf in regex_filters):
+            continue
+
+        if group_names is not None and cname not in group_names:
+            continue
+
+        passing.append(cname)
+    
+    return passing
+
+
+def importContours(
+        contours : dict,
+        o_contours : dict,
+        cnames : list,
+        mag : float,
+        o_mag : float,
+        snum : int,
+        threshold : float = 0.95,
+        flag_conflicts : bool = True,
+        modified_since_diverge : dict = None,
+        keep_above : str = "self",
+        keep_below : str = "",
+        dt_str : str = None
+) -> list:
+    """Import the contours of one section into the contours of another (in place).
+
+        Params:
+            contours (dict): contour name : Contour for the section importing traces (modified)
+            o_contours (dict): contour name : Contour for the section with traces to import
+            cnames (list): the names of the contours to import
+            mag (float): the magnification of the section importing traces
+            o_mag (float): the magnification of the section with traces to import
+            snum (int): the section number
+            threshold (float): the overlap threshold
+            flag_conflicts (bool): True if conflicts should be flagged
+            modified_since_diverge (dict): contour name : (self modified, other modified) since the histories diverged (None if histories are not checked)
+            keep_above (str): the series that is favored for functional duplicates (above the overlap threshold; "self", "other", or "")
+            keep_below (str): the series that is favored in the case of a conflict (overlap not reaching the threshold; "self", "other", or "")
+            dt_str (str): the datetime string for tagging purposes
+        Returns:
+            (list): the conflict flags to add to the section
+    """
+    flags = []
+
+    for cname in cnames:
+
+        ## Create empty contour if does not exist
+        if cname not in contours:
+            contours[cname] = Contour(cname, [])
+            
+        if cname not in o_contours:
+            o_contours[cname] = Contour(cname, [])
+        
+        ## Adjust contours in other series to match current series mag
+        mags_match = abs(o_mag - mag) <= 1e-8
+
+        if not mags_match:
+            
+            for trace in o_contours[cname]:
+                trace.magScale(o_mag, mag)
+
+        # check the histories to find which contour has been modified since diverge
+        if modified_since_diverge is not None:
+            # determine which series have been modified since diverge
+            modified = modified_since_diverge.get(cname, (False, False))
+            
+            # if only one of the contours has been modified since diverge, use that one
+            if modified[0] != modified[1]:
+                # if the other series is the one modified, replace contour and move to next
+                if modified[1]:
+                    contours[cname] = o_contours[cname]
+                if contours[cname].isEmpty(): del(contours[cname])  # remove contour from self if empty
+                continue
+            elif not any(modified):  # if neither contour has been modified since diverge, skip completely (risky)
+                if contours[cname].isEmpty(): del(contours[cname])  # remove contour from self if empty
+                continue
+
+        # import the contour
+        conflict_traces_s, conflict_traces_o = contours[cname].importTraces(o_contours[cname], threshold, keep_above)
+
+        # if one or both series have no conflicts, no need to flag them or check for favor below the threshold
+        if not conflict_traces_s or not conflict_traces_o:
+            if contours[cname].isEmpty(): del(contours[cname])  # remove contour from self if empty
+            continue
+
+        # iterate through conflict pool and favor the requested traces
+        if keep_below in ("self", "other"):
+            # set traces1 variable to be favored traces and traces2 to be unfavored traces
+            if keep_below == "self":
+                traces1, traces2 = conflict_traces_s, conflict_traces_o
+            elif keep_below == "other":
+                traces1, traces2 = conflict_traces_o, conflict_traces_s
+            # delete the traces in unfavored series that overlap any favored trace
+            overlapping = set(j for i, j in Trace.getOverlappingPairs(traces1, traces2, threshold=0))
+            for trace2 in [t for j, t in enumerate(traces2) if j in overlapping]:
+                traces2.remove(trace2)
+                contours[cname].remove(trace2)
+            # clear favored traces, as they will never be conflicts
+            traces1.clear()
+            # any traces left in unfavored traces will be flagged
+        
+        # flag the remaining conflicts
+        if flag_conflicts:                                     
+            for trace in conflict_traces_s:
+                if dt_str:
+                    trace.tags.add(f"{dt_str}-ic1")
+                x, y = trace.getCentroid()
+                flags.append(Flag(f"import-conflict_{trace.name}", x, y, snum, trace.color))
+            for trace in conflict_traces_o:
+                if dt_str:
+                    trace.tags.add(f"{dt_str}-ic2")
+                x, y = trace.getCentroid()
+                flags.append(Flag(f"import-conflict_{trace.name}", x, y, snum, trace.color))
+        
+        if contours[cname].isEmpty(): del(contours[cname])  # remove contour from self if empty
+    
+    return flags
+
+
+def importSectionFile(
+        snum : int,
+        section_fp : str,
+        o_section_fp : str,
+        regex_filters : list,
+        group_names : set,
+        modified_since_diverge : dict,
+        threshold : float,
+        flag_conflicts : bool,
+        keep_above : str,
+        keep_below : str,
+        dt_str : str
+) -> tuple:
+    """Import the traces of one section file into another (run in a worker process).
+
+    The merged section is written back to section_fp.
+
+        Params:
+            snum (int): the section number
+            section_fp (str): the filepath of the section importing traces
+            o_section_fp (str): the filepath of the section with traces to import
+            (see importContours and filterContourNames for the other params)
+        Returns:
+            (int): the section number
+            (list): the names of the imported contours
+    """
+    with open(section_fp, "r") as f:
+        section_data = json.load(f)
+    with open(o_section_fp, "r") as f:
+        o_section_data = json.load(f)
+    Section.updateJSON(section_data, snum)
+    Section.updateJSON(o_section_data, snum)
+
+    contours = loadContours(section_data["contours"])
+    o_contours = loadContours(o_section_data["contours"])
+    cnames = filterContourNames(
+        list(set(contours.keys()) | set(o_contours.keys())),
+        regex_filters,
+        group_names
+    )
+    if not cnames:
+        return snum, cnames
+
+    flags = importContours(
+        contours,
+        o_contours,
+        cnames,
+        section_data["mag"],
+        o_section_data["mag"],
+        snum,
+        threshold,
+        flag_conflicts,
+        modified_since_diverge,
+        keep_above,
+        keep_below,
+        dt_str
+    )
+
+    # write the section as Section.getDict would
+    section_data["contours"] = dict(
+        (name, [trace.getList(include_name=False) for trace in contour])
+        for name, contour in contours.items() if not contour.isEmpty()
+    )
+    section_data["flags"] += [flag.getList() for flag in flags]
+    with open(section_fp, "w") as f:
+        f.write(json.dumps(section_data, indent=1))
+    
+    return snum, cnames
+
+
+
+def smoothSectionTraces(snum : int, section_fp : str, obj_names : list, window : int, spacing : float = 0.004) -> tuple:
+    """Smooth the traces of objects on a section file (run in a worker process).
+
+        Params:
+            snum (int): the section number
+            section_fp (str): the filepath of the section file
+            obj_names (list): the names of the objects to smooth
+            window (int): the rolling average window
+            spacing (float): the interpolation spacing
+        Returns:
+            (int): the section number
+            (dict): object name : smoothed points for each trace (None if not smoothed)
+    """
+    with open(section_fp, "r") as f:
+        contours = json.load(f)["contours"]
+
+    # screen the traces as the loaded section does so that the indices match
+    contours = loadContours({name : contours[name] for name in obj_names if name in contours})
+
+    smoothed = {}
+    for name, contour in contours.items():
+        smoothed[name] = []
+        for trace in contour:
+            if trace.smooth(window=window, spacing=spacing):
+                smoothed[name].append(trace.points)
+            else:
+                smoothed[name].append(None)
+
+    return snum, smoothed
+
 class TransformsDict(dict):
     
     def __init__(self):
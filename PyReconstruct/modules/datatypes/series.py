@@ -7,11 +7,13 @@ from copy import deepcopy
 from pathlib import Path
 from typing import Union
 
+import numpy as np
+
 from PySide6.QtCore import QSettings
 
-from .log import LogSet, LogSetPair
-from .ztrace import Ztrace
-from .section import Section
+from .log import LogSet, LogSetPair, LogCSV
+from .ztrace import Ztrace, ZtraceIndex
+from .section import Section, importSectionFile, smoothSectionTraces, loadContours
 from .trace import Trace
 from .transform import Transform
 from .obj_group_dict import ObjGroupDict
@@ -19,6 +21,9 @@ from .series_data import SeriesData
 from .objects import Objects, SeriesObject
 from .default_settings import default_settings, default_series_settings
 from .host_tree import HostTree
+from .attr_store import AttrStore
+from .image_stats import ImageStats, getImagePath, getImageHistogram
+from .table_export import writeTable
 
 from PyReconstruct.modules.constants import (
     createHiddenDir,
@@ -33,6 +38,7 @@ class Series():
     
     qsettings_defaults = default_settings.copy()
     qsettings_series_defaults = default_series_settings.copy()
+    attr_store_fname = "attributes.db"
 
     def __init__(self, filepath : str, sections : dict, get_series_data=True):
         """Load the series file.
@@ -57,6 +63,12 @@ class Series():
         self.hidden_dir = os.path.dirname(self.filepath)
         self.modified = False
 
+        # object attributes may be kept in a SQLite store instead of the JSON
+        self.attr_store = None
+        if series_data.get("attr_store"):
+            self.attr_store = AttrStore(os.path.join(self.hidden_dir, series_data["attr_store"]))
+            series_data.update(self.attr_store.load())
+
         self.current_section = series_data["current_section"]
         self.src_dir = series_data["src_dir"]
         self.screen_mag = 0  # default value for screen mag (will be calculated when generateView called)
@@ -86,6 +98,7 @@ class Series():
         # default settings
         self.modified_ztraces = set()
         self.modified_objects = set()
+        self.modified_obj_attrs = set()  # objects whose attributes changed since the attribute store was written
         self.leave_open = False
 
         # possible zarr overlay
@@ -99,12 +112,18 @@ class Series():
             self.log_set = LogSet.fromList(series_data["log_set"])
         else:
             self.log_set = LogSet()
+        self.history_csv = None  # cached reader for existing_log.csv
+        self.section_tables = {}  # cached z-values and transforms by section (see getZArray)
+        self.image_stats = None  # persistent image histograms (see getImageStats)
 
         # keep track of relevant overall series data
         self.data = SeriesData(self)
         if get_series_data:
             self.data.refresh()
 
+        # ztrace points and segments by section (for drawing and selecting)
+        self.ztrace_index = ZtraceIndex(self)
+
         # objects for non-GUI users
         self.objects = Objects(self)
 
@@ -317,6 +336,11 @@ class Series():
                     filedata = json.load(f)
                 # manually remove log set from series data if exists
                 if filedata.get("log_set"): del(filedata["log_set"])
+                # export the object attributes from the SQLite store
+                if filedata.get("attr_store"):
+                    attr_store = AttrStore(os.path.join(self.hidden_dir, filedata["attr_store"]))
+                    filedata.update(attr_store.load())
+                    del(filedata["attr_store"])
                 # add the log_set string to the log
                 log_set_str = str(self.log_set)
                 if log_set_str:
@@ -325,10 +349,7 @@ class Series():
                 jser_data["series"] = filedata
             elif filename == "existing_log.csv":
                 with open(fp, "r") as f:
-                    existing_log = ""
-                    for line in f.readlines():
-                        if line.strip():
-                            existing_log += line
+                    existing_log = "".join(line for line in f if line.strip())
                 # continue saving the existing log file
                 jser_data["log"] = existing_log + jser_data["log"]
 
@@ -673,6 +694,9 @@ class Series():
             "med_dist"         : 0.1,  # MFO
             "big_dist"         : 1,  # MFO
             "autoseg"          : {},
+
+            # keep object attributes, groups, hosts and user columns in a SQLite store
+            "attr_store"       : False,
             
         }
 
@@ -788,6 +812,21 @@ class Series():
             return
 
         d = self.getDict()
+
+        # move the object attributes into the SQLite store if requested
+        if self.getOption("attr_store"):
+            db_fp = os.path.join(self.hidden_dir, Series.attr_store_fname)
+            if self.attr_store is None or self.attr_store.db_fp != db_fp:
+                self.attr_store = AttrStore(db_fp)
+                modified = None  # a new store is compared with every object
+            else:
+                modified = self.modified_obj_attrs
+            self.attr_store.write(d, modified)
+            self.modified_obj_attrs = set()
+            d["attr_store"] = os.path.basename(self.attr_store.db_fp)
+            for key in AttrStore.keys:
+                d[key] = {}
+
         with open(self.filepath, "w") as f:
             f.write(json.dumps(d, indent=1))
     
@@ -810,7 +849,7 @@ class Series():
         section = Section(section_num, self)
         return section
     
-    def enumerateSections(self, show_progress : bool = True, message : str = "Loading series data...", series_states=None, breakable=True):
+    def enumerateSections(self, show_progress : bool = True, message : str = "Loading series data...", series_states=None, breakable=True, snums : list = None):
         """Allow iteration through the sections.
 
         Proper use in a for loop: for snum, section in series.enumerateSections():
@@ -820,10 +859,11 @@ class Series():
                 message (str): the message to display by the progress bar
                 series_states (dict): section number : SectionStates object (use with GUI for undo/redo)
                 breakable (bool): True if sereis state is breakable
+                snums (list): the section numbers to iterate through (all sections if None)
             Returns:
                 (SeriesIterator): an iterable object for for loops
         """
-        return SeriesIterator(self, show_progress, message, series_states, breakable)
+        return SeriesIterator(self, show_progress, message, series_states, breakable, snums)
 
     def modifyAlignments(self, alignment_dict : dict, series_states=None, log_event=True):
         """Modify the series's alignment.
@@ -910,14 +950,136 @@ class Series():
             Returns:
                 (dict): section number : z-value
         """
-        zvals = {}
-        z = 0
-        for snum in sorted(self.sections.keys()):
-            t = self.data["sections"][snum]["thickness"]
-            z += t
-            zvals[snum] = z
+        zarr = self.getZArray()
+        return dict(
+            (snum, float(zarr[snum])) for snum in sorted(self.sections.keys())
+        )
+    
+    def getZArray(self) -> np.ndarray:
+        """Return the z-coordinate of each section as an array indexed by section number.
+
+        The cumulative section thicknesses are cached until a section
+        thickness or the set of sections changes (NaN for missing sections).
+        
+            Returns:
+                (np.ndarray): the z-value of each section number
+        """
+        snums = tuple(self.sections.keys())
+        key = (self.data, self.data.thickness_version, snums)
+        if self.section_tables.get("z", (None,))[0] != key:
+            zarr = np.full(max(snums, default=-1) + 1, np.nan)
+            sorted_snums = sorted(snums)
+            if sorted_snums:
+                thicknesses = [
+                    self.data["sections"][snum]["thickness"] for snum in sorted_snums
+                ]
+                zarr[sorted_snums] = np.cumsum(thicknesses)
+            self.section_tables["z"] = (key, zarr)
+        
+        return self.section_tables["z"][1]
+    
+    def getTformArray(self, alignment : str = None) -> np.ndarray:
+        """Return the transform of each section as an array indexed by section number.
+
+        The six-number transforms are cached until a section transform or the
+        set of sections changes (NaN for missing sections or alignments).
+        
+            Params:
+                alignment (str): the alignment (the current alignment if None)
+            Returns:
+                (np.ndarray): the (n, 6) transform of each section number
+        """
+        if alignment is None:
+            alignment = self.alignment
+        snums = tuple(self.sections.keys())
+        key = (self.data, self.data.tforms_version, snums)
+        tables = self.section_tables.get("tforms")
+        if tables is None or tables[0] != key:
+            tables = (key, {})
+            self.section_tables["tforms"] = tables
+        
+        if alignment not in tables[1]:
+            tforms = np.full((max(snums, default=-1) + 1, 6), np.nan)
+            for snum in snums:
+                tform = self.data["sections"][snum]["tforms"].get(alignment)
+                if tform is not None:
+                    tforms[snum] = tform.getList()
+            tables[1][alignment] = tforms
+        
+        return tables[1][alignment]
+    
+    def getImageStats(self) -> ImageStats:
+        """Return the persistent histogram cache for the series images.
         
-        return zvals
+            Returns:
+                (ImageStats): the cache for the current image directory
+        """
+        if self.image_stats is None or self.image_stats.src_dir != self.src_dir:
+            self.image_stats = ImageStats(self.src_dir, self.hidden_dir)
+        return self.image_stats
+    
+    def getImagePaths(self, snums : list = None, lowest_res=True) -> dict:
+        """Return the image filepath of each section.
+        
+            Params:
+                snums (list): the section numbers (all if None)
+                lowest_res (bool): True if the lowest resolution zarr scale should be used
+            Returns:
+                (dict): section number : image filepath (sections without an image are left out)
+        """
+        if snums is None:
+            snums = self.sections.keys()
+        fps = {}
+        for snum in snums:
+            if snum not in self.sections:
+                continue
+            if snum in self.data["sections"]:
+                src = self.data["sections"][snum]["src"]
+            else:
+                src = self.loadSection(snum).src
+            fp = getImagePath(self.src_dir, src, lowest_res)
+            if fp is not None:
+                fps[snum] = fp
+        return fps
+    
+    def updateImageStats(self, snums : list = None, lowest_res=True, max_processes=None) -> dict:
+        """Measure the histograms of the section images that are not stored yet.
+
+        The images are read in worker processes and the histograms are kept
+        with the images, so this only reads each image once.
+        
+            Params:
+                snums (list): the section numbers (all if None)
+                lowest_res (bool): True if the lowest resolution zarr scale should be used
+                max_processes (int): the maximum number of worker processes (cpu count if None)
+            Returns:
+                (dict): section number : image filepath for the sections with a histogram
+        """
+        from PyReconstruct.modules.backend.threading import ProcessPoolProgBar, WorkerError
+
+        image_stats = self.getImageStats()
+        fps = self.getImagePaths(snums, lowest_res)
+        missing = sorted(set(image_stats.getMissing(fps.values())))
+
+        processpool = ProcessPoolProgBar(max_processes)
+        for fp in missing:
+            processpool.createWorker(getImageHistogram, fp, name=fp)
+        error = None
+        try:
+            hists = processpool.startAll("Measuring images...", cancel=True)
+        except WorkerError as e:  # keep the images that were measured
+            hists, error = e.results, e
+        image_stats.setHistograms({
+            fp : hist for fp, hist in zip(missing, hists) if hist is not None
+        })
+        if error:
+            raise error
+
+        ## Canceled or unreadable images are left out
+        return {
+            snum : fp for snum, fp in fps.items()
+            if image_stats.getHistogram(fp, measure=False) is not None
+        }
     
     def createZtrace(
             self,
@@ -949,12 +1111,18 @@ class Series():
 
         if not z_points:  # generate points from already traced object if non provided
 
+            ## Only load the sections the object is on (all if no series data)
+
+            z_points = []  # do not extend the default list
+            snums = self.data.getSections(obj_name)
+
             ## If create on midpoints, make one point per section
 
             if cross_sectioned:
 
                 for snum, section in self.enumerateSections(
-                    message="Creating ztrace..."
+                    message="Creating ztrace...",
+                    snums=snums
                 ):
 
                     if obj_name in section.contours:
@@ -970,7 +1138,8 @@ class Series():
             else:
 
                 for snum, section in self.enumerateSections(
-                    message="Creating ztrace..."
+                    message="Creating ztrace...",
+                    snums=snums
                 ):
 
                     if obj_name in section.contours:
@@ -1048,10 +1217,8 @@ class Series():
                 smooth (int): the smoothing factor
                 newztrace (bool): False if ztrace should be overwritten
         """
-        ## Smooth ztraces
+        ztraces = []
         for name in names:
-
-            
             
             ## Create new ztrace if requested
             if newztrace:
@@ -1068,8 +1235,13 @@ class Series():
             else:
                 
                 ztrace = self.ztraces[name]
-                
-            ztrace.smooth(self, smooth)
+            
+            ztraces.append(ztrace)
+        
+        ## Smooth ztraces (all at once)
+        Ztrace.smoothZtraces(self, ztraces, smooth)
+        
+        for name, ztrace in zip(names, ztraces):
             
             self.modified_ztraces.add(ztrace.name)
         
@@ -1348,12 +1520,18 @@ class Series():
         
         self.modified = True
 
-    def smoothObject(self, obj_names: list, series_states=None, log_event=True) -> list:
+    def smoothObject(self, obj_names: list, series_states=None, log_event=True, max_processes=None) -> list:
         """Smooth all traces belonging to an object.
 
         Malformed traces with too few points to smooth (e.g. "pixel dust"
-        artifacts) are skipped rather than smoothed.
+        artifacts) are skipped rather than smoothed. The traces are smoothed
+        in worker processes, one per section the objects are on.
 
+            Params:
+                obj_names (list): the names of the objects to smooth
+                series_states (dict): optional dict of undo states for GUI
+                log_event (bool): True if event should be logged
+                max_processes (int): the maximum number of worker processes (cpu count if None)
             Returns:
                 (list): one record per skipped trace, each a dict with keys
                     "name" (object name), "section" (section number),
@@ -1366,6 +1544,8 @@ class Series():
                     the trace later). Empty when nothing was skipped.
         """
 
+        from PyReconstruct.modules.backend.threading import ProcessPoolProgBar
+
         window = self.getOption("roll_window")
 
         if log_event:
@@ -1374,25 +1554,52 @@ class Series():
 
                 self.addLog(obj_name, None, f"Smooth {obj_name} traces")
 
+        ## Only the sections the objects are on (all if no series data)
+        snums = set()
+        for obj_name in obj_names:
+            obj_snums = self.data.getSections(obj_name)
+            if obj_snums is None:
+                snums = set(self.sections.keys())
+                break
+            snums.update(obj_snums)
+        
+        ## Smooth the traces in worker processes
+        processpool = ProcessPoolProgBar(max_processes)
+        for snum in sorted(snums):
+            processpool.createWorker(
+                smoothSectionTraces,
+                snum,
+                os.path.join(self.hidden_dir, self.sections[snum]),
+                obj_names,
+                window,
+                name=f"section {snum}"
+            )
+        smoothed = {}
+        for result in processpool.startAll("Smoothing traces..."):
+            if result and result[1]:
+                smoothed[result[0]] = result[1]
+
         malformed = []
 
         for snum, section in self.enumerateSections(
-                message="Smoothing traces...",
-                series_states=series_states
+                message="Updating series data...",
+                series_states=series_states,
+                snums=sorted(smoothed.keys())
         ):
 
             for obj_name in obj_names:
 
                 obj = section.contours.get(obj_name)
 
-                if obj:
+                if obj and obj_name in smoothed[snum]:
 
                     smoothed_any = False
 
-                    for index, trace in enumerate(obj.traces):
+                    for index, (trace, points) in enumerate(zip(obj.traces, smoothed[snum][obj_name])):
 
-                        if trace.smooth(window=window, spacing=0.004):
+                        if points is not None:
 
+                            trace.points = points
                             smoothed_any = True
 
                         else:
@@ -1702,6 +1909,7 @@ class Series():
                 continue
 
             if "user_columns" in obj_data:
+                self.modified_obj_attrs.add(obj_name)
                 other_uc = obj_data["user_columns"]
                 if obj_name not in self.obj_attrs:
                     self.obj_attrs[obj_name] = {}
@@ -1739,6 +1947,7 @@ class Series():
             if not passes_filters:
                 continue
 
+            self.modified_obj_attrs.add(obj_name)
             for attr_name, attr_value in obj_data.items():
                 # skip user column data
                 if attr_name == "user_columns":
@@ -1769,8 +1978,13 @@ class Series():
             keep_above : str = "self",
             keep_below : str = "",
             series_states=None,
-            log_event=True):
+            log_event=True,
+            max_processes : int = None):
         """Import all the traces from another series.
+
+        Sections are merged in worker processes, each reading both section
+        files and writing the merged section. Object attributes and histories
+        are imported once at the end.
         
             Params:
                 other (Series): the series to import from
@@ -1786,13 +2000,12 @@ class Series():
                 keep_below (str): the series that is favored in the case of a conflict (overlap not reaching the threshold; "self", "other", or "")
                 series_states (dict): optional dict of undo states for GUI
                 log_event (bool): True if event should be logged
+                max_processes (int): the maximum number of worker processes (cpu count if None)
         """
         # # ensure that the two series have the same sections
         # if sorted(list(self.sections.keys())) != sorted(list(other.sections.keys())):
         #     return
-        
-        ## Supress logging for object creation
-        self.data.supress_logging = True
+        from PyReconstruct.modules.backend.threading import ProcessPoolProgBar, WorkerError
 
         ## Get current date and time for tagging
         d, t = getDateTime()
@@ -1802,35 +2015,81 @@ class Series():
             self.getFullHistory(),
             other.getFullHistory()
         )
-        
-        for snum, section in self.enumerateSections(
-            message="Importing traces...",
-            series_states=series_states
-        ):
-            ## Skip if section not requested or does not exist in other series
-            skip = snum not in range(*srange) or snum not in other.sections
-            
-            if skip: 
-                continue
-            
-            o_section = other.loadSection(snum)  # other section
-            histories_param = histories if check_history else None  # skip history if checking is not requested
 
-            section.importTraces(
-                o_section,
+        ## Skip sections not requested or that do not exist in other series
+        snums = [
+            snum for snum in sorted(self.sections.keys())
+            if (srange is None or snum in range(*srange)) and snum in other.sections
+        ]
+
+        # skip history if checking is not requested
+        if check_history and not histories.complete_match and histories.last_shared_index >= 0:
+            modified_since_diverge = histories.getModifiedSinceDivergeSections(snums)
+        else:
+            modified_since_diverge = None
+        
+        if group_filters:
+            other_groups = other.object_groups.getGroupDict()
+            group_names = set()
+            for gf in group_filters:
+                group_names |= set(other_groups[gf])
+        else:
+            group_names = None
+        
+        ## Store the undo states of the sections before their files are modified
+        if series_states is not None:
+            for snum in snums:
+                if not series_states[snum].initialized:
+                    series_states[self.loadSection(snum)]
+
+        ## Merge the section files in worker processes
+        processpool = ProcessPoolProgBar(max_processes)
+        for snum in snums:
+            processpool.createWorker(
+                importSectionFile,
+                snum,
+                os.path.join(self.hidden_dir, self.sections[snum]),
+                os.path.join(other.hidden_dir, other.sections[snum]),
                 regex_filters,
-                group_filters,
+                group_names,
+                None if modified_since_diverge is None else modified_since_diverge.get(snum, {}),
                 threshold,
                 flag_conflicts,
-                histories_param,
                 keep_above,
                 keep_below,
-                dt_str
+                dt_str,
+                name=f"section {snum}"
             )
+        ## The section files are written by the workers: apply the ones that were merged before reporting failures
+        error = None
+        try:
+            results = processpool.startAll("Importing traces...")
+        except WorkerError as e:
+            results, error = e.results, e
+        imported = {}
+        for result in results:
+            if result and result[1]:
+                imported[result[0]] = result[1]
+        
+        ## Supress logging for object creation
+        self.data.supress_logging = True
+
+        ## Update the series data (and undo states) with the merged sections
+        for snum, section in self.enumerateSections(
+            message="Updating series data...",
+            series_states=series_states,
+            snums=sorted(imported.keys())
+        ):
+            section.modified_contours.update(imported[snum])
+            self.data.updateSection(section, update_traces=True)
         
         ## Un-supress logging for object creation
         self.data.supress_logging = False
 
+        if error:
+            self.save()
+            raise error
+
         ## Restrict object if with group filters
         restrict_to = []  # empty = no additional restrictions
         
@@ -2089,42 +2348,57 @@ class Series():
                 g = group
         return g
     
-    def deleteDuplicateTraces(self, threshold : float, include_locked=False, series_states=None, log_event=True):
+    def deleteDuplicateTraces(self, threshold : float, include_locked=False, series_states=None, log_event=True, max_processes : int = None):
         """Delete all duplicate traces in the series (keep tags).
+
+        Duplicates are found section by section in worker processes (see
+        Contour.findDuplicates) and removed here.
         
             Params:
                 threshold (float): the threshold for overlapping traces to be considered duplicates
+                include_locked (bool): True if locked objects should be checked
                 series_states (dict): optional dict of undo states for GUI
                 log_event (bool): True if event should be logged
+                max_processes (int): the maximum number of worker processes (cpu count if None)
+            Returns:
+                (dict): section number : set of the names of the contours with removed duplicates
         """
+        from PyReconstruct.modules.backend.threading import ProcessPoolProgBar
+
+        if include_locked:
+            exclude = set()
+        else:
+            exclude = set(n for n in self.data["objects"] if self.getAttr(n, "locked"))
+
+        processpool = ProcessPoolProgBar(max_processes)
+        for snum in sorted(self.sections.keys()):
+            processpool.createWorker(
+                findSectionDuplicates,
+                snum,
+                os.path.join(self.hidden_dir, self.sections[snum]),
+                exclude,
+                threshold,
+                name=f"section {snum}"
+            )
+        duplicates = {}
+        for result in processpool.startAll("Finding duplicate traces..."):
+            if result and result[1]:
+                duplicates[result[0]] = result[1]
+
         removed = {}
         for snum, section in self.enumerateSections(
             message="Removing duplicate traces...",
-            series_states=series_states
+            series_states=series_states,
+            snums=sorted(duplicates.keys())
         ):
-            found_on_section = False
-            for cname in section.contours:
-                if not include_locked and self.getAttr(cname, "locked"):
-                    continue
-                i = 1
-                while i < len(section.contours[cname]):
-                    trace1 = section.contours[cname][i]
-                    # check against all previous traces
-                    for j in range(i-1, -1, -1):
-                        trace2 = section.contours[cname][j]
-                        # if overlaps, remove trace and break
-                        if trace1.overlaps(trace2, threshold=threshold):
-                            if snum not in removed:
-                                removed[snum] = set()
-                            removed[snum].add(cname)
-                            found_on_section = True
-                            trace1.mergeTags(trace2)
-                            section.removeTrace(trace2)
-                            i -= 1
-                            break
-                    i += 1
-            if found_on_section:
-                section.save()
+            for cname, pairs in duplicates[snum].items():
+                traces = section.contours[cname].getTraces()
+                for removed_i, kept_i in pairs:
+                    traces[kept_i].mergeTags(traces[removed_i])
+                for removed_i, kept_i in pairs:
+                    section.removeTrace(traces[removed_i])
+            removed[snum] = set(duplicates[snum].keys())
+            section.save()
         
         if log_event:
             self.addLog(None, None, "Delete all duplicate traces")
@@ -2153,9 +2427,9 @@ class Series():
                 (LogSet): the object containing the full history
         """
         csv_fp = os.path.join(self.hidden_dir, "existing_log.csv")
-        with open(csv_fp, "r") as f:
-            log_list = f.readlines()[1:]
-        full_hist = LogSet.fromList(log_list)
+        if self.history_csv is None or self.history_csv.csv_fp != csv_fp:
+            self.history_csv = LogCSV(csv_fp)
+        full_hist = self.history_csv.getLogSet()
         for log in self.log_set.all_logs:
             full_hist.addExistingLog(log)
         
@@ -2306,6 +2580,7 @@ class Series():
             attrs = self.ztrace_attrs
         else:
             attrs = self.obj_attrs
+            self.modified_obj_attrs.add(name)
         
         if name not in attrs:
             attrs[name] = {}
@@ -2328,6 +2603,7 @@ class Series():
 
         # obj_attrs
         del(self.obj_attrs[name])
+        self.modified_obj_attrs.add(name)
 
         # object host
         self.host_tree.removeObject(name)
@@ -2372,6 +2648,7 @@ class Series():
                         new_cols[col_name] = opt
 
             self.obj_attrs[new_name] = self.obj_attrs[old_name].copy()
+            self.modified_obj_attrs.add(new_name)
         
         # rename obj hosts
         self.host_tree.renameObject(old_name, new_name)
@@ -2398,12 +2675,14 @@ class Series():
                     self.obj_attrs[name] = {}
                 if "curation" not in self.obj_attrs[name] or not self.obj_attrs[name]["curation"][0]:  # overwrite if at previous step in curation flow
                     self.obj_attrs[name]["curation"] = (True, log.user, log.date)
+                    self.modified_obj_attrs.add(name)
                 marked_objs.add(name)
             elif "Mark as needs curation" in log.event:
                 if name not in self.obj_attrs:
                     self.obj_attrs[name] = {}
                 if "curation" not in self.obj_attrs[name]:
                     self.obj_attrs[name]["curation"] = (False, "", log.date)
+                    self.modified_obj_attrs.add(name)
                 marked_objs.add(name)
     
     def getOption(self, option_name : str, get_default=False):
@@ -2574,7 +2853,7 @@ class Series():
         self.palette_traces[palette_name] = trace_list
 
     def exportObjectsCSV(self, output_fp: Union[str, Path]="", notify: bool=False) -> None:
-        """Export all object data as CSV file."""
+        """Export all object data as CSV file (or Parquet/Arrow by file extension)."""
 
         self.objects.exportCSV(str(output_fp))
 
@@ -2582,25 +2861,35 @@ class Series():
 
             print(f"CSV exported to: {str(output_fp)}")
 
-    def exportZtracesCSV(self, output_fp: Union[str, Path]="", notify:bool=False) -> None:
-        """Export all z-trace data as CSV file."""
+    def iterZtraceRows(self):
+        """Iterate through the rows of the z-trace data export."""
 
-        sep = "|"
+        ztraces = list(self.ztraces.values())
+        distances = Ztrace.getDistances(self, ztraces)
 
-        out_str = f"series{sep}ztrace{sep}start{sep}end{sep}length\n"
+        for z, d in zip(ztraces, distances):
 
-        for _, z in self.ztraces.items():
+            yield [
+                self.code,
+                z.name,
+                z.getStart(),
+                z.getEnd(),
+                round(d, 5)
+            ]
 
-            start = z.getStart()
-            end = z.getEnd()
-            z_len = round(z.getDistance(self), 5)
-            
-            out_str += f"{self.code}{sep}{z.name}{sep}{start}{sep}{end}{sep}{z_len}\n"
+    def exportZtracesCSV(self, output_fp: Union[str, Path]="", notify:bool=False) -> None:
+        """Export all z-trace data as CSV file (or Parquet/Arrow by file extension)."""
 
-        if output_fp:
+        if not output_fp:
+            return
 
-            with open(str(output_fp), "w") as f:
-                f.write(out_str)
+        writeTable(
+            str(output_fp),
+            ["series", "ztrace", "start", "end", "length"],
+            ["str", "str", "int", "int", "float"],
+            self.iterZtraceRows(),
+            delimiter="|"
+        )
 
         if notify:
 
@@ -2706,9 +2995,10 @@ class Series():
             del(self.user_columns[col_name])
 
         # iterate through all object attributes and remove the column data
-        for attrs in self.obj_attrs.values():
+        for name, attrs in self.obj_attrs.items():
             if "user_columns" in attrs and col_name in attrs["user_columns"]:
                 del(attrs["user_columns"][col_name])
+                self.modified_obj_attrs.add(name)
         
         if log_event:
             self.addLog(None, None, f"Delete user column {col_name}")
@@ -2736,20 +3026,22 @@ class Series():
             self.user_columns[new_name] = self.user_columns[col_name]
             del(self.user_columns[col_name])
             # rename the column in all obj attrs
-            for attrs in self.obj_attrs.values():
+            for name, attrs in self.obj_attrs.items():
                 if "user_columns" in attrs and col_name in attrs["user_columns"]:
                     attrs["user_columns"][new_name] = attrs["user_columns"][col_name]
                     del(attrs["user_columns"][col_name])
+                    self.modified_obj_attrs.add(name)
         col_name = new_name
 
         if self.user_columns[col_name] != new_opts:
             # replace the options in the user_columns dict
             self.user_columns[col_name] = new_opts
             # remove old options from all obj attrs
-            for attrs in self.obj_attrs.values():
+            for name, attrs in self.obj_attrs.items():
                 if "user_columns" in attrs and col_name in attrs["user_columns"]:
                     if attrs["user_columns"][col_name] not in new_opts:
                         del(attrs["user_columns"][col_name])
+                        self.modified_obj_attrs.add(name)
         
         if log_event:
             self.addLog(None, None, f"Edit user column {new_name}")
@@ -2957,7 +3249,7 @@ class Series():
     
 class SeriesIterator():
 
-    def __init__(self, series : Series, show_progress : bool, message : str, series_states, breakable=True):
+    def __init__(self, series : Series, show_progress : bool, message : str, series_states, breakable=True, snums : list = None):
         """Create the series iterator object.
         
             Params:
@@ -2966,8 +3258,10 @@ class SeriesIterator():
                 message (str): the message to show
                 series_states (dict): section number : SectionStates (for use with GUI)
                 breakable (bool): True if series state is breakable
+                snums (list): the section numbers to iterate through (all sections if None)
         """
         self.series = series
+        self.snums = snums
         self.section = None
         self.show_progress = show_progress
         self.message = message
@@ -2977,8 +3271,13 @@ class SeriesIterator():
     
     def __iter__(self):
         """Allow the user to iterate through the sections."""
-        self.section_numbers = sorted(list(self.series.sections.keys()))
+        if self.snums is None:
+            self.section_numbers = sorted(list(self.series.sections.keys()))
+        else:
+            self.section_numbers = sorted(self.snums)
         self.sni = 0
+        if not self.section_numbers:
+            self.show_progress = False
         if self.show_progress:
             self.progbar = getProgbar(
                 text=self.message,
@@ -3018,6 +3317,38 @@ class SeriesIterator():
             raise StopIteration
 
 
+def findSectionDuplicates(snum : int, section_fp : str, exclude : set, threshold : float) -> tuple:
+    """Find the duplicate traces on a section file (run in a worker process).
+
+        Params:
+            snum (int): the section number
+            section_fp (str): the filepath of the section file
+            exclude (set): the names of the contours to skip
+            threshold (float): the overlap threshold
+        Returns:
+            (int): the section number
+            (dict): contour name : (removed index, kept index) pairs (see Contour.findDuplicates)
+    """
+    with open(section_fp, "r") as f:
+        contours = json.load(f)["contours"]
+    
+    # screen the traces as the loaded section does so that the indices match
+    contours = loadContours({
+        name : trace_lists for name, trace_lists in contours.items()
+        if name not in exclude
+    })
+    
+    duplicates = {}
+    for name, contour in contours.items():
+        if len(contour.traces) < 2:
+            continue
+        pairs = contour.findDuplicates(threshold)
+        if pairs:
+            duplicates[name] = pairs
+    
+    return snum, duplicates
+
+
 def updateDictLists(d1 : dict, d2 : dict):
     """In the cases where two dictionaries have values as lists, combine the two lists for each value."""
     d = deepcopy(d1)
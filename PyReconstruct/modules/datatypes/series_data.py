@@ -1,10 +1,12 @@
 """Collect data to pass to table manager."""
 
 from typing import Union
+from collections import Counter
 
 from PyReconstruct.modules.calc import lineDistance, area
 
 from .section import Section
+from .table_export import writeTable
 from .transform import Transform
 from .trace import Trace
 
@@ -56,11 +58,69 @@ class TraceData():
         return self.index < other.index
 
 
+class SectionSums():
+
+    def __init__(self, thickness : float):
+        """Create the running sums for the traces of an object on one section.
+        
+            Params:
+                thickness (float): the thickness of the section
+        """
+        self.thickness = thickness
+        self.count = 0
+        self.closed = 0
+        self.area = 0  # open traces have no area
+        self.open_length = 0
+        self.radius = 0
+        self.tags = Counter()
+    
+    def addTrace(self, trace_data : TraceData):
+        """Add a trace to the sums."""
+        self.count += 1
+        if trace_data.closed:
+            self.closed += 1
+        else:
+            self.open_length += trace_data.getLength()
+        self.area += trace_data.getArea()
+        self.radius += trace_data.getRadius()
+        self.tags.update(trace_data.getTags())
+    
+    def getFlatArea(self) -> float:
+        return self.area + self.open_length * self.thickness
+    
+    def getVolume(self) -> float:
+        return self.area * self.thickness
+
+
 class ObjectData():
 
     def __init__(self):
-        """Create an object data object."""
+        """Create an object data object.
+
+        The object-level metrics are kept as running totals of the per-section
+        sums, updated when traces are added or a section is cleared.
+        """
         self.traces = {}
+        self.sums = {}
+        self.resetTotals()
+    
+    def resetTotals(self):
+        """Recompute the object totals from the section sums."""
+        self.count = 0
+        self.closed = 0
+        self.flat_area = 0
+        self.volume = 0
+        self.radius = 0
+        self.tags = Counter()
+        for sums in self.sums.values():
+            self.count += sums.count
+            self.closed += sums.closed
+            self.flat_area += sums.getFlatArea()
+            self.volume += sums.getVolume()
+            self.radius += sums.radius
+            self.tags.update(sums.tags)
+        self.start = min(self.traces) if self.traces else None
+        self.end = max(self.traces) if self.traces else None
     
     def isEmpty(self) -> bool:
         """Return True of object data is empty."""
@@ -76,6 +136,11 @@ class ObjectData():
         """
         if section.n not in self.traces:
             self.traces[section.n] = []
+            self.sums[section.n] = SectionSums(section.thickness)
+            if self.start is None or section.n < self.start:
+                self.start = section.n
+            if self.end is None or section.n > self.end:
+                self.end = section.n
             
         alignment = series.getAttr(trace.name, "alignment")
         
@@ -91,10 +156,21 @@ class ObjectData():
         tform = section.tforms[alignment]
 
         i = len(self.traces[section.n])
-        
-        self.traces[section.n].append(
-            TraceData(trace, i, tform)
-        )
+        trace_data = TraceData(trace, i, tform)
+        
+        self.traces[section.n].append(trace_data)
+
+        ## Update the running totals
+        sums = self.sums[section.n]
+        flat_area, volume = sums.getFlatArea(), sums.getVolume()
+        sums.addTrace(trace_data)
+        self.count += 1
+        if trace_data.closed:
+            self.closed += 1
+        self.flat_area += sums.getFlatArea() - flat_area
+        self.volume += sums.getVolume() - volume
+        self.radius += trace_data.getRadius()
+        self.tags.update(trace_data.getTags())
     
     def clearSection(self, snum : int):
         """Clear the traces on a specific section.
@@ -104,6 +180,24 @@ class ObjectData():
         """
         if snum in self.traces:
             del(self.traces[snum])
+            del(self.sums[snum])
+            # recompute from the section sums (no floating point drift)
+            self.resetTotals()
+    
+    def setThickness(self, snum : int, thickness : float):
+        """Update the thickness of a section used for the flat area and volume.
+        
+            Params:
+                snum (int): the section number
+                thickness (float): the new section thickness
+        """
+        if snum in self.sums and self.sums[snum].thickness != thickness:
+            self.sums[snum].thickness = thickness
+            self.resetTotals()
+    
+    def getSections(self) -> list:
+        """Get the sorted numbers of the sections the object is on."""
+        return sorted(self.traces)
 
 
 class SeriesData():
@@ -120,6 +214,8 @@ class SeriesData():
             "objects": {},
         }
         self.supress_logging = False
+        self.tforms_version = 0  # changed whenever a section transform changes
+        self.thickness_version = 0  # changed whenever a section thickness changes
     
     def __getitem__(self, index):
         """Allow direct indexing of data dictionary."""
@@ -150,6 +246,8 @@ class SeriesData():
             "sections": {},
             "objects": {},
         }
+        self.tforms_version += 1
+        self.thickness_version += 1
 
         for snum, section in self.series.enumerateSections():
 
@@ -179,10 +277,18 @@ class SeriesData():
             }
             
             self.data["sections"][section.n] = d
+            self.tforms_version += 1
+            self.thickness_version += 1
             
         else:
             
             d = self.data["sections"][section.n]
+            if not SeriesData.tformsEqual(d["tforms"], section.tforms):
+                self.tforms_version += 1
+            if d["thickness"] != section.thickness:
+                for obj_data in self.data["objects"].values():
+                    obj_data.setThickness(section.n, section.thickness)
+                self.thickness_version += 1
             d["thickness"] = section.thickness
             d["locked"] = section.align_locked
             d["bc_profiles"] = section.bc_profiles.copy()
@@ -240,6 +346,21 @@ class SeriesData():
                     ## Remove object from object attributes dicts
                     self.series.removeObjAttrs(obj_name)
     
+    # STATIC METHOD
+    def tformsEqual(tforms1 : dict, tforms2 : dict) -> bool:
+        """Check if two alignment : transform dictionaries are the same.
+        
+            Params:
+                tforms1 (dict): the first transforms
+                tforms2 (dict): the second transforms
+        """
+        if tforms1.keys() != tforms2.keys():
+            return False
+        for alignment, tform in tforms1.items():
+            if tform.getList() != tforms2[alignment].getList():
+                return False
+        return True
+    
     def addTrace(self, trace : Trace, section : Section):
         """Add trace data to the existing object.
         
@@ -281,7 +402,7 @@ class SeriesData():
         if obj_data is None or obj_data.isEmpty():
             return None
         
-        return min(obj_data.traces.keys())
+        return obj_data.start
         
     def getEnd(self, obj_name : str) -> int:
         """Get the last section of the object.
@@ -293,7 +414,24 @@ class SeriesData():
         if obj_data is None or obj_data.isEmpty():
             return None
         
-        return max(obj_data.traces.keys())
+        return obj_data.end
+    
+    def getSections(self, obj_name : str) -> list:
+        """Get the sections the object is on.
+        
+            Params:
+                obj_name (str): the name of the object to retrieve data for
+            Returns:
+                (list): the sorted section numbers (None if the series data has not been loaded)
+        """
+        if not self.data["sections"]:
+            return None
+        
+        obj_data = self.data["objects"].get(obj_name)
+        if obj_data is None:
+            return []
+        
+        return obj_data.getSections()
     
     def getCount(self, obj_name : str) -> int:
         """Get the number of traces associated with the object.
@@ -305,10 +443,7 @@ class SeriesData():
         if obj_data is None:
             return None
         
-        c = 0
-        for trace_list in obj_data.traces.values():
-            c += len(trace_list)
-        return c
+        return obj_data.count
     
     def getFlatArea(self, obj_name : str) -> float:
         """Get the flat area of the object.
@@ -320,14 +455,7 @@ class SeriesData():
         if obj_data is None:
             return None
         
-        fa = 0
-        for snum, trace_list in obj_data.traces.items():
-            for trace_data in trace_list:
-                if trace_data.closed:
-                    fa += trace_data.getArea()
-                else:
-                    fa += trace_data.getLength() * self.data["sections"][snum]["thickness"]
-        return fa
+        return obj_data.flat_area
 
     def getVolume(self, obj_name : str) -> float:
         """Get the volume of the object.
@@ -340,14 +468,7 @@ class SeriesData():
         if obj_data is None:
             return None
         
-        v = 0
-        
-        for snum, trace_list in obj_data.traces.items():
-            
-            for trace_data in trace_list:
-                v += trace_data.getArea() * self.data["sections"][snum]["thickness"]
-        
-        return v
+        return obj_data.volume
 
     def getSurfaceArea(self, obj_name: str) -> float:
         """Get the surface area of an object."""
@@ -367,17 +488,10 @@ class SeriesData():
         if obj_data is None:
             return None
 
-        closed = []
-        
-        for _, trace_list in obj_data.traces.items():
-
-            for trace_data in trace_list:
-                closed.append(trace_data.closed)
-
-        if sum(closed) == 0:
+        if obj_data.closed == 0:
             config = "open"
             
-        elif sum(closed) == len(closed):
+        elif obj_data.closed == obj_data.count:
             config = "closed"
             
         else:
@@ -395,11 +509,7 @@ class SeriesData():
         if obj_data is None:
             return None
         
-        tags = set()
-        for trace_list in obj_data.traces.values():
-            for trace_data in trace_list:
-                tags = tags.union(trace_data.getTags())
-        return tags
+        return set(obj_data.tags)
     
     def getAvgRadius(self, obj_name : str) -> float:
         """Get the average stamp radius of an object.
@@ -411,13 +521,7 @@ class SeriesData():
         if obj_data is None:
             return None
         
-        radii = []
-        for trace_list in obj_data.traces.values():
-            for trace_data in trace_list:
-                radii.append(trace_data.getRadius())
-        avg_radius = sum(radii) / len(radii)
-
-        return avg_radius
+        return obj_data.radius / obj_data.count
 
     def getZtraceDist(self, ztrace_name : str) -> float:
         """Get the distance of a ztrace.
@@ -472,73 +576,54 @@ class SeriesData():
             c += len(data["flags"])
         return c
     
-    def exportTracesCSV(self, out_fp : str = None):
-        """Export all trace data to a CSV file.
-        
-            Params:
-                out_fp (str): filepath of exported CSV (str returned if no filepath provided)
-        """
-        out_str = "Name,Section,Index,Hidden,Closed,Tags,Length,Area,Radius,Centroid-x,Centroid-y,Feret-Max,Feret-Min\n"
-
-        ## Iterate through all traces
-        objs = self.data["objects"].keys()
-        
-        for name in sorted(objs):
+    def iterTraceRows(self):
+        """Iterate through the rows of the trace data export (sorted by object and section)."""
+        for name in sorted(self.data["objects"].keys()):
             
-            sections = self.series.sections.keys()
+            obj_data = self.data["objects"][name]
             
-            for snum in sorted(sections):
-                
-                trace_list = self.getTraceData(name, snum)
+            ## Only the sections the object is on
+            for snum in sorted(obj_data.traces.keys()):
                 
-                if not trace_list:
-                    
-                    continue
-                
-                for i, t in enumerate(trace_list):
-
-                    hidden     = "yes" if t.hidden else "no"
-                    closed     = "yes" if t.closed else "no"
-                    tags       = ' '.join(t.getTags())
-                    length     = round(t.getLength(), 7)
-                    xs_area    = round(t.getArea(), 7)
-                    radius     = round(t.getRadius(), 7)
-
-                    centroid   = t.getCentroid()
-                    centroid_x = round(centroid[0], 7)
-                    centroid_y = round(centroid[1], 7)
+                for i, t in enumerate(obj_data.traces[snum]):
 
-                    feret      = t.getFeret()
-                    feret_max  = round(feret[1], 7)
-                    feret_min  = round(feret[0], 7)
+                    centroid = t.getCentroid()
+                    feret = t.getFeret()
 
-                    vals = [
+                    yield [
                         name,
                         snum,
                         i,
-                        hidden,
-                        closed,
-                        tags,
-                        length,
-                        xs_area,
-                        radius,
-                        centroid_x,
-                        centroid_y,
-                        feret_max,
-                        feret_min
+                        "yes" if t.hidden else "no",
+                        "yes" if t.closed else "no",
+                        ' '.join(t.getTags()),
+                        round(t.getLength(), 7),
+                        round(t.getArea(), 7),
+                        round(t.getRadius(), 7),
+                        round(centroid[0], 7),
+                        round(centroid[1], 7),
+                        round(feret[1], 7),
+                        round(feret[0], 7)
                     ]
+    
+    def exportTracesCSV(self, out_fp : str = None):
+        """Export all trace data to a CSV file.
 
-                    vals = list(map(str, vals))
-                    
-                    trace_line = ','.join(vals)
-                    out_str += trace_line + "\n"
+        The rows are written as they are computed (.parquet/.arrow/.feather
+        filepaths are written with pyarrow).
         
-        # export the csv file
-        if out_fp:
-            with open(out_fp, "w") as f:
-                f.write(out_str)
-        else:
-            return out_str
+            Params:
+                out_fp (str): filepath of exported CSV (str returned if no filepath provided)
+        """
+        header = [
+            "Name", "Section", "Index", "Hidden", "Closed", "Tags", "Length", "Area",
+            "Radius", "Centroid-x", "Centroid-y", "Feret-Max", "Feret-Min"
+        ]
+        types = [
+            "str", "int", "int", "str", "str", "str", "float", "float",
+            "float", "float", "float", "float", "float"
+        ]
+        return writeTable(out_fp, header, types, self.iterTraceRows())
     
     def getAvgMag(self):
         """Return the average magnification of the series."""
@@ -0,0 +1,99 @@
+"""Streaming writers for the tabular series exports.
+
+Rows are produced by generators and written as they are produced, so an
+export takes bounded memory however many rows it has. Filepaths ending in
+.parquet, .arrow or .feather are written with pyarrow (an optional
+dependency) in batches of rows; anything else is written as CSV.
+"""
+
+import io
+import os
+import csv
+from itertools import islice
+
+
+arrow_exts = (".parquet", ".arrow", ".feather")
+
+
+def writeTable(out_fp : str, header : list, types : list, rows, delimiter : str = ",", batch_size : int = 65536):
+    """Write rows to a CSV (or Parquet/Arrow) file.
+
+        Params:
+            out_fp (str): the filepath to write to (CSV str returned if not provided)
+            header (list): the column names
+            types (list): the type of each column ("str", "int" or "float"; the Parquet/Arrow schema)
+            rows (iterable): the rows (lists of values in header order)
+            delimiter (str): the CSV delimiter
+            batch_size (int): the number of rows per Parquet/Arrow batch
+        Returns:
+            (str): the CSV text if no filepath was provided
+    """
+    if not out_fp:
+        f = io.StringIO()
+        writeCSV(f, header, rows, delimiter)
+        return f.getvalue()
+
+    out_fp = str(out_fp)
+    if os.path.splitext(out_fp)[1].lower() in arrow_exts:
+        writeArrow(out_fp, header, types, rows, batch_size)
+    else:
+        with open(out_fp, "w", newline="") as f:
+            writeCSV(f, header, rows, delimiter)
+
+
+def writeCSV(f, header : list, rows, delimiter : str = ","):
+    """Write rows to an open text file as CSV.
+
+        Params:
+            f (file): the open file
+            header (list): the column names
+            rows (iterable): the rows
+            delimiter (str): the CSV delimiter
+    """
+    writer = csv.writer(f, delimiter=delimiter, lineterminator="\n")
+    writer.writerow(header)
+    writer.writerows(rows)
+
+
+def writeArrow(out_fp : str, header : list, types : list, rows, batch_size : int = 65536):
+    """Write rows to a Parquet (.parquet) or Arrow IPC (.arrow/.feather) file.
+
+    The schema is declared by the export (not inferred from the rows), so
+    every batch is written with the same column types.
+
+        Params:
+            out_fp (str): the filepath to write to
+            header (list): the column names
+            types (list): the type of each column ("str", "int" or "float")
+            rows (iterable): the rows
+            batch_size (int): the number of rows per batch
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ModuleNotFoundError:
+        raise ModuleNotFoundError("pyarrow is required to export Parquet/Arrow files.")
+
+    arrow_types = {"str" : pa.string(), "int" : pa.int64(), "float" : pa.float64()}
+    schema = pa.schema([
+        pa.field(h, arrow_types[t]) for h, t in zip(header, types)
+    ])
+
+    parquet = out_fp.lower().endswith(".parquet")
+    rows = iter(rows)
+    if parquet:
+        writer = pq.ParquetWriter(out_fp, schema)
+    else:
+        writer = pa.ipc.new_file(out_fp, schema)
+
+    with writer:
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            columns = dict(
+                (h, [r[i] for r in batch]) for i, h in enumerate(header)
+            )
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            if len(batch) < batch_size:
+                break
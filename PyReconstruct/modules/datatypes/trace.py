@@ -3,6 +3,8 @@ from typing import Union
 
 from skimage.draw import polygon
 import numpy as np
+import shapely
+from shapely.geometry import Polygon
 
 from .transform import Transform
 from .points import Points
@@ -67,6 +69,12 @@ class Trace():
 
         return copy_trace
     
+    def __getstate__(self):
+        """Pickle the trace data without the cached geometry."""
+        state = self.__dict__.copy()
+        state.pop("_geometry", None)
+        return state
+    
     def add(self, point : tuple):
         """Add a point to the trace.
         
@@ -96,12 +104,13 @@ class Trace():
             return False
         return True
 
-    def overlaps(self, other, threshold=0.99):
+    def overlaps(self, other, threshold=0.99, raster=False):
         """Check if trace points overlap.
         
             Params:
                 other (Trace): the trace to compare
                 threshold (float): the threshold overlap ratio to define overlapping (exclusive)
+                raster (bool): True if the overlap ratio should be approximated on a raster
             Returns:
                 (bool): whether or not trace traces overlap
         """
@@ -121,7 +130,7 @@ class Trace():
             return True
         
         # compare amount of overlap
-        r = self.getOverlapRatio(other)
+        r = self.getOverlapRatio(other, raster)
         if threshold < 1 and r > threshold:
             return True
         elif threshold == r == 1:
@@ -502,11 +511,63 @@ class Trace():
         """
         self.tags = self.tags.union(other.tags)
     
-    def getOverlapRatio(self, other):
+    def getGeometry(self):
+        """Get the (prepared) polygon of the trace points.
+
+        The polygon is cached on the trace and rebuilt when the points change.
+        Self-intersecting traces are made valid.
+        
+            Returns:
+                (Polygon): the shapely polygon (empty if there are fewer than 3 points)
+        """
+        cached = self.__dict__.get("_geometry")
+        if cached is not None and cached[0] == self.points:
+            return cached[1]
+
+        if len(self.points) < 3:
+            geometry = Polygon()
+        else:
+            geometry = Polygon(self.points)
+            if not geometry.is_valid:
+                geometry = shapely.make_valid(geometry)
+        shapely.prepare(geometry)
+        self._geometry = (self.points.copy(), geometry)
+
+        return geometry
+    
+    def getOverlapRatio(self, other, raster=False):
         """Get the amount of intersection between two traces.
+
+        The ratio is the exact area of the intersection over the area of the
+        union of the trace polygons.
+        
+            Params:
+                other (Trace): the trace to compare against
+                raster (bool): True if the ratio should be approximated on a raster instead
+            Returns:
+                (float): the intersection over union
+        """
+        if raster:
+            return self.getRasterOverlapRatio(other)
+        
+        g1, g2 = self.getGeometry(), other.getGeometry()
+        if not g1.intersects(g2):
+            return 0
+        
+        intersect_area = g1.intersection(g2).area
+        union_area = g1.area + g2.area - intersect_area
+        if union_area <= 0:
+            return 0
+        
+        return intersect_area / union_area
+    
+    def getRasterOverlapRatio(self, other):
+        """Get the amount of intersection between two traces on a raster of about 1e4 pixels.
         
             Params:
                 other (Trace): the trace to compare against
+            Returns:
+                (float): the intersection over union
         """
         xmin1, ymin1, xmax1, ymax1 = self.getBounds()
         xmin2, ymin2, xmax2, ymax2 = other.getBounds()
@@ -554,6 +615,108 @@ class Trace():
 
         return intersect_area / union_area
 
+    # STATIC METHOD
+    def getOverlapRatios(traces1 : list, traces2 : list):
+        """Get the overlap ratios of every intersecting pair of traces in two lists.
+
+        The candidate pairs are queried from an STRtree of the second list and
+        the ratios are computed for all of them at once.
+        
+            Params:
+                traces1 (list): the first list of traces
+                traces2 (list): the second list of traces
+            Returns:
+                (np.ndarray): the indices of the traces in the first list
+                (np.ndarray): the indices of the traces in the second list
+                (np.ndarray): the overlap ratios of the pairs (all above zero)
+        """
+        if not traces1 or not traces2:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, np.empty(0)
+        
+        g1 = np.array([t.getGeometry() for t in traces1], dtype=object)
+        g2 = np.array([t.getGeometry() for t in traces2], dtype=object)
+        i1, i2 = shapely.STRtree(g2).query(g1, predicate="intersects")
+
+        intersect_areas = shapely.area(shapely.intersection(g1[i1], g2[i2]))
+        union_areas = shapely.area(g1[i1]) + shapely.area(g2[i2]) - intersect_areas
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratios = np.where(union_areas > 0, intersect_areas / union_areas, 0)
+        
+        keep = ratios > 0
+        return i1[keep], i2[keep], ratios[keep]
+
+    # STATIC METHOD
+    def getOverlappingPairs(traces1 : list, traces2 : list, threshold : float = 0.99) -> list:
+        """Get every pair of traces from two lists that overlap (see Trace.overlaps).
+
+        Traces with identical points are paired by hashing. The other
+        candidates are queried from an STRtree of the trace bounds (padded by
+        the point tolerance) and their overlap ratios are computed at once.
+        
+            Params:
+                traces1 (list): the first list of traces
+                traces2 (list): the second list of traces
+                threshold (float): the threshold overlap ratio (exclusive)
+            Returns:
+                (list): the sorted (index in traces1, index in traces2) pairs for which traces1[i].overlaps(traces2[j], threshold)
+        """
+        if not traces1 or not traces2:
+            return []
+        
+        ## Pair the traces with identical points
+        pairs = set()
+        by_key = {}
+        for j, t in enumerate(traces2):
+            by_key.setdefault((t.closed, tuple(t.points)), []).append(j)
+        for i, t in enumerate(traces1):
+            for j in by_key.get((t.closed, tuple(t.points)), ()):
+                pairs.add((i, j))
+        
+        ## Query the candidates with intersecting (padded) bounds
+        pts1 = [np.array(t.points, dtype=float).reshape(-1, 2) for t in traces1]
+        pts2 = [np.array(t.points, dtype=float).reshape(-1, 2) for t in traces2]
+        def getBoxes(pts_list):
+            bounds = np.array([
+                (*p.min(axis=0), *p.max(axis=0)) if len(p) else (np.nan,) * 4
+                for p in pts_list
+            ])
+            return shapely.box(bounds[:,0] - 1e-2, bounds[:,1] - 1e-2, bounds[:,2] + 1e-2, bounds[:,3] + 1e-2)
+        i1, i2 = shapely.STRtree(getBoxes(pts2)).query(getBoxes(pts1))
+
+        closed1 = np.array([t.closed for t in traces1], dtype=bool)
+        closed2 = np.array([t.closed for t in traces2], dtype=bool)
+        keep = closed1[i1] == closed2[i2]
+        i1, i2 = i1[keep], i2[keep]
+
+        ## Compare the points directly
+        check = []
+        for i, j in zip(i1.tolist(), i2.tolist()):
+            if (i, j) in pairs:
+                continue
+            p1, p2 = pts1[i], pts2[j]
+            if len(p1) == len(p2) and not np.any(np.abs(p1 - p2) > 1e-2):
+                pairs.add((i, j))
+            else:
+                check.append((i, j))
+        
+        ## Compare the amount of overlap
+        if check:
+            check = np.array(check)
+            g1 = np.array([t.getGeometry() for t in traces1], dtype=object)[check[:,0]]
+            g2 = np.array([t.getGeometry() for t in traces2], dtype=object)[check[:,1]]
+            intersect_areas = shapely.area(shapely.intersection(g1, g2))
+            union_areas = shapely.area(g1) + shapely.area(g2) - intersect_areas
+            with np.errstate(divide="ignore", invalid="ignore"):
+                r = np.where(union_areas > 0, intersect_areas / union_areas, 0)
+            if threshold < 1:
+                overlapping = r > threshold
+            else:
+                overlapping = (threshold == 1) & (r == 1)
+            pairs.update((int(i), int(j)) for i, j in check[overlapping])
+        
+        return sorted(pairs)
+
     def smooth(self, window: int, spacing: Union[int, float]) -> bool:
         """Smooth trace in place.
 
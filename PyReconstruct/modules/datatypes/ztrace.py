@@ -1,4 +1,6 @@
-from PyReconstruct.modules.calc import distance3D, rolling_average
+import numpy as np
+
+from PyReconstruct.modules.calc import moving_average
 
 from PyReconstruct.modules.datatypes_legacy import ZContour as XMLZContour
 
@@ -14,8 +16,29 @@ class Ztrace():
         """
         self.name = name
         self.color = color
+        self.version = 0  # incremented whenever the points are edited
         self.points = points
     
+    @property
+    def points(self):
+        return self._points
+    
+    @points.setter
+    def points(self, value):
+        """Replace the points (invalidates the index entry of the ztrace)."""
+        self._points = value
+        self.version += 1
+    
+    def setPoint(self, i : int, point : tuple):
+        """Replace a single point of the ztrace.
+        
+            Params:
+                i (int): the index of the point
+                point (tuple): the new point (x, y, section)
+        """
+        self._points[i] = point
+        self.version += 1
+    
     def copy(self):
         """Return a copy of the ztrace object."""
         return Ztrace(
@@ -169,25 +192,34 @@ class Ztrace():
             Returns:
                 (float): the distance of the ztrace
         """
-        # get z-values for each section
-        zvals = series.getZValues()
-
-        alignment = series.getAttr(self.name, "alignment", ztrace=True)
-        if not alignment: alignment = series.alignment
-
-        real_pts = []
-        for x, y, snum in self.points:
-            tform = series.data["sections"][snum]["tforms"][alignment]
-            new_pt = (*tform.map(x, y), zvals[snum])
-            real_pts.append(new_pt)
+        return Ztrace.getDistances(series, [self])[0]
+    
+    # STATIC METHOD
+    def getDistances(series, ztraces : list) -> list:
+        """Get the distances of many z-traces at once.
+        
+            Params:
+                series (Series): the series containing the ztraces
+                ztraces (list): the ztraces to measure
+            Returns:
+                (list): the distance of each ztrace
+        """
+        if not ztraces:
+            return []
         
-        dist = 0
-        for i in range(len(real_pts[:-1])):
-            x1, y1, z1 = real_pts[i]
-            x2, y2, z2 = real_pts[i+1]
-            dist += distance3D(x1, y1, z1, x2, y2, z2)
+        pts, snums, tforms, lengths = getFieldPoints(series, ztraces)
+        z = series.getZArray()[snums]
+        real_pts = np.column_stack([mapPoints(pts, tforms), z])
 
-        return dist
+        # segment i joins points i and i+1 (the segments between ztraces are skipped)
+        seg_lengths = np.sqrt(np.sum(np.diff(real_pts, axis=0) ** 2, axis=1))
+        ends = np.cumsum(lengths)
+        starts = ends - lengths
+        dists = []
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            dists.append(float(seg_lengths[start:end-1].sum()) if end - start > 1 else 0)
+        
+        return dists
 
     def getStart(self):
         """Get the first section of the ztrace."""
@@ -204,34 +236,42 @@ class Ztrace():
                 series (Series): the series object (contains transform data)
                 smooth (int): the smoothing factor
         """
-        ## Transform points
-        points = []
-
-        z_align = series.getAttr(self.name, "alignment", ztrace=True)
-        snums = []
-
-        for pt in self.points:
-            
-            x, y, snum = pt
+        Ztrace.smoothZtraces(series, [self], smooth)
+    
+    # STATIC METHOD
+    def smoothZtraces(series, ztraces : list, smooth=10):
+        """Smooth many z-traces at once via padded moving average.
 
-            tform = series.data["sections"][snum]["tforms"][z_align]
-            x, y = tform.map(x, y)
+        The points are averaged in field coordinates (in the alignment of
+        each ztrace) and mapped back to base image coordinates.
+        
+            Params:
+                series (Series): the series object (contains transform data)
+                ztraces (list): the ztraces to smooth
+                smooth (int): the smoothing factor
+        """
+        if not ztraces:
+            return
+        
+        ## Transform points
+        pts, snums, tforms, lengths = getFieldPoints(series, ztraces)
+        field_pts = mapPoints(pts, tforms)
 
-            snums.append(snum)
-            points.append((x, y))
+        ## Calculate rolling average for each ztrace
+        ends = np.cumsum(lengths)
+        starts = ends - lengths
+        smoothed = np.zeros(field_pts.shape)
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            smoothed[start:end] = moving_average(field_pts[start:end], smooth, "padded")
+        smoothed = np.round(smoothed, 4)
 
-        ## Calculate rolling average
-        points = rolling_average(points, smooth, edge_mode="padded")
-        
         ## De-transform points to base image coordinates
-        self.points = []
-        points = [p + (s,) for p, s in zip(points, snums)]  # re-combine snums with points
-
-        for pt in points:
-            x, y, snum = pt
-            tform = series.data["sections"][snum]["tforms"][z_align]
-            x, y = tform.map(x, y, inverted=True)
-            self.points.append((x, y, snum))
+        base_pts = mapPoints(smoothed, tforms, inverted=True).tolist()
+        snums = snums.tolist()
+        for ztrace, start, end in zip(ztraces, starts.tolist(), ends.tolist()):
+            ztrace.points = [
+                (x, y, snum) for (x, y), snum in zip(base_pts[start:end], snums[start:end])
+            ]
     
     def magScale(self, section_num : int, prev_mag : float, new_mag : float):
         """Adjust the ztrace points to a new magnification.
@@ -245,4 +285,205 @@ class Ztrace():
             if snum == section_num:
                 x *= new_mag / prev_mag
                 y *= new_mag / prev_mag
-                self.points[i] = (x, y, snum)
+                self.setPoint(i, (x, y, snum))
+
+
+def getFieldPoints(series, ztraces : list) -> tuple:
+    """Get the points of many ztraces with the transforms to field coordinates.
+    
+        Params:
+            series (Series): the series containing the ztraces
+            ztraces (list): the ztraces
+        Returns:
+            (np.ndarray): the (n, 2) base image points of all the ztraces
+            (np.ndarray): the section number of each point
+            (np.ndarray): the (n, 6) transform of each point (in the ztrace alignment)
+            (np.ndarray): the number of points on each ztrace
+    """
+    lengths = np.array([len(ztrace.points) for ztrace in ztraces], dtype=int)
+    n = int(lengths.sum())
+    if n == 0:
+        return np.zeros((0, 2)), np.zeros(0, dtype=int), np.zeros((0, 6)), lengths
+
+    points = np.array(
+        [pt for ztrace in ztraces for pt in ztrace.points], dtype=float
+    )
+    snums = points[:, 2].astype(int)
+
+    ## Look up the transforms in the section tables of each alignment
+    alignments = []
+    for ztrace in ztraces:
+        alignment = series.getAttr(ztrace.name, "alignment", ztrace=True)
+        if not alignment: alignment = series.alignment
+        alignments.append(alignment)
+    point_alignments = np.repeat(np.array(alignments, dtype=object), lengths)
+
+    tforms = np.empty((n, 6))
+    for alignment in set(alignments):
+        is_aligned = point_alignments == alignment
+        tforms[is_aligned] = series.getTformArray(alignment)[snums[is_aligned]]
+    if np.isnan(tforms).any():
+        raise KeyError("Missing section transforms for ztrace points.")
+
+    return points[:, :2], snums, tforms, lengths
+
+
+def mapPoints(points : np.ndarray, tforms : np.ndarray, inverted=False) -> np.ndarray:
+    """Apply a transform to each point.
+    
+        Params:
+            points (np.ndarray): the (n, 2) points
+            tforms (np.ndarray): the (n, 6) transform for each point
+            inverted (bool): True if the inverse transforms should be applied
+        Returns:
+            (np.ndarray): the (n, 2) transformed points
+    """
+    a, b, c, d, e, f = tforms.T
+    x, y = points[:, 0], points[:, 1]
+    if inverted:
+        det = a * e - b * d
+        if np.any(det == 0):
+            raise Exception("Matrix is not invertible.")
+        x, y = x - c, y - f
+        return np.column_stack([(e * x - b * y) / det, (a * y - d * x) / det])
+    
+    return np.column_stack([a * x + b * y + c, d * x + e * y + f])
+
+
+class ZtraceIndex():
+
+    def __init__(self, series):
+        """Create the index of ztrace points and segments by section.
+
+        The field coordinates of each ztrace and the points and segments on
+        each section are kept until the ztrace points are edited (see
+        Ztrace.version), or the series alignment or section transforms change.
+        
+            Params:
+                series (Series): the series containing the ztraces
+        """
+        self.series = series
+        self.entries = {}
+    
+    def clear(self):
+        """Clear the index."""
+        self.entries = {}
+    
+    def getEntry(self, ztrace : Ztrace) -> dict:
+        """Get the index entry for a ztrace (rebuilt if out of date).
+        
+            Params:
+                ztrace (Ztrace): the ztrace
+            Returns:
+                (dict): the field points and the point/segment indices by section
+        """
+        data = self.series.data
+        key = (data, data.tforms_version, self.series.alignment)
+
+        entry = self.entries.get(ztrace.name)
+        if (
+            entry is not None and
+            entry["key"] == key and
+            entry["ztrace"] is ztrace and
+            entry["version"] == ztrace.version
+        ):
+            return entry
+        
+        if ztrace.points:
+            points = np.array(ztrace.points, dtype=float)
+            tforms = self.series.getTformArray()[points[:, 2].astype(int)]
+            tformed_pts = mapPoints(points[:, :2], tforms).tolist()
+        else:
+            tformed_pts = []
+
+        by_section = {}
+        for i, (x, y, snum) in enumerate(ztrace.points):
+            by_section.setdefault(snum, ([], []))[0].append(i)
+            
+            # the segment to the previous point crosses every section in between
+            if i > 0:
+                prev_snum = ztrace.points[i-1][2]
+                for n in range(min(prev_snum, snum), max(prev_snum, snum) + 1):
+                    by_section.setdefault(n, ([], []))[1].append(i)
+        
+        entry = {
+            "key": key,
+            "ztrace": ztrace,
+            "version": ztrace.version,
+            "tformed_pts": tformed_pts,
+            "sections": by_section,
+        }
+        self.entries[ztrace.name] = entry
+
+        return entry
+    
+    def getSectionData(self, ztrace : Ztrace, section):
+        """Get all the ztrace points on a section (see Ztrace.getSectionData).
+        
+            Params:
+                ztrace (Ztrace): the ztrace
+                section (Section): the main section object
+            Returns:
+                (list): list of points
+                (list): list of lines between points
+        """
+        entry = self.getEntry(ztrace)
+        if section.n not in entry["sections"]:
+            return [], []
+        pt_indices, seg_indices = entry["sections"][section.n]
+
+        # points on the section use its current (possibly unsaved) transform
+        tform = section.tform
+        points = ztrace.points
+        def getPoint(i):
+            x, y, snum = points[i]
+            if snum == section.n:
+                x, y = tform.map(x, y)
+            else:
+                x, y = entry["tformed_pts"][i]
+            return x, y, snum
+
+        pts = [getPoint(i)[:2] for i in pt_indices]
+
+        lines = []
+        for i in seg_indices:
+            prev_pt, pt = getPoint(i-1), getPoint(i)
+            if prev_pt[2] <= pt[2]:
+                p1, p2 = prev_pt, pt
+                reversed = False
+            else:
+                p2, p1 = prev_pt, pt
+                reversed = True
+            segments = p2[2] - p1[2] + 1
+            x_inc = (p2[0] - p1[0]) / segments
+            y_inc = (p2[1] - p1[1]) / segments
+            segment_i = section.n - p1[2]
+            l = (
+                (
+                    p1[0] + segment_i*x_inc,
+                    p1[1] + segment_i*y_inc
+                ),
+                (
+                    p1[0] + (segment_i+1)*x_inc,
+                    p1[1] + (segment_i+1)*y_inc
+                )
+            )
+            if reversed:
+                l = l[::-1]
+            lines.append(l)
+        
+        return pts, lines
+    
+    def getSectionPoints(self, ztrace : Ztrace, snum : int) -> list:
+        """Get the indices of the ztrace points on a section.
+        
+            Params:
+                ztrace (Ztrace): the ztrace
+                snum (int): the section number
+            Returns:
+                (list): the indices of the points
+        """
+        entry = self.getEntry(ztrace)
+        if snum not in entry["sections"]:
+            return []
+        return entry["sections"][snum][0]
@@ -100,7 +100,8 @@ class AllOptionsDialog(QDialog):
                 ["3D_step"],
                 ["left_handed"],
                 ["time"],
-                ["computation"]
+                ["computation"],
+                ["object_attributes"]
                 
             ],
             "Backup": [
@@ -156,7 +157,8 @@ class AllOptionsDialog(QDialog):
                 ("Poly", trace_mode == "poly"),
                 ("Combo", trace_mode == "combo")
             )],
-            [("check", ("Automatically merge selected traces", self.series.getOption("auto_merge", use_defaults)))]
+            [("check", ("Automatically merge selected traces", self.series.getOption("auto_merge", use_defaults)))],
+            [("check", ("Merge traces as exact polygons (uncheck to merge on the screen pixels)", self.series.getOption("vector_merge", use_defaults)))]
         ]
         def setOption(response):
             if response[0][0][1]:
@@ -167,6 +169,7 @@ class AllOptionsDialog(QDialog):
                 new_mode = "combo"
             self.series.setOption("trace_mode", new_mode)
             self.series.setOption("auto_merge", response[1][0][1])
+            self.series.setOption("vector_merge", response[2][0][1])
         self.addOptionWidget("trace", structure, setOption)
 
         # grid
@@ -405,6 +408,14 @@ class AllOptionsDialog(QDialog):
             
         self.addOptionWidget("computation", structure, setOption)
 
+        # object attribute store
+        structure = [
+            [("check", ("store object attributes in a database (for series with many objects)", self.series.getOption("attr_store", use_defaults)))]
+        ]
+        def setOption(response):
+            self.series.setOption("attr_store", response[0][0][1])
+        self.addOptionWidget("object_attributes", structure, setOption)
+
         # columns
         structure = [
             [("check", *tuple(self.series.getOption("object_columns", use_defaults)))]
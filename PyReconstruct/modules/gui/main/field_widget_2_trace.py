@@ -1048,7 +1048,6 @@ class FieldWidgetTrace(FieldWidgetBase):
 
         # merge traces
         else:
-            pix_traces = []
             name = first_trace.name
             for trace in to_merge:
                 if trace.name != name:
@@ -1057,11 +1056,20 @@ class FieldWidgetTrace(FieldWidgetBase):
                 if trace.closed == False:
                     notify("Please merge only closed traces.")
                     return False
-                # collect pixel values for trace points
-                pix_points = self.section_layer.traceToPix(trace)
-                pix_traces.append(pix_points)
             
-            merged_traces = mergeTraces(pix_traces)  # merge the pixel traces
+            # merge the polygons in field coordinates (independent of zoom)
+            vector = self.series.getOption("vector_merge")
+            if vector:
+                tform = self.section.tform
+                merged_traces = mergeTraces(
+                    [tform.map(trace.points) for trace in to_merge],
+                    vector=True
+                )
+            # merge the pixel traces
+            else:
+                merged_traces = mergeTraces(
+                    [self.section_layer.traceToPix(trace) for trace in to_merge]
+                )
             
             # delete the old traces
             self.section.deleteTraces(to_merge, log_event=False)
@@ -1071,6 +1079,8 @@ class FieldWidgetTrace(FieldWidgetBase):
                 self.newTrace(
                     trace,
                     first_trace,
+                    points_as_pix=not vector,
+                    reduce_points=not vector,
                     log_event=False
                 )
             
@@ -1,4 +1,5 @@
-from .copy_table_widget import CopyTableWidget, getCopyTableWidget
+from .copy_table_widget import CopyTableWidget, CopyTableView, getCopyTableWidget
+from .table_model import DataTableModel, Cell
 from .object import ObjectTableWidget
 from .section import SectionTableWidget
 from .trace import TraceTableWidget
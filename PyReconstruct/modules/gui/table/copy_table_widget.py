@@ -1,19 +1,14 @@
 from typing import Union
 
-from PySide6.QtWidgets import QTableWidget, QApplication, QMainWindow
+from PySide6.QtWidgets import QTableWidget, QTableView, QApplication, QMainWindow
 from PySide6.QtCore import Qt
 
 from PyReconstruct.modules.gui.utils import lessThan
 from PyReconstruct.modules.backend.func import make_unique_id
     
 
-class CopyTableWidget(QTableWidget):
-
-    def __init__(self, container, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-
-        self.container = container
-        self.id = make_unique_id()
+class CopyTableMixin():
+    """Copy, backspace and column resizing shared by the list tables."""
 
     def keyPressEvent(self, event):
         ret = super().keyPressEvent(event)
@@ -34,26 +29,10 @@ class CopyTableWidget(QTableWidget):
                     clipboard_str += "\t".join(row_list) + "\n"
                     row_list = []
                     row = index.row()
-                row_list.append(self.itemFromIndex(index).text())
+                text = index.data()
+                row_list.append("" if text is None else str(text))
             clipboard_str += "\t".join(row_list) + "\n"
             QApplication.clipboard().setText(clipboard_str)
-    
-    def getRowIndex(self, name : str):
-        """Get the row index of an item in the table (or where it SHOULD be on the table).
-        
-            Parmas:
-                name (str): the name of the item
-            Returns:
-                (int): the row index for that object in the table
-                (bool): whether or not the object actually exists in the table
-        """
-        for row_index in range(self.rowCount()):
-            row_name = self.item(row_index, 0).text()
-            if lessThan(name, row_name):
-                return row_index, False
-            elif name == row_name:
-                return row_index, True
-        return self.rowCount(), False
 
     def backspace(self):
         """Called when backspace is pressed.
@@ -83,9 +62,49 @@ class CopyTableWidget(QTableWidget):
             return
         
         if series.getOption("theme") == "qdark":
-            for c in range(self.columnCount()):
+            for c in range(self.model().columnCount()):
                 w = self.columnWidth(c)
                 self.setColumnWidth(c, w + 8)
+
+
+class CopyTableWidget(CopyTableMixin, QTableWidget):
+
+    def __init__(self, container, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.container = container
+        self.id = make_unique_id()
+    
+    def getRowIndex(self, name : str):
+        """Get the row index of an item in the table (or where it SHOULD be on the table).
+        
+            Parmas:
+                name (str): the name of the item
+            Returns:
+                (int): the row index for that object in the table
+                (bool): whether or not the object actually exists in the table
+        """
+        for row_index in range(self.rowCount()):
+            row_name = self.item(row_index, 0).text()
+            if lessThan(name, row_name):
+                return row_index, False
+            elif name == row_name:
+                return row_index, True
+        return self.rowCount(), False
+
+
+class CopyTableView(CopyTableMixin, QTableView):
+
+    def __init__(self, container, model, *args, **kwargs):
+        """Create a table view on a model (the rows are only drawn when visible)."""
+        super().__init__(*args, **kwargs)
+        self.setModel(model)
+
+        self.container = container
+        self.id = make_unique_id()
+
+    def selectedIndexes(self):
+        return self.selectionModel().selectedIndexes()
     
 
 def getCopyTableWidget(mainwindow: QMainWindow,  id: Union[None, int]=None) -> CopyTableWidget:
@@ -94,10 +113,10 @@ def getCopyTableWidget(mainwindow: QMainWindow,  id: Union[None, int]=None) -> C
     Useful if focusWidget() fails to return CopyTableWidget.
     """
 
-    docked_tables = mainwindow.findChildren(QTableWidget)
+    docked_tables = mainwindow.findChildren(QTableView)
 
     docked = [
-        d for d in docked_tables if isinstance(d, CopyTableWidget)
+        d for d in docked_tables if isinstance(d, (CopyTableWidget, CopyTableView))
     ]
 
     if not id:
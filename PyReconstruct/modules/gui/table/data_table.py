@@ -311,14 +311,15 @@ class DataTable(QDockWidget):
         
         csv_file = open(file_path, "w")
         
+        model = self.table.model()
+
         ## Headers first
         items = []
         checkable = []
         
-        for c in range(self.table.columnCount()):
+        for c in range(model.columnCount()):
             
-            header_item = self.table.horizontalHeaderItem(c)
-            header_title = header_item.text()
+            header_title = model.headerData(c, Qt.Horizontal)
 
             ## Track checkable item cols
             if header_title in ("Hidden", "Closed"):
@@ -329,17 +330,19 @@ class DataTable(QDockWidget):
         csv_file.write(",".join(items) + "\n")
         
         ## Then data
-        for r in range(self.table.rowCount()):
+        for r in range(model.rowCount()):
             
             items = []
             
-            for c in range(self.table.columnCount()):
+            for c in range(model.columnCount()):
 
-                cell = self.table.item(r, c)
+                index = model.index(r, c)
                 
                 if c in checkable:  # hidden and closed cols
 
-                    if cell.checkState() == Qt.Checked:
+                    check_state = index.data(Qt.CheckStateRole)
+
+                    if check_state is not None and Qt.CheckState(check_state) == Qt.Checked:
 
                         cell_text = "yes"
 
@@ -349,7 +352,8 @@ class DataTable(QDockWidget):
 
                 else:
 
-                    cell_text = cell.text()
+                    cell_text = index.data()
+                    cell_text = "" if cell_text is None else str(cell_text)
 
                     if "," in cell_text:  # e.g., multiple tags
                         
@@ -31,13 +31,11 @@ class HistoryTableWidget(QDockWidget):
         if not obj_names:
             return
         
-        i = 0
-        while i < len(log_set.all_logs):
-            log = log_set.all_logs[i]
-            if log.obj_name not in obj_names:
-                log_set.all_logs.pop(i)
-            else:
-                i += 1
+        obj_names = set(obj_names)
+        log_set.removeLogs([
+            i for i, log in enumerate(log_set.all_logs)
+            if log.obj_name not in obj_names
+        ])
 
     def setRow(self, r : int, log : Log):
         """Set the data for a row.
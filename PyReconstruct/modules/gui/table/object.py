@@ -1,8 +1,8 @@
 import re
 
 from PySide6.QtWidgets import (
-    QTableWidgetItem,  
     QWidget, 
+    QAbstractItemView,
     QInputDialog, 
     QMenu, 
     QApplication,
@@ -15,6 +15,8 @@ from PySide6.QtGui import (
 from PySide6.QtCore import Qt, QItemSelection, QItemSelectionModel
 
 from .data_table import DataTable
+from .copy_table_widget import CopyTableView
+from .table_model import DataTableModel, Cell
 from .history import HistoryTableWidget
 from PyReconstruct.modules.gui.utils import sortList
 
@@ -82,6 +84,11 @@ class ObjectTableWidget(DataTable):
         self.host_filters = set()
         self.direct_hosts_only = False
 
+        # the column the list is sorted by
+        self.sort_column = 0
+        self.sort_order = Qt.AscendingOrder
+        self.model = None
+
         super().__init__("object", series, mainwindow, manager)
         self.static_columns = ["Name"]
         self.createTable()
@@ -273,7 +280,7 @@ class ObjectTableWidget(DataTable):
         return h
     
     def getItems(self, name : str, item_type : str):
-        """Get the QTableWidgetItem(s) for an attribute of an object.
+        """Get the cell(s) for an attribute of an object.
         
             Params:
                 name (str): the name of the object to retrieve the data for
@@ -282,77 +289,67 @@ class ObjectTableWidget(DataTable):
         items = []
         if item_type == "Name":
             
-            items.append(QTableWidgetItem(name))
+            items.append(Cell(name))
             
         elif item_type == "Range":
             
-            items.append(QTableWidgetItem(str(self.series.data.getStart(name))))
-            items.append(QTableWidgetItem(str(self.series.data.getEnd(name))))
+            items.append(Cell(str(self.series.data.getStart(name))))
+            items.append(Cell(str(self.series.data.getEnd(name))))
             
         elif item_type == "Count":
             
-            items.append(QTableWidgetItem(str(self.series.data.getCount(name))))
+            items.append(Cell(str(self.series.data.getCount(name))))
             
         elif item_type == "Flat area":
             
-            items.append(QTableWidgetItem(str(round(self.series.data.getFlatArea(name), 5))))
+            items.append(Cell(str(round(self.series.data.getFlatArea(name), 5))))
             
         elif item_type == "Volume":
             
-            items.append(QTableWidgetItem(str(round(self.series.data.getVolume(name), 5))))
+            items.append(Cell(str(round(self.series.data.getVolume(name), 5))))
             
         elif item_type == "Radius":
             
-            items.append(QTableWidgetItem(str(round(self.series.data.getAvgRadius(name), 5))))
+            items.append(Cell(str(round(self.series.data.getAvgRadius(name), 5))))
             
         elif item_type == "Host":
             
-            items.append(QTableWidgetItem(", ".join(self.series.getObjHosts(name))))
+            items.append(Cell(", ".join(self.series.getObjHosts(name))))
             
         elif item_type == "Superhosts":
             
             hosts = self.series.getObjHosts(name, True, True)
-            items.append(QTableWidgetItem(", ".join(hosts)))
+            items.append(Cell(", ".join(hosts)))
             
         elif item_type == "Groups":
             
             groups = self.series.object_groups.getObjectGroups(name)
             groups_str = ", ".join(groups)
-            items.append(QTableWidgetItem(groups_str))
+            items.append(Cell(groups_str))
             
         elif item_type == "Trace tags":
             
             tags = self.series.data.getTags(name)
             tags_str = ", ".join(tags)
-            items.append(QTableWidgetItem(tags_str))
+            items.append(Cell(tags_str))
             
         elif item_type == "Locked":
             
-            item = QTableWidgetItem("")
-            item.setFlags(Qt.ItemFlag.ItemIsUserCheckable | Qt.ItemFlag.ItemIsEnabled)
-            item.setCheckState(Qt.CheckState.Checked if self.series.getAttr(name, "locked") else Qt.CheckState.Unchecked)
-            items.append(item)
+            locked = self.series.getAttr(name, "locked")
+            items.append(Cell("", Qt.CheckState.Checked if locked else Qt.CheckState.Unchecked))
             
         elif item_type == "Last user":
             
             last_user = self.series.getAttr(name, "last_user")
-            items.append(QTableWidgetItem(last_user))
+            items.append(Cell(last_user))
             
         elif item_type == "Curate":
             
-            check_item = QTableWidgetItem("")
-            status_item = QTableWidgetItem("")
-            user_item = QTableWidgetItem("")
-            date_item = QTableWidgetItem("")
-            cr_items = [check_item, status_item, user_item, date_item]
-            check_item.setFlags(Qt.ItemFlag.ItemIsUserTristate | Qt.ItemFlag.ItemIsUserCheckable | Qt.ItemFlag.ItemIsEnabled)
-
             obj_curation = self.series.getAttr(name, "curation")
             
             if not obj_curation:
                 
-                check_item.setCheckState(Qt.CheckState.Unchecked)
-                cr_color = None
+                items += [Cell("", Qt.CheckState.Unchecked)] + [Cell("")] * 3
                 
             else:
                 
@@ -361,43 +358,38 @@ class ObjectTableWidget(DataTable):
 
                 if curated:
                     
-                    check_item.setCheckState(Qt.CheckState.Checked)
-                    status_item.setText("Curated")
+                    check_state = Qt.CheckState.Checked
+                    status = "Curated"
                     cr_color = Qt.blue if text_lightness > 128 else Qt.cyan
 
                 else:
                     
-                    check_item.setCheckState(Qt.CheckState.PartiallyChecked)
-                    status_item.setText(f"Needs curation")
+                    check_state = Qt.CheckState.PartiallyChecked
+                    status = "Needs curation"
                     cr_color = QColor(100, 100, 0) if text_lightness > 128 else Qt.yellow
                     
-                user_item.setText(user)
-                date_item.setText(date)
-                
-            for item in cr_items:
-                
-                if cr_color:
-                    
-                    item.setData(Qt.BackgroundRole, cr_color)
-                    item.setBackground(cr_color)
-                    
-                items.append(item)
+                items += [
+                    Cell("", check_state, cr_color),
+                    Cell(status, None, cr_color),
+                    Cell(user, None, cr_color),
+                    Cell(date, None, cr_color)
+                ]
                 
         elif item_type == "Alignment":
             
             alignment = self.series.getAttr(name, "alignment")
             if alignment is None: alignment = ""
-            items.append(QTableWidgetItem(alignment))
+            items.append(Cell(alignment))
             
         elif item_type == "Comment":
             
             comment = self.series.getAttr(name, "comment")
-            items.append(QTableWidgetItem(comment))
+            items.append(Cell(comment))
 
         elif item_type == "Configuration":
 
             items.append(
-                QTableWidgetItem(
+                Cell(
                     self.series.data.getConfiguration(name)
                 )
             )
@@ -406,153 +398,199 @@ class ObjectTableWidget(DataTable):
             
             value = self.series.getUserColAttr(name, item_type)
             if value is None: value = ""
-            items.append(QTableWidgetItem(value))
+            items.append(Cell(value))
         
         return items
     
+    def getCells(self, name : str):
+        """Get the cells for the row of an object (called by the model for visible rows).
+        
+            Params:
+                name (str): the name of the object
+        """
+        cells = []
+        for key in self.static_columns:
+            cells += self.getItems(name, key)
+        for key, b in self.columns:
+            if b:
+                cells += self.getItems(name, key)
+        return cells
+    
     def passesFilters(self, name : str):
         """Check if an object passes the filters.
         
             Params:
                 name (str): the name of the object
         """
+        return bool(self.filterNames([name]))
+    
+    def filterNames(self, names) -> list:
+        """Get the objects that pass the filters.
 
-        ## Return False if obj does not exists
-        if name not in self.series.data["objects"]:
-            return False
+        Each filter is applied to the whole list at once: the objects in the
+        filtered groups and under the filtered hosts are gathered once per
+        filter, and the other filters read the object data column by column.
         
-        ## Check user columns
-        if self.user_col_filters:
-            passes_filters = False
-            for n, value in self.series.getAttr(name, "user_columns").items():
-                if n in self.user_col_filters and value in self.user_col_filters[n]:
-                    passes_filters = True
-                    break
-            if not passes_filters:
-                return False
+            Params:
+                names (iterable): the names of the objects to filter
+            Returns:
+                (list): the names that pass the filters (in the given order)
+        """
+        objects = self.series.data["objects"]
+        columns = dict(self.columns)
+
+        ## Only existing objects
+        names = [n for n in names if n in objects]
 
         ## Check groups
-        filters_len = len(self.group_filters)
-        if filters_len != 0:  # if group filter requested
-            object_groups = self.series.object_groups.getObjectGroups(name)
-            groups_len = len(object_groups)
-            union_len = len(object_groups.union(self.group_filters))
-            if union_len == groups_len + filters_len:  # intersection does not exist
-                return False
+        if self.group_filters:
+            in_groups = set()
+            for group in self.group_filters:
+                in_groups |= self.series.object_groups.getGroupObjects(group)
+            names = [n for n in names if n in in_groups]
+
+        ## Check hosts (the hosts themselves and the objects they host)
+        if self.host_filters:
+            hosted = set(self.host_filters)
+            for host in self.host_filters:
+                hosted.update(self.series.host_tree.getTravelers(host, not self.direct_hosts_only))
+            names = [n for n in names if n in hosted]
+
+        ## Check regex
+        if self.re_filters:
+            patterns = [re.compile(re_filter) for re_filter in self.re_filters]
+            names = [n for n in names if any(p.fullmatch(n) for p in patterns)]
         
+        ## Check user columns
+        if self.user_col_filters:
+            names = [
+                n for n in names
+                if any(
+                    value in self.user_col_filters.get(col, ())
+                    for col, value in self.series.getAttr(n, "user_columns").items()
+                )
+            ]
+
         ## Check tags
-        filters_len = len(self.tag_filters)
-        if filters_len != 0:
-            object_tags = self.series.data.getTags(name)
-            object_len = len(object_tags)
-            union_len = len(object_tags.union(self.tag_filters))
-            if union_len == object_len + filters_len:  # intersection does not exist
-                return False
+        if self.tag_filters:
+            names = [n for n in names if not self.tag_filters.isdisjoint(objects[n].tags)]
         
         ## Check curation status and user
-        if dict(self.columns)["Curate"]:
-            
-            obj_curation = self.series.getAttr(name, "curation")
-            
-            if obj_curation:
-                
-                cr_status, user, date = tuple(obj_curation)
-                cr_status = "Curated" if cr_status else "Needs curation"
-
-                if not self.cr_status_filter[cr_status]:
-                    return False
-
-                if self.cr_user_filters and user not in self.cr_user_filters:
-                    return False
-                
-            else:
-                
-                if not self.cr_status_filter["Blank"]:
-                    return False
-                
-                if self.cr_user_filters:
-                    return False
+        if columns["Curate"]:
+            passing = []
+            for n in names:
+                obj_curation = self.series.getAttr(n, "curation")
+                if obj_curation:
+                    cr_status, user, date = tuple(obj_curation)
+                    cr_status = "Curated" if cr_status else "Needs curation"
+                    if not self.cr_status_filter[cr_status]:
+                        continue
+                    if self.cr_user_filters and user not in self.cr_user_filters:
+                        continue
+                elif not self.cr_status_filter["Blank"] or self.cr_user_filters:
+                    continue
+                passing.append(n)
+            names = passing
 
         ## Check config
-        if dict(self.columns)["Configuration"]:
-            
-            req_configs = [
-                ori for ori, req
-                in self.config_filters.items()
-                if req == True
+        if columns["Configuration"] and not all(self.config_filters.values()):
+            names = [
+                n for n in names
+                if self.config_filters.get(self.series.data.getConfiguration(n), True)
             ]
-
-            obj_config = self.series.data.getConfiguration(name)
-
-            if obj_config not in req_configs and obj_config is not None:
-                return False
-            
-        ## Check regex
-        passes_filters = False if self.re_filters else True
-        for re_filter in self.re_filters:
-            if bool(re.fullmatch(re_filter, name)):
-                passes_filters = True
-        if not passes_filters:
-            return False
-
-        # check hosts
-        found_host = False if bool(self.host_filters) else True
-        if name in self.host_filters:
-            found_host = True
-        else:
-            for host in self.host_filters:
-                if host in self.series.getObjHosts(name, not self.direct_hosts_only):
-                    found_host = True
-        if not found_host:
-            return False
         
-        return True
+        return names
 
     def getFiltered(self):
-        """Get the names of the objects that pass the filter.
-        
-            Params:
-                obj_name_list (list): the list of object names
-        """
-        filtered_list = super().getFiltered(
-            list(self.series.data["objects"].keys())
-        )
-        return sortList(filtered_list)
+        """Get the names of the objects that pass the filter."""
+        return sortList(self.filterNames(self.series.data["objects"].keys()))
 
     def createTable(self):
-        """Create the table widget."""
+        """Create the table view.
+
+        The rows are backed by a model that only computes the cells of the
+        rows being displayed.
+        """
         self.updateObjCols(recreate=False)
-        super().createTable()
+
+        # close an existing table and save scroll position
+        if self.table is not None:
+            scroll_pos = self.table.verticalScrollBar().value()
+            self.table.close()
+        else:
+            scroll_pos = 0
+
+        # update the columns
+        self.columns = self.series.getOption(f"{self.name}_columns")
+
+        # establish table headers
+        self.horizontal_headers = self.getHeaders()
+        if self.sort_column >= len(self.horizontal_headers):
+            self.sort_column, self.sort_order = 0, Qt.AscendingOrder
+
+        # create the model and the table object
+        check_columns = {}
+        for c, header in enumerate(self.horizontal_headers):
+            if header == "Locked":
+                check_columns[c] = False
+            elif header == "CR":
+                check_columns[c] = True
+        self.model = DataTableModel(
+            self.horizontal_headers,
+            self.getCells,
+            self.getFiltered(),
+            check_columns,
+            self.checkChanged
+        )
+        self.table = CopyTableView(self, self.model, self.main_widget)
+        self.model.setParent(self.table)
+
+        # connect table functions
+        self.table.mouseDoubleClickEvent = self.mouseDoubleClickEvent
+        self.table.backspace = self.backspace
+
+        # format table
+        self.table.setShowGrid(False)  # no grid
+        self.table.setAlternatingRowColors(True)  # alternate row colors
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)  # cannot be edited
+        self.table.verticalHeader().hide()  # no veritcal header
+
+        # sort by clicking on the headers
+        self.table.horizontalHeader().setSortIndicator(self.sort_column, self.sort_order)
+        self.table.setSortingEnabled(True)
+        self.table.horizontalHeader().sortIndicatorChanged.connect(self.sortChanged)
+
+        # format columns (rows keep the default height)
+        self.table.resizeColumnsToContents()
+
+        # set the saved scroll value
+        self.table.verticalScrollBar().setValue(scroll_pos)
+
+        # set table as central widget
+        self.main_widget.setCentralWidget(self.table)
+
+        # set the title
+        self.updateTitle()
+
+        # update the menus
+        self.createMenus()
+    
+    def sortChanged(self, column : int, order):
+        """Keep track of the sort column when the user clicks on a header."""
+        self.sort_column = column
+        self.sort_order = order
     
     def updateData(self, names : list):
         """Update the data for a set of objects.
+
+        Only the rows of the given objects are recomputed.
         
             Params:
                 names (iterable): the names of the objects to update
         """
-        for name in names:
-
-            row, exists_in_table = self.table.getRowIndex(name)
-            exists_in_series = name in self.series.data["objects"]
-            pass_filters = self.passesFilters(name)
-
-            remove = exists_in_table and (not exists_in_series or not pass_filters)
-
-            ## Completely delete object
-            if remove:  
-                
-                self.table.removeRow(row)
-
-            ## Update existing row
-            elif exists_in_table and exists_in_series:
-                
-                self.setRow(name, row)
-
-            ## Add new row
-            elif not exists_in_table and exists_in_series and pass_filters:  
-                
-                self.table.insertRow(row)
-                self.setRow(name, row)
+        names = list(names)
+        passing = set(self.filterNames(names))
+        self.model.updateNames(names, passing.__contains__)
 
         self.mainwindow.checkActions()
     
@@ -592,8 +630,7 @@ class ObjectTableWidget(DataTable):
         """
         obj_names = []
         for r in self.selectedRows():
-            n = self.table.item(r, 0).text()
-            obj_names.append(n)
+            obj_names.append(self.model.rowName(r))
 
         # self.checkLocked(obj_names)
         
@@ -613,16 +650,15 @@ class ObjectTableWidget(DataTable):
         selected, and vice versa. Operates on the rows currently displayed, so
         with no active filter this inverts against every object in the series.
         """
-        row_count = self.table.rowCount()
-        if not row_count:
+        row_names = self.model.names
+        if not row_names:
             return
 
-        row_names = [self.table.item(r, 0).text() for r in range(row_count)]
         selected = set(self.getSelected())
         to_select = invert_object_rows(row_names, selected)
 
         model = self.table.model()
-        last_col = self.table.columnCount() - 1
+        last_col = model.columnCount() - 1
         new_selection = QItemSelection()
         for r in to_select:
             new_selection.select(model.index(r, 0), model.index(r, last_col))
@@ -632,25 +668,19 @@ class ObjectTableWidget(DataTable):
             QItemSelectionModel.ClearAndSelect
         )
 
-    def itemChanged(self, item : QTableWidgetItem):
-        """User checked a checkbox."""
-        # check for curation
-        if not self.process_check_event:
-            return
+    def checkChanged(self, name : str, c : int, state : Qt.CheckState):
+        """User checked a checkbox.
         
-        self.process_check_event = False
-
-        r = item.row()
-        c = item.column()
-        name = self.table.item(r, 0).text()
-        state = item.checkState()
-
+            Params:
+                name (str): the name of the object
+                c (int): the column of the checkbox
+                state (Qt.CheckState): the new check state
+        """
         # if locked box checked
         if self.horizontal_headers[c] == "Locked":
             self.series_states.addState()
             locked = state == Qt.CheckState.Checked
             self.series.setAttr(name, "locked", locked)
-            self.setRow(name, r)
             if locked:
                 self.mainwindow.field.deselectAllTraces()
             self.mainwindow.seriesModified(True)
@@ -659,31 +689,26 @@ class ObjectTableWidget(DataTable):
         elif self.horizontal_headers[c] == "CR":
             if self.series.getAttr(name, "locked"):
                 notify("This object is locked.")
-                self.setRow(name, r)
                 self.manager.updateObjects([name])
             else:
-                self.series_states.addState()
-                if state == Qt.CheckState.Unchecked:
-                    self.series.setCuration([name], "")
-                elif state == Qt.CheckState.PartiallyChecked:
+                if state == Qt.CheckState.PartiallyChecked:
                     assign_to, confirmed = QInputDialog.getText(
                         self,
                         "Assign to",
                         "Assign curation to username:\n(press enter to leave blank)" 
                     )
                     if not confirmed:
-                        item.setCheckState(Qt.CheckState.Unchecked)
-                        self.process_check_event = True
                         return
+                self.series_states.addState()
+                if state == Qt.CheckState.Unchecked:
+                    self.series.setCuration([name], "")
+                elif state == Qt.CheckState.PartiallyChecked:
                     self.series.setCuration([name], "Needs curation", assign_to)
                 elif state == Qt.CheckState.Checked:
                     self.series.setCuration([name], "Curated")
 
-                self.setRow(name, r)
                 self.manager.updateObjects([name])
                 self.mainwindow.seriesModified(True)
-        
-        self.process_check_event = True
     
     def updateObjCols(self, recreate=True):
         """Update the object column options based on the series.user_columns.
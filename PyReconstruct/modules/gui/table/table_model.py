@@ -0,0 +1,193 @@
+from bisect import bisect_left
+from collections import namedtuple
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PySide6.QtGui import QColor
+
+
+## A single table cell: its text, check state (None if not checkable) and background color
+Cell = namedtuple("Cell", ["text", "check", "background"], defaults=[None, None])
+
+
+def nameKey(name : str) -> tuple:
+    """Get the sort key for a name (same order as sortList)."""
+    return (name.lower(), name)
+
+
+def cellKey(cell : Cell) -> tuple:
+    """Get the sort key for a cell (check state, number or text)."""
+    if cell.check is not None:
+        return (0, Qt.CheckState(cell.check).value)
+    try:
+        return (0, float(cell.text))
+    except (TypeError, ValueError):
+        return (1, str(cell.text).lower())
+
+
+class DataTableModel(QAbstractTableModel):
+
+    def __init__(self, headers : list, getCells, names : list, check_columns : dict = {}, setCheck=None, parent=None):
+        """Create a table model with one row per named item.
+
+        The cells of a row are only computed when a view asks for them (i.e.
+        when the row is visible) and are cached until the row is updated.
+
+            Params:
+                headers (list): the column headers
+                getCells (function): returns the list of Cells for a name (one per column)
+                names (list): the names of the items in the table
+                check_columns (dict): column index : True if the checkbox is tristate
+                setCheck (function): called with (name, column, Qt.CheckState) when a box is checked
+                parent (QObject): the parent object
+        """
+        super().__init__(parent)
+        self.headers = headers
+        self.getCells = getCells
+        self.check_columns = check_columns
+        self.setCheck = setCheck
+        self.cache = {}
+
+        # rows are sorted by name by default (bisect on the keys to find a row)
+        self.names = sorted(names, key=nameKey)
+        self.keys = [nameKey(n) for n in self.names]
+        self.sort_column = 0
+        self.sort_order = Qt.AscendingOrder
+        self.row_lookup = None  # name : row when sorted by another column
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.names)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section : int, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return None
+
+    def getRow(self, name : str) -> list:
+        """Get the (cached) cells for a row."""
+        cells = self.cache.get(name)
+        if cells is None:
+            cells = self.getCells(name)
+            self.cache[name] = cells
+        return cells
+
+    def data(self, index : QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        cell = self.getRow(self.names[index.row()])[index.column()]
+        if role == Qt.DisplayRole:
+            return cell.text
+        elif role == Qt.CheckStateRole:
+            return cell.check
+        elif role == Qt.BackgroundRole and cell.background is not None:
+            return QColor(cell.background)
+        return None
+
+    def flags(self, index : QModelIndex):
+        flags = Qt.ItemIsSelectable | Qt.ItemIsEnabled
+        if index.isValid() and index.column() in self.check_columns:
+            flags |= Qt.ItemIsUserCheckable
+            if self.check_columns[index.column()]:
+                flags |= Qt.ItemIsUserTristate
+        return flags
+
+    def setData(self, index : QModelIndex, value, role=Qt.EditRole):
+        if role != Qt.CheckStateRole or index.column() not in self.check_columns:
+            return False
+        name = self.names[index.row()]
+        if self.setCheck:
+            self.setCheck(name, index.column(), Qt.CheckState(value))
+        # refresh the row in case the check was refused
+        self.updateNames([name])
+        return True
+
+    def findRow(self, name : str):
+        """Get the row of an item in the table (None if not in the table)."""
+        if self.row_lookup is not None:
+            return self.row_lookup.get(name)
+        i = bisect_left(self.keys, nameKey(name))
+        if i < len(self.names) and self.names[i] == name:
+            return i
+        return None
+
+    def rowName(self, row : int) -> str:
+        """Get the name of the item in a row."""
+        return self.names[row]
+
+    def updateNames(self, names, include=None):
+        """Update rows of the table, inserting and removing rows as needed.
+
+        Only the given rows are recomputed: the rest of the table is untouched.
+
+            Params:
+                names (iterable): the names of the items to update
+                include (function): returns True if a name belongs in the table (existing rows are kept if None)
+        """
+        removed_rows = []
+        inserted = []
+        changed = []
+        for name in dict.fromkeys(names):
+            self.cache.pop(name, None)
+            row = self.findRow(name)
+            in_table = include(name) if include else row is not None
+            if row is not None and not in_table:
+                removed_rows.append(row)
+            elif row is None and in_table:
+                inserted.append(name)
+            elif row is not None:
+                changed.append(name)
+
+        if not (removed_rows or inserted or changed):
+            return
+
+        for row in sorted(removed_rows, reverse=True):
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self.names[row]
+            del self.keys[row]
+            self.endRemoveRows()
+
+        for name in inserted:
+            key = nameKey(name)
+            row = len(self.names) if self.row_lookup is not None else bisect_left(self.keys, key)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.names.insert(row, name)
+            self.keys.insert(row, key)
+            self.endInsertRows()
+
+        if self.row_lookup is not None:
+            # rows may have moved: sort the table again
+            self.sort(self.sort_column, self.sort_order)
+        else:
+            last_col = len(self.headers) - 1
+            for name in changed:
+                row = self.findRow(name)
+                self.dataChanged.emit(self.index(row, 0), self.index(row, last_col))
+
+    def sort(self, column : int, order=Qt.AscendingOrder):
+        """Sort the table by a column (computes the cells for every row)."""
+        self.sort_column = column
+        self.sort_order = order
+        self.layoutAboutToBeChanged.emit()
+
+        old_indexes = self.persistentIndexList()
+        old_cells = [(self.names[i.row()], i.column()) for i in old_indexes]
+
+        if column == 0 and order == Qt.AscendingOrder:
+            self.names.sort(key=nameKey)
+            self.row_lookup = None
+        else:
+            col_keys = {
+                n : (cellKey(self.getRow(n)[column]), nameKey(n))
+                for n in self.names
+            }
+            self.names.sort(key=col_keys.__getitem__, reverse=(order == Qt.DescendingOrder))
+            self.row_lookup = dict((n, r) for r, n in enumerate(self.names))
+        self.keys = [nameKey(n) for n in self.names]
+
+        self.changePersistentIndexList(
+            old_indexes,
+            [self.index(self.findRow(n), c) for n, c in old_cells]
+        )
+        self.layoutChanged.emit()
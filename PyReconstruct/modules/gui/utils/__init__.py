@@ -7,6 +7,7 @@ from .utils import (
     populateMenu,
     populateMenuBar,
     setMainWindow,
+    setProgressMode,
     notify,
     notifyConfirm,
     getColor,
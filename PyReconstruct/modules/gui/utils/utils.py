@@ -31,6 +31,7 @@ from PyReconstruct.modules.constants import welcome_series_dir
 
 mainwindow = None
 qt_offscreen = os.getenv("QT_QPA_PLATFORM") == "offscreen"
+progress_mode = None  # set by headless (batch) runs: see setProgressMode
 
 
 def get_screen_info(screen: QScreen) -> dict:
@@ -211,10 +212,25 @@ def setMainWindow(mw):
     mainwindow = mw
 
 
+def setProgressMode(mode):
+    """Set how progress and notifications are reported.
+
+        Params:
+            mode (str): None (dialogs when a QApplication exists), "console" (printed) or "quiet" (not reported)
+    """
+    global progress_mode
+    progress_mode = mode
+
+
 def notify(message):
     """Notify the user."""
 
-    if QApplication.instance() and not qt_offscreen:
+    if progress_mode:  # headless: never wait for input
+
+        if progress_mode != "quiet":
+            print(message)
+
+    elif QApplication.instance() and not qt_offscreen:
         
         QMessageBox.information(
             mainwindow,
@@ -371,6 +387,7 @@ class BasicProgbar():
         """
         self.text = text
         self.max = maximum
+        self.percent = "0.0%"
         if self.max == 0:
             print(f"{text} | Loading...", end="\r")
         else:
@@ -384,7 +401,10 @@ class BasicProgbar():
         """
         if self.max == 0:
             return
-        print(f"{self.text} | {n / self.max * 100 :.1f}%", end="\r")
+        percent = f"{n / self.max * 100 :.1f}%"
+        if percent != self.percent:  # only print changes
+            self.percent = percent
+            print(f"{self.text} | {percent}", end="\r")
         if n == self.max:
             self.close()
     
@@ -397,6 +417,19 @@ class BasicProgbar():
         print()
 
 
+class NullProgbar():
+    """A progress indicator that reports nothing."""
+
+    def setValue(self, n):
+        return
+
+    def wasCanceled(self):
+        return False
+
+    def close(self):
+        return
+
+
 def getProgbar(text, cancel=True, maximum=100):
     """Create a progress bar (either for pyqt or in cmd text).
     
@@ -405,10 +438,13 @@ def getProgbar(text, cancel=True, maximum=100):
             cancel (bool): True if progress bar is cancelable
             maximum (int): the max value for the progress bar
     """
+    if progress_mode == "quiet":
+        return NullProgbar()
+    
     use_basic = False
 
      # check if PySide6 has benn initialized
-    if not QApplication.instance():
+    if progress_mode == "console" or not QApplication.instance():
         use_basic = True
     else:
         try:
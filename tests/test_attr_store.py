@@ -0,0 +1,153 @@
+"""Object attributes can be kept in a SQLite store instead of the series JSON.
+
+With the ``attr_store`` series option on, saving the series moves the object
+attributes, object groups, host tree and user columns into a SQLite database
+in the hidden folder (only the objects marked as modified are rewritten),
+leaving a stub in the .ser file. Reloading the series reads them back, and saving the .jser
+exports them into the JSON again.
+"""
+
+import json
+import os
+
+from PyReconstruct.modules.datatypes.attr_store import AttrStore
+from PyReconstruct.modules.datatypes.series import Series
+
+
+def _set_attrs(series):
+    series.setAttr("circle2", "comment", "round")
+    series.object_groups.add("shapes", "circle2")
+    series.object_groups.add("shapes", "square")
+    series.addUserCol("kind", ["a", "b"], log_event=False)
+    series.setUserColAttr("square", "kind", "a")
+    series.setUserColAttr("triangle", "kind", "b")
+    series.setObjHosts(["star"], ["square"])
+
+
+def test_attributes_move_to_store_and_back(real_series, tmp_path):
+    series = real_series
+    _set_attrs(series)
+    expected = {k: json.loads(json.dumps(series.getDict()[k])) for k in AttrStore.keys}
+
+    series.setOption("attr_store", True)
+    series.save()
+
+    with open(series.filepath, "r") as f:
+        ser_data = json.load(f)
+    assert ser_data["attr_store"] == Series.attr_store_fname
+    assert ser_data["obj_attrs"] == {} and ser_data["object_groups"] == {}
+
+    stored = AttrStore(series.attr_store.db_fp).load()
+    assert sorted(stored["object_groups"]["shapes"]) == ["circle2", "square"]
+    assert stored["host_tree"] == {"star": ["square"]}
+    assert stored["obj_attrs"]["triangle"]["user_columns"] == {"kind": "b"}
+
+    # reloading the series reads the attributes from the store
+    reloaded = Series(series.filepath, series.sections, get_series_data=False)
+    assert reloaded.getAttr("circle2", "comment") == "round"
+    assert reloaded.object_groups.getGroupObjects("shapes") == {"circle2", "square"}
+    assert reloaded.getObjHosts("star") == ["square"]
+    assert reloaded.user_columns == series.user_columns
+
+    # the jser holds the full attributes
+    jser_fp = str(tmp_path / "exported.jser")
+    series.saveJser(jser_fp)
+    with open(jser_fp, "r") as f:
+        jser_series = json.load(f)["series"]
+    assert "attr_store" not in jser_series
+    for key in AttrStore.keys:
+        assert {
+            k: sorted(v) if key in ("object_groups", "host_tree") else v
+            for k, v in jser_series[key].items()
+        } == {
+            k: sorted(v) if key in ("object_groups", "host_tree") else v
+            for k, v in expected[key].items()
+        }
+
+
+def test_store_tracks_changes(real_series):
+    series = real_series
+    _set_attrs(series)
+    series.setOption("attr_store", True)
+    series.save()
+
+    series.object_groups.remove("shapes", "square")
+    series.setUserColAttr("square", "kind", "b")
+    series.setAttr("circle2", "comment", None)
+    series.save()
+
+    stored = AttrStore(series.attr_store.db_fp).load()
+    assert stored["object_groups"]["shapes"] == ["circle2"]
+    assert stored["obj_attrs"]["square"]["user_columns"] == {"kind": "b"}
+    assert "comment" not in stored["obj_attrs"].get("circle2", {})
+
+
+def test_get_dict_does_not_write(real_series):
+    series = real_series
+    _set_attrs(series)
+    series.setOption("attr_store", True)
+
+    d = series.getDict()
+    assert "attr_store" not in d
+    assert sorted(d["object_groups"]["shapes"]) == ["circle2", "square"]
+    assert not os.path.exists(os.path.join(series.hidden_dir, Series.attr_store_fname))
+
+    series.save()
+    assert os.path.exists(os.path.join(series.hidden_dir, Series.attr_store_fname))
+
+
+def test_option_in_dialog(real_series):
+    from PySide6.QtWidgets import QCheckBox
+
+    from PyReconstruct.modules.gui.dialog.all_options import AllOptionsDialog
+
+    dialog = AllOptionsDialog(None, real_series)
+    widget = dialog.all_widgets["object_attributes"]
+    checkbox = widget.findChild(QCheckBox)
+    assert not checkbox.isChecked()
+
+    checkbox.setChecked(True)
+    assert widget.accept(close=False)
+    widget.set()
+    assert real_series.getOption("attr_store") is True
+
+
+def test_only_modified_objects_are_written(real_series, monkeypatch):
+    series = real_series
+    _set_attrs(series)
+    series.setOption("attr_store", True)
+    series.save()
+    assert series.modified_obj_attrs == set()
+
+    dumped = []
+    dumps = json.dumps
+    monkeypatch.setattr(
+        "PyReconstruct.modules.datatypes.attr_store.json.dumps",
+        lambda obj, **kwargs: (dumped.append(obj) if kwargs.get("sort_keys") else None) or dumps(obj, **kwargs)
+    )
+    series.setAttr("triangle", "comment", "pointy")
+    series.save()
+    assert dumped == [series.obj_attrs["triangle"]]
+
+    stored = AttrStore(series.attr_store.db_fp).load()
+    assert stored["obj_attrs"]["triangle"] == {"comment": "pointy", "user_columns": {"kind": "b"}}
+    assert stored["obj_attrs"]["circle2"] == {"comment": "round"}
+
+
+def test_undo_marks_restored_objects(real_series):
+    from PyReconstruct.modules.backend.func.state_manager import SeriesState
+
+    series = real_series
+    _set_attrs(series)
+    series.setOption("attr_store", True)
+    series.save()
+
+    state = SeriesState()
+    state.resetSeriesAttributes(series)
+    series.setAttr("circle2", "comment", "changed")
+    series.save()
+
+    state.applySeriesAttributes(series)
+    assert series.modified_obj_attrs == {"circle2"}
+    series.save()
+    assert AttrStore(series.attr_store.db_fp).load()["obj_attrs"]["circle2"] == {"comment": "round"}
@@ -0,0 +1,59 @@
+"""Single-pass label extraction must match the old one-mask-per-id loop.
+
+``importSection`` used to call ``getExteriors(arr == id)`` for every label,
+which is O(labels x pixels). ``getLabelExteriors`` crops each label to its
+bounding box instead; these tests pin it to the full-image result so the
+speedup cannot change which traces an import produces.
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip("zarr")
+
+from PyReconstruct.modules.backend.autoseg.conversions import (
+    getExteriors,
+    getLabelExteriors,
+)
+
+
+def _label_plane():
+    """Touching, nested, border-hugging and split labels in one plane."""
+    arr = np.zeros((48, 64), dtype=np.uint64)
+    arr[0:10, 0:12] = 3            # touches the image corner
+    arr[5:20, 12:30] = 7           # touches label 3
+    arr[25:40, 40:64] = 2**40      # huge id, touches the right edge
+    arr[30:35, 45:50] = 9          # hole inside the huge id
+    arr[42:46, 2:6] = 5            # label 5 split into two pieces
+    arr[42:46, 20:26] = 5
+    return arr
+
+
+def _as_lists(exteriors):
+    return sorted(e.tolist() for e in exteriors)
+
+
+def test_matches_full_image_masks():
+    arr = _label_plane()
+    found = getLabelExteriors(arr)
+
+    expected_ids = [i for i in np.unique(arr) if i != 0]
+    assert [i for i, _ in found] == expected_ids
+
+    for label_id, exteriors in found:
+        assert _as_lists(exteriors) == _as_lists(getExteriors(arr == label_id))
+
+
+def test_restricts_to_requested_ids_in_order():
+    arr = _label_plane()
+    found = getLabelExteriors(arr, ids=[9, 0, 12345, 3])
+
+    assert [i for i, _ in found] == [9, 3]
+
+
+def test_plane_without_background():
+    arr = np.full((8, 8), 4, dtype=np.uint32)
+    arr[2:5, 2:5] = 6
+    found = dict(getLabelExteriors(arr))
+
+    assert set(found) == {4, 6}
+    assert _as_lists(found[6]) == _as_lists(getExteriors(arr == 6))
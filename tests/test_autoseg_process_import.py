@@ -0,0 +1,111 @@
+"""Labels -> contours import through the process pool.
+
+``labelsToObjects`` computes each section's traces in worker processes and
+applies them in the main process. These tests pin that the pooled import adds
+exactly what the serial ``importSection`` does, in section order, and that the
+series is only touched by the main process.
+"""
+import numpy as np
+import pytest
+
+zarr = pytest.importorskip("zarr")
+
+from PyReconstruct.modules.backend.autoseg import conversions
+
+
+SECTIONS = [0, 1, 2, 3, 4]
+LABEL_GROUP = "labels_test"
+
+
+class _SectionStub:
+
+    def __init__(self, snum, log):
+        self.n = snum
+        self.added = []
+        self.log = log
+
+    def addTrace(self, trace, *args, **kwargs):
+        self.added.append(trace)
+
+    def save(self):
+        self.log.append(self.n)
+
+
+class _GroupsStub:
+
+    def __init__(self):
+        self.adds = []
+
+    def add(self, group, name):
+        self.adds.append((group, name))
+
+
+class _SeriesStub:
+
+    def __init__(self):
+        self.saved = []
+        self.sections = {snum: _SectionStub(snum, self.saved) for snum in SECTIONS}
+        self.object_groups = _GroupsStub()
+
+    def getOption(self, name, *args, **kwargs):
+        return {"autoseg_color_palette": [], "autoseg_color_seed": 0}[name]
+
+    def loadSection(self, snum):
+        return self.sections[snum]
+
+
+def _make_zarr(tmp_path):
+    fp = str(tmp_path / "test.zarr")
+    root = zarr.open(fp, mode="w")
+
+    labels = np.zeros((len(SECTIONS), 40, 40), dtype=np.uint64)
+    for z in SECTIONS:
+        labels[z, 2 + z:12 + z, 3:15] = 10 + z
+        labels[z, 20:30, 20 + z:34] = 99
+
+    arr = root.create_dataset(LABEL_GROUP, data=labels)
+    arr.attrs["voxel_size"] = [50, 4, 4]
+    arr.attrs["offset"] = [0, 0, 0]
+
+    raw = root.create_dataset("raw", data=np.zeros(labels.shape, dtype=np.uint8))
+    raw.attrs["voxel_size"] = [50, 4, 4]
+    raw.attrs["offset"] = [0, 0, 0]
+    raw.attrs["window"] = [1.0, 2.0, 0.16, 0.16]
+    raw.attrs["sections"] = SECTIONS
+    raw.attrs["true_mag"] = 0.004
+    raw.attrs["alignment"] = {str(s): [1, 0, 0.1 * s, 0, 1, 0] for s in SECTIONS}
+
+    return fp
+
+
+def _summary(series):
+    return {
+        snum: [(t.name, tuple(t.color), [tuple(p) for p in t.points]) for t in section.added]
+        for snum, section in series.sections.items()
+    }
+
+
+def test_pooled_import_matches_serial_import(tmp_path):
+    fp = _make_zarr(tmp_path)
+
+    serial = _SeriesStub()
+    conversions.setDT()
+    for snum in SECTIONS:
+        conversions.importSection(zarr.open(fp), LABEL_GROUP, snum, serial)
+
+    pooled = _SeriesStub()
+    conversions.labelsToObjects(pooled, fp, LABEL_GROUP, max_processes=2)
+
+    assert _summary(pooled) == _summary(serial)
+    assert pooled.saved == SECTIONS
+    assert {g for g, _ in pooled.object_groups.adds} >= {f"seg_{LABEL_GROUP}"}
+
+
+def test_section_traces_are_plain_data(tmp_path):
+    fp = _make_zarr(tmp_path)
+
+    snum, label_traces = conversions.getSectionTraces(fp, LABEL_GROUP, 2)
+
+    assert snum == 2
+    assert [label_id for label_id, _ in label_traces] == [12, 99]
+    assert all(type(label_id) is int for label_id, _ in label_traces)
@@ -0,0 +1,95 @@
+"""The batch commands process a series without the user interface.
+
+``PyReconstruct <command> <jser>`` opens the series through the Series API,
+reports progress on the console instead of in dialogs, and saves the jser when
+the command modified the series.
+"""
+
+import os
+import json
+import shutil
+
+import pytest
+
+from PyReconstruct import batch
+
+
+@pytest.fixture(autouse=True)
+def console_progress():
+    """The commands switch progress to the console: switch it back."""
+    yield
+
+    from PyReconstruct.modules.gui.utils import setProgressMode
+    setProgressMode(None)
+
+
+@pytest.fixture
+def jser_fp(tmp_path):
+    src = os.path.join(
+        os.path.dirname(__file__), "..", "PyReconstruct", "assets",
+        "checker", "files", "shapes1.jser",
+    )
+    fp = str(tmp_path / "shapes1.jser")
+    shutil.copyfile(src, fp)
+    return fp
+
+
+def _points(fp, name):
+    with open(fp) as f:
+        sections = json.load(f)["sections"]
+    return [
+        [t[0] for t in s["contours"][name]]
+        for s in sections if s and name in s["contours"]
+    ]
+
+
+def test_validate(jser_fp, capsys):
+    assert batch.main(["validate", jser_fp, "-q"]) == 0
+    out = capsys.readouterr().out
+    assert "5 sections" in out and "4 objects" in out
+    # the series is closed again
+    assert not os.path.isdir(os.path.join(os.path.dirname(jser_fp), ".shapes1"))
+
+
+def test_export_csv(jser_fp, tmp_path):
+    out_dir = str(tmp_path / "out")
+    assert batch.main(["export", "csv", jser_fp, "-o", out_dir, "-q"]) == 0
+    assert sorted(os.listdir(out_dir)) == [
+        "shapes1_objects.csv", "shapes1_traces.csv", "shapes1_ztraces.csv"
+    ]
+
+
+def test_smooth_in_worker_processes(jser_fp, tmp_path):
+    out_fp = str(tmp_path / "smoothed.jser")
+    assert batch.main(
+        ["smooth", jser_fp, "--objects", "circle2", "-o", out_fp, "-p", "2", "-q"]
+    ) == 0
+
+    before, after = _points(jser_fp, "circle2"), _points(out_fp, "circle2")
+    assert len(before) == len(after)
+    assert before != after
+    # other objects are untouched
+    assert _points(jser_fp, "square") == _points(out_fp, "square")
+
+    with open(out_fp) as f:
+        assert "Smooth circle2 traces" in json.load(f)["log"]
+
+
+def test_unknown_file(tmp_path, capsys):
+    assert batch.main(["dedupe", str(tmp_path / "missing.jser"), "-q"]) == 1
+    assert "File not found" in capsys.readouterr().out
+
+
+def test_dedupe_uses_processes(jser_fp, tmp_path, monkeypatch):
+    from PyReconstruct.modules.datatypes import Series
+
+    calls = []
+    dedupe = Series.deleteDuplicateTraces
+    def deleteDuplicateTraces(self, *args, **kwargs):
+        calls.append(kwargs.get("max_processes"))
+        return dedupe(self, *args, **kwargs)
+    monkeypatch.setattr(Series, "deleteDuplicateTraces", deleteDuplicateTraces)
+
+    out_fp = str(tmp_path / "deduped.jser")
+    assert batch.main(["dedupe", jser_fp, "-o", out_fp, "-p", "2", "-q"]) == 0
+    assert calls == [2]
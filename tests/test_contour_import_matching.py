@@ -0,0 +1,117 @@
+"""Contour.importTraces matches traces in bulk.
+
+The overlapping pairs of the two trace lists are found at once
+(Trace.getOverlappingPairs: identical points by hashing, the rest from an
+STRtree query) and must be exactly the pairs Trace.overlaps accepts, so the
+import keeps the result of matching the traces one pair at a time.
+"""
+
+import math
+import random
+
+import pytest
+
+from PyReconstruct.modules.datatypes.contour import Contour
+from PyReconstruct.modules.datatypes.trace import Trace
+
+
+def _polygon(rng, cx, cy, r, closed=True, n=10):
+    trace = Trace("a", (0, 0, 0), closed)
+    trace.points = [
+        (cx + r * math.cos(2 * math.pi * k / n), cy + r * math.sin(2 * math.pi * k / n))
+        for k in range(n)
+    ]
+    return trace
+
+
+def _traces(rng, n, pool=None):
+    traces = []
+    for _ in range(n):
+        if pool and rng.random() < 0.6:
+            trace = rng.choice(pool).copy()
+            shift = rng.choice([0, 0, 0.004, 0.02, 0.1, 0.5])
+            trace.points = [(x + shift, y) for x, y in trace.points]
+        else:
+            trace = _polygon(
+                rng, rng.uniform(0, 15), rng.uniform(0, 15), rng.uniform(0.3, 2),
+                closed=rng.random() < 0.85
+            )
+        traces.append(trace)
+    # a degenerate open trace and its shifted copy (bounds do not intersect)
+    line = Trace("a", (0, 0, 0), closed=False)
+    line.points = [(0, 20), (5, 20)]
+    shifted = line.copy()
+    shifted.points = [(0, 20.005), (5, 20.005)]
+    return traces + [line, shifted]
+
+
+def _serialImport(s_traces, o_traces, threshold, keep_above):
+    """The pair-at-a-time matching (the reference behavior)."""
+    traces = []
+    def addDuplicate(st, ot):
+        if keep_above == "self":
+            traces.append(st)
+        elif keep_above == "other":
+            traces.append(ot)
+        else:
+            traces.extend([st, ot])
+
+    i = 0
+    while i < len(o_traces) and i < len(s_traces):
+        if s_traces[i].overlaps(o_traces[i], threshold):
+            addDuplicate(s_traces[i], o_traces[i])
+        else:
+            break
+        i += 1
+
+    rem_s, rem_o = s_traces[i:], o_traces[i:]
+    first_comparison = True
+    for o_trace in rem_o.copy():
+        found_i = None
+        for j, s_trace in enumerate(rem_s):
+            if first_comparison:
+                first_comparison = False
+                continue
+            if s_trace.overlaps(o_trace, threshold=0.95):
+                addDuplicate(s_trace, o_trace)
+                found_i = j
+                break
+        if found_i is not None:
+            rem_s.pop(found_i)
+            rem_o.remove(o_trace)
+    return traces + rem_s + rem_o, rem_s, rem_o
+
+
+@pytest.mark.parametrize("threshold", [0, 0.5, 0.95, 1])
+def test_overlapping_pairs_match_overlaps(threshold):
+    rng = random.Random(7)
+    traces1 = _traces(rng, 40)
+    traces2 = _traces(rng, 40, traces1)
+
+    expected = [
+        (i, j)
+        for i, t1 in enumerate(traces1)
+        for j, t2 in enumerate(traces2)
+        if t1.overlaps(t2, threshold)
+    ]
+    assert Trace.getOverlappingPairs(traces1, traces2, threshold) == expected
+    assert Trace.getOverlappingPairs([], traces2, threshold) == []
+
+
+@pytest.mark.parametrize("keep_above", ["self", "other", ""])
+@pytest.mark.parametrize("seed", range(4))
+def test_import_matches_serial_matching(seed, keep_above):
+    rng = random.Random(seed)
+    s_traces = _traces(rng, 50)
+    o_traces = s_traces[:5] + _traces(rng, 50, s_traces)
+    o_traces = [t.copy() for t in o_traces]
+
+    expected, exp_s, exp_o = _serialImport(s_traces, o_traces, 0.95, keep_above)
+
+    contour = Contour("a", s_traces.copy())
+    rem_s, rem_o = contour.importTraces(Contour("a", o_traces.copy()), 0.95, keep_above)
+
+    ids = lambda traces: [id(t) for t in traces]
+    assert ids(contour.getTraces()) == ids(expected)
+    assert ids(rem_s) == ids(exp_s)
+    assert ids(rem_o) == ids(exp_o)
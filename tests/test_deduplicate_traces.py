@@ -0,0 +1,119 @@
+"""Duplicate traces are found with a bounding-box index.
+
+Contour.findDuplicates only compares traces whose bounds intersect and whose
+areas allow an overlap above the threshold, and must find the same
+(removed, kept) pairs as comparing every trace with every earlier trace.
+Series.deleteDuplicateTraces searches the sections in worker processes.
+"""
+
+import json
+import math
+import os
+import random
+
+from PyReconstruct.modules.datatypes.contour import Contour
+from PyReconstruct.modules.datatypes.trace import Trace
+
+
+def _polygon(cx, cy, r, closed=True, n=12):
+    trace = Trace("a", (0, 0, 0), closed)
+    trace.points = [
+        (cx + r * math.cos(2 * math.pi * k / n), cy + r * math.sin(2 * math.pi * k / n))
+        for k in range(n)
+    ]
+    return trace
+
+
+def _bruteForce(traces, threshold):
+    """The pairs found by checking each trace against all earlier traces."""
+    alive = list(range(len(traces)))
+    pairs = []
+    i = 1
+    while i < len(alive):
+        for j in range(i - 1, -1, -1):
+            if traces[alive[i]].overlaps(traces[alive[j]], threshold):
+                pairs.append((alive[j], alive[i]))
+                alive.pop(j)
+                i -= 1
+                break
+        i += 1
+    return pairs
+
+
+def test_matches_the_pairwise_search():
+    rng = random.Random(4)
+    traces = []
+    for _ in range(80):
+        if traces and rng.random() < 0.35:
+            trace = rng.choice(traces).copy()
+            shift = rng.choice([0, 0.01, 0.05, 0.3])
+            trace.points = [(x + shift, y) for x, y in trace.points]
+        else:
+            trace = _polygon(
+                rng.uniform(0, 20), rng.uniform(0, 20), rng.uniform(0.5, 3),
+                closed=rng.random() < 0.9
+            )
+        traces.append(trace)
+
+    for threshold in (0.8, 0.95):
+        assert Contour("a", traces).findDuplicates(threshold) == _bruteForce(traces, threshold)
+
+
+def test_large_traces_are_compared_with_everything():
+    traces = [_polygon(x, 0, 1) for x in range(10)]
+    traces += [_polygon(0, 0, 100), _polygon(0, 0, 100)]
+    traces.append(_polygon(3, 0, 1))
+    assert Contour("a", traces).findDuplicates(0.95, max_cells=4) == [(10, 11), (3, 12)]
+
+
+def test_delete_duplicate_traces(real_series):
+    series = real_series
+    section = series.loadSection(series.current_section)
+    name = next(iter(section.contours))
+    n = len(section.contours[name])
+
+    original = section.contours[name][0]
+    duplicate = original.copy()
+    duplicate.tags = {"dup_tag"}
+    section.addTrace(duplicate, log_event=False)
+    section.save()
+
+    removed = series.deleteDuplicateTraces(0.95, include_locked=True, max_processes=2)
+    assert removed == {section.n: {name}}
+
+    section = series.loadSection(section.n)
+    assert len(section.contours[name]) == n
+    # the later trace is kept with the tags of both
+    assert "dup_tag" in section.contours[name][-1].tags
+    assert set(original.tags) <= section.contours[name][-1].tags
+
+    assert series.deleteDuplicateTraces(0.95, include_locked=True, max_processes=2) == {}
+
+
+def test_defective_traces_in_the_file(real_series):
+    """Traces the loaded section screens out must not shift the duplicate indices."""
+    series = real_series
+    section = series.loadSection(series.current_section)
+    name = next(iter(section.contours))
+    original = section.contours[name][0]
+    duplicate = original.copy()
+    duplicate.tags = {"dup_tag"}
+    section.addTrace(duplicate, log_event=False)
+    section.save()
+    kept = [trace.points for trace in series.loadSection(section.n).contours[name]][1:]
+
+    fp = os.path.join(series.hidden_dir, series.sections[section.n])
+    with open(fp) as f:
+        data = json.load(f)
+    real = data["contours"][name][0]
+    point = real[:1] + [real[1][:1], real[2][:1]] + real[3:]
+    data["contours"][name].insert(0, point)
+    with open(fp, "w") as f:
+        json.dump(data, f)
+
+    assert series.deleteDuplicateTraces(0.95, include_locked=True, max_processes=2) == {
+        section.n: {name}
+    }
+    traces = series.loadSection(section.n).contours[name]
+    assert [trace.points for trace in traces] == kept
+    assert "dup_tag" in traces[-1].tags
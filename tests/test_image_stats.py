@@ -0,0 +1,154 @@
+"""Image histograms are stored with the images and read once.
+
+ImageStats keeps a 256-bin histogram per image (per zarr scale) in a SQLite
+database in the image directory, so the statistics outlive the series session
+and are measured again only when an image changes.
+"""
+
+import os
+import sqlite3
+
+import cv2
+import numpy as np
+import pytest
+import zarr
+
+from PyReconstruct.modules.calc import toGrayscale8
+from PyReconstruct.modules.datatypes import ImageStats
+from PyReconstruct.modules.datatypes.image_stats import getImageHistogram, getImagePath
+
+
+def _image(seed, shape=(50, 70)):
+    rng = np.random.default_rng(seed)
+    return np.clip(rng.normal(100, 30, shape), 0, 255).astype(np.uint8)
+
+
+def test_stats():
+    image = _image(0)
+    hist = np.bincount(image.ravel(), minlength=256)
+    mean, std = ImageStats.histStats(hist)
+    assert mean == pytest.approx(np.mean(image))
+    assert std == pytest.approx(np.std(image))
+
+    assert ImageStats.histStats(np.zeros(256)) == (0.0, 0.0)
+
+
+def test_persists_with_the_images(tmp_path):
+    src_dir = tmp_path / "images"
+    src_dir.mkdir()
+    fp = str(src_dir / "a.png")
+    cv2.imwrite(fp, _image(1))
+
+    stats = ImageStats(str(src_dir), str(tmp_path))
+    assert stats.getMissing([fp]) == [fp]
+    hist = stats.getHistogram(fp)
+    assert stats.db_fp == str(src_dir / ImageStats.fname)
+    assert np.array_equal(hist, np.bincount(_image(1).ravel(), minlength=256))
+
+    # a new session reads the stored histogram
+    reopened = ImageStats(str(src_dir), str(tmp_path))
+    assert reopened.getMissing([fp]) == []
+    assert np.array_equal(reopened.getHistogram(fp, measure=False), hist)
+
+    # a changed image is measured again
+    cv2.imwrite(fp, _image(2))
+    os.utime(fp, ns=(0, os.stat(fp).st_mtime_ns + 10**9))
+    reopened = ImageStats(str(src_dir), str(tmp_path))
+    assert reopened.getHistogram(fp, measure=False) is None
+    assert np.array_equal(reopened.getHistogram(fp), np.bincount(_image(2).ravel(), minlength=256))
+
+
+def test_zarr_scales(tmp_path):
+    src_dir = str(tmp_path / "images.zarr")
+    group = zarr.open_group(src_dir, "w")
+    group.create_dataset("scale_1/a", data=_image(3, (80, 80)))
+    group.create_dataset("scale_4/a", data=_image(4, (20, 20)))
+
+    assert getImagePath(src_dir, "a") == os.path.join(src_dir, "scale_4", "a")
+    assert getImagePath(src_dir, "a", lowest_res=False) == os.path.join(src_dir, "scale_1", "a")
+    assert getImagePath(src_dir, "b") is None
+
+    stats = ImageStats(src_dir, str(tmp_path))
+    for image, fp in (
+        (_image(4, (20, 20)), getImagePath(src_dir, "a")),
+        (_image(3, (80, 80)), getImagePath(src_dir, "a", lowest_res=False)),
+    ):
+        assert np.array_equal(stats.getHistogram(fp), np.bincount(image.ravel(), minlength=256))
+    assert len(ImageStats(src_dir, str(tmp_path)).getMissing([fp])) == 0
+
+    # large images are sampled
+    assert getImageHistogram(fp, max_pixels=100).sum() == 100
+
+
+def test_uint16_matches_the_display(tmp_path):
+    src_dir = str(tmp_path / "images16.zarr")
+    group = zarr.open_group(src_dir, "w")
+    rng = np.random.default_rng(6)
+    image = rng.integers(0, 65536, (40, 40), dtype=np.uint16)
+    image[0, :4] = [30000, 0, 65535, 256]
+    group.create_dataset("scale_1/a", data=image)
+    fp = getImagePath(src_dir, "a")
+
+    hist = ImageStats(src_dir, str(tmp_path)).getHistogram(fp)
+    displayed = toGrayscale8(image)
+    assert displayed[0, :4].tolist() == [116, 0, 255, 0]
+    assert np.array_equal(hist, np.bincount(displayed.ravel(), minlength=256))
+    assert ImageStats.histStats(hist) == pytest.approx((np.mean(displayed), np.std(displayed)))
+
+
+def test_old_store_is_measured_again(tmp_path):
+    src_dir = tmp_path / "images"
+    src_dir.mkdir()
+    fp = str(src_dir / "a.png")
+    cv2.imwrite(fp, _image(7))
+    ImageStats(str(src_dir), str(tmp_path)).getHistogram(fp)
+
+    db_fp = str(src_dir / ImageStats.fname)
+    with sqlite3.connect(db_fp) as conn:
+        conn.execute("PRAGMA user_version = 1")
+    conn.close()
+    assert ImageStats(str(src_dir), str(tmp_path)).getMissing([fp]) == [fp]
+
+
+def test_series_image_stats(real_series, tmp_path):
+    src_dir = tmp_path / "images"
+    src_dir.mkdir()
+    real_series.src_dir = str(src_dir)
+    section = real_series.loadSection(1)
+    section.src = "a.png"
+    section.save()
+    cv2.imwrite(str(src_dir / "a.png"), _image(5))
+
+    stats = real_series.getImageStats()
+    assert real_series.getImageStats() is stats
+    assert real_series.getImagePaths([1, 2]) == {1: str(src_dir / "a.png")}
+    assert real_series.updateImageStats([1, 2], max_processes=1) == {1: str(src_dir / "a.png")}
+    assert stats.getStats(str(src_dir / "a.png")) == pytest.approx(
+        (np.mean(_image(5)), np.std(_image(5)))
+    )
+
+    # another image directory gets its own store
+    real_series.src_dir = str(tmp_path)
+    assert real_series.getImageStats() is not stats
+
+
+def test_one_query_for_many_images(tmp_path, monkeypatch):
+    src_dir = tmp_path / "images"
+    src_dir.mkdir()
+    fps = []
+    for i in range(20):
+        fps.append(str(src_dir / f"{i}.png"))
+        cv2.imwrite(fps[-1], _image(i, (8, 8)))
+    ImageStats(str(src_dir), str(tmp_path)).setHistograms({
+        fp : getImageHistogram(fp) for fp in fps[:15]
+    })
+
+    stats = ImageStats(str(src_dir), str(tmp_path))
+    connections = []
+    connect = stats.connect
+    monkeypatch.setattr(stats, "connect", lambda: connections.append(1) or connect())
+
+    assert stats.getMissing(fps + [str(src_dir / "missing.png")]) == fps[15:]
+    for fp in fps[:15]:
+        assert stats.getStats(fp) is not None
+    assert len(connections) == 1
@@ -0,0 +1,135 @@
+"""Series.importTraces merges the sections in worker processes.
+
+Each worker reads the section files of both series and writes the merged
+section; the series data, attributes and histories are updated once the
+workers are done. The merged sections must be the ones Section.importTraces
+produces section by section.
+"""
+
+import os
+import shutil
+
+import pytest
+
+from PyReconstruct.modules.datatypes.log import LogSetPair
+from PyReconstruct.modules.datatypes.series import Series
+from PyReconstruct.modules.datatypes.series_data import SeriesData
+
+
+FILES_DIR = os.path.join(
+    os.path.dirname(__file__), "..", "PyReconstruct", "assets", "checker", "files"
+)
+
+
+@pytest.fixture
+def openSeries(qapp, tmp_path):
+    opened = []
+
+    def openSeries(name, subdir):
+        os.makedirs(tmp_path / subdir)
+        fp = str(tmp_path / subdir / name)
+        shutil.copyfile(os.path.join(FILES_DIR, name), fp)
+        series = Series.openJser(fp)
+        series.data = SeriesData(series)
+        series.data.refresh()
+        opened.append(series)
+        return series
+
+    yield openSeries
+
+    for series in opened:
+        series.close()
+
+
+def _sections(series):
+    """The traces and conflict flags on each section (import tags dropped)."""
+    sections = {}
+    for snum in sorted(series.sections):
+        section = series.loadSection(snum)
+        sections[snum] = (
+            sorted(
+                (name, trace.closed, tuple(trace.points),
+                 tuple(sorted(t for t in trace.tags if not t.endswith(("-ic1", "-ic2")))))
+                for name, contour in section.contours.items() for trace in contour
+            ),
+            sorted((f.name, round(f.x, 6), round(f.y, 6)) for f in section.flags),
+        )
+    return sections
+
+
+@pytest.mark.parametrize("keep_above, keep_below", [("self", ""), ("other", "self")])
+def test_matches_the_serial_import(openSeries, keep_above, keep_below):
+    series = openSeries("shapes1.jser", "sharded")
+    reference = openSeries("shapes1.jser", "serial")
+    other = openSeries("shapes2.jser", "other")
+
+    series.importTraces(
+        other, (0, 5), threshold=0.95, keep_above=keep_above,
+        keep_below=keep_below, max_processes=2
+    )
+
+    histories = LogSetPair(reference.getFullHistory(), other.getFullHistory())
+    for snum in reference.sections:
+        reference.loadSection(snum).importTraces(
+            other.loadSection(snum),
+            threshold=0.95,
+            histories=histories,
+            keep_above=keep_above,
+            keep_below=keep_below,
+            dt_str="dt"
+        )
+
+    assert _sections(series) == _sections(reference)
+
+    # the series data follows the merged sections
+    for name in series.data["objects"]:
+        assert series.data.getCount(name) == reference.data.getCount(name)
+
+
+def test_filters_and_range(openSeries):
+    series = openSeries("shapes1.jser", "sharded")
+    other = openSeries("shapes2.jser", "other")
+    before = _sections(series)
+
+    series.importTraces(
+        other, (1, 3), regex_filters=["circle.*"], check_history=False,
+        flag_conflicts=False, max_processes=2
+    )
+    after = _sections(series)
+
+    for snum in before:
+        traces_before = [t for t in before[snum][0] if not t[0].startswith("circle")]
+        traces_after = [t for t in after[snum][0] if not t[0].startswith("circle")]
+        assert traces_before == traces_after
+        if snum not in (1, 2):
+            assert before[snum] == after[snum]
+
+
+def test_modified_since_diverge_sections():
+    from PyReconstruct.modules.datatypes.log import Log, LogSet
+
+    shared = [Log("2024-01-01", "10:00", "a", "circle", [(0, 4)], "Create trace(s)")]
+    logs0 = [
+        Log("2024-01-02", "10:00", "a", "circle", [(1, 2)], "Modify trace(s)"),
+        Log("2024-01-02", "10:01", "a", "square", None, "Modify trace(s)"),
+        Log("2024-01-02", "10:02", "a", "z1", [(3, 3)], "Modify ztrace"),
+    ]
+    logs1 = [
+        Log("2024-01-03", "10:00", "b", "circle", [(2, 3)], "Modify trace(s)"),
+        Log("2024-01-03", "10:01", "b", "star", [(0, 0), (4, 4)], "Create trace(s)"),
+        Log("2024-01-03", "10:02", "b", None, [(1, 1)], "Create flag(s)"),
+    ]
+    logset0, logset1 = LogSet(), LogSet()
+    for log in shared + logs0:
+        logset0.addExistingLog(log)
+    for log in shared + logs1:
+        logset1.addExistingLog(log)
+    histories = LogSetPair(logset0, logset1)
+
+    snums = range(5)
+    modified = histories.getModifiedSinceDivergeSections(snums)
+    for snum in snums:
+        for cname in ("circle", "square", "star", "z1", "triangle"):
+            expected = histories.getModifiedSinceDiverge(cname, snum)
+            assert modified.get(snum, {}).get(cname, (False, False)) == expected
+    assert modified[2]["circle"] == (True, True)
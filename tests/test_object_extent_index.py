@@ -0,0 +1,77 @@
+"""SeriesData keeps the sections every object is on.
+
+The sections of an object are maintained with the rest of the series data, so
+Series.createZtrace only loads the sections the object is on.
+"""
+
+import pytest
+
+from PyReconstruct.modules.datatypes.series_data import SeriesData
+
+
+def _loaded(series):
+    loaded = []
+    load = series.loadSection
+    def loadSection(snum):
+        loaded.append(snum)
+        return load(snum)
+    series.loadSection = loadSection
+    return loaded
+
+
+def _sections(series, name):
+    """The sections of an object found from the section files."""
+    return [
+        snum for snum in sorted(series.sections)
+        if name in series.loadSection(snum).contours
+        and not series.loadSection(snum).contours[name].isEmpty()
+    ]
+
+
+def test_sections_match_the_files(real_series):
+    data = real_series.data
+    for name in data["objects"]:
+        assert data.getSections(name) == _sections(real_series, name)
+    assert data.getSections("missing") == []
+
+
+def test_sections_follow_section_edits(real_series):
+    section = real_series.loadSection(2)
+    name = next(iter(section.contours))
+    while not section.contours[name].isEmpty():
+        section.removeTrace(section.contours[name].getTraces()[0], log_event=False)
+    section.save()
+
+    assert 2 not in real_series.data.getSections(name)
+    assert real_series.data.getSections(name) == _sections(real_series, name)
+
+
+@pytest.mark.parametrize("cross_sectioned", [True, False])
+def test_create_ztrace_loads_object_sections(real_series, cross_sectioned):
+    name = "square"
+    expected = real_series.data.getSections(name)
+
+    # reference: every section, as without the index
+    full = SeriesData(real_series)
+    real_series.data, data = full, real_series.data
+    real_series.createZtrace(name, cross_sectioned, log_event=False)
+    reference = list(real_series.ztraces[f"{name}_zlen"].points)
+    real_series.data = data
+
+    loaded = _loaded(real_series)
+    real_series.createZtrace(name, cross_sectioned, log_event=False)
+    ztrace = real_series.ztraces[f"{name}_zlen"]
+
+    assert sorted(set(loaded)) == expected
+    assert list(ztrace.points) == reference
+    assert sorted(set(p[2] for p in ztrace.points)) == expected
+
+
+def test_create_ztrace_does_not_reuse_points(real_series):
+    real_series.createZtrace("square", log_event=False)
+    real_series.createZtrace("circle2", log_event=False)
+    assert "circle2_zlen" in real_series.ztraces
+    square_snums = set(p[2] for p in real_series.ztraces["square_zlen"].points)
+    circle_snums = set(p[2] for p in real_series.ztraces["circle2_zlen"].points)
+    assert circle_snums == set(real_series.data.getSections("circle2"))
+    assert square_snums == set(real_series.data.getSections("square"))
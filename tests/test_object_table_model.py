@@ -0,0 +1,163 @@
+"""The object list is a view on a model that computes rows on demand.
+
+Cells are only computed for the rows a view asks for and are cached until the
+object is updated, so updating an object recomputes only its own row. The list
+can be sorted by any column and keeps its rows in place across updates.
+"""
+
+import types
+
+import pytest
+
+from PyReconstruct.modules.datatypes.trace import Trace
+
+
+@pytest.fixture
+def object_list(qapp, real_series):
+    from PySide6.QtWidgets import QMainWindow
+
+    from PyReconstruct.modules.backend.func.state_manager import SeriesStates
+    from PyReconstruct.modules.backend.table.manager import TableManager
+
+    series = real_series
+    section = series.loadSection(series.current_section)
+
+    mainwindow = QMainWindow()
+    mainwindow.saveAllData = lambda: None
+    mainwindow.seriesModified = lambda *a: None
+    mainwindow.checkActions = lambda *a: None
+    mainwindow.addDockWidget = lambda *a, **k: None
+    mainwindow.createContextMenus = lambda: None
+
+    field = types.SimpleNamespace()
+    field.getObjMenu = lambda: []
+    field.hideUnselectedObjects = field.unhideAllObjects = lambda: None
+    field.addUserCol = field.editUserCol = lambda *a, **k: None
+    field.deselectAllTraces = lambda: None
+    mainwindow.field = field
+
+    states = SeriesStates(series)
+    manager = TableManager(series, section, states, mainwindow)
+    manager.newTable("object")
+
+    yield series, section, manager, manager.tables["object"][0]
+
+    mainwindow.deleteLater()
+
+
+def _count_cells(table):
+    """Record the objects whose cells are computed."""
+    computed = []
+    getCells = table.model.getCells
+    def counting(name):
+        computed.append(name)
+        return getCells(name)
+    table.model.getCells = counting
+    return computed
+
+
+def test_rows_match_the_series(object_list):
+    from PySide6.QtCore import Qt
+
+    series, section, manager, table = object_list
+    model = table.model
+
+    names = list(model.names)
+    assert names == sorted(series.data["objects"], key=lambda n: (n.lower(), n))
+    assert model.headerData(0, Qt.Horizontal) == "Name"
+    for r, name in enumerate(names):
+        assert model.index(r, 0).data() == name
+    start_col = table.horizontal_headers.index("Start")
+    assert model.index(0, start_col).data() == str(series.data.getStart(names[0]))
+
+
+def test_cells_are_computed_on_demand_and_cached(object_list):
+    series, section, manager, table = object_list
+    model = table.model
+    model.cache.clear()
+    computed = _count_cells(table)
+
+    model.index(1, 0).data()
+    model.index(1, 1).data()
+    assert computed == [model.names[1]]
+
+
+def test_update_only_recomputes_changed_rows(object_list):
+    series, section, manager, table = object_list
+    model = table.model
+    for r in range(model.rowCount()):
+        model.index(r, 0).data()
+    computed = _count_cells(table)
+
+    changed = model.names[0]
+    trace = section.contours[changed].getTraces()[0].copy()
+    section.addTrace(trace, log_event=False)
+    series.data.updateSection(section, update_traces=True)
+    manager.updateObjects([changed])
+
+    for r in range(model.rowCount()):
+        model.index(r, 0).data()
+    assert computed == [changed]
+
+    # new and removed objects insert and remove rows in sorted order
+    new_trace = Trace("aaa_new", (0, 255, 0))
+    new_trace.points = [(0, 0), (1, 0), (1, 1)]
+    section.addTrace(new_trace, log_event=False)
+    series.data.updateSection(section, update_traces=True)
+    manager.updateObjects(["aaa_new"])
+    assert model.names[0] == "aaa_new"
+
+    section.removeTrace(new_trace, log_event=False)
+    series.data.updateSection(section, update_traces=True)
+    manager.updateObjects(["aaa_new"])
+    assert "aaa_new" not in model.names
+
+
+def test_sort_keeps_the_selection(object_list):
+    from PySide6.QtCore import Qt
+
+    series, section, manager, table = object_list
+    model = table.model
+
+    table.table.selectRow(0)
+    selected = table.getSelected()
+
+    start_col = table.horizontal_headers.index("Start")
+    table.table.sortByColumn(start_col, Qt.DescendingOrder)
+    starts = [series.data.getStart(n) for n in model.names]
+    assert starts == sorted(starts, reverse=True)
+    assert table.getSelected() == selected
+
+    # updates keep the column order
+    manager.updateObjects(model.names[-1:])
+    assert [series.data.getStart(n) for n in model.names] == starts
+
+    table.table.sortByColumn(0, Qt.AscendingOrder)
+    assert model.names == sorted(model.names, key=lambda n: (n.lower(), n))
+    assert table.getSelected() == selected
+
+
+def test_filters_apply_to_updated_rows(object_list):
+    series, section, manager, table = object_list
+
+    series.object_groups.add("shapes", "star")
+    series.setObjHosts(["square"], ["star"])
+    table.group_filters = {"shapes"}
+    table.host_filters = {"star"}
+    table.createTable()
+    assert table.model.names == ["star"]
+
+    # an incremental update filters the new rows without resizing the columns
+    resized = []
+    table.table.resizeColumnsToContents = lambda: resized.append(True)
+    series.object_groups.add("shapes", "square")
+    series.object_groups.add("shapes", "circle2")
+    manager.updateObjects(["square", "circle2"])
+    assert table.model.names == ["square", "star"]
+    assert resized == []
+
+    table.direct_hosts_only = True
+    assert table.filterNames(["circle2", "square", "star", "missing"]) == ["square", "star"]
+    table.re_filters = {"s.*"}
+    table.host_filters = set()
+    assert table.getFiltered() == ["square", "star"]
@@ -0,0 +1,85 @@
+"""optimizeSeriesBC measures the full images in worker processes.
+
+The brightness and contrast must be the ones the pixels of each image give,
+and images that were already measured are not read again.
+"""
+
+import cv2
+import numpy as np
+
+from PyReconstruct.modules.backend.view.optimize_bc import (
+    adjustPixelsToStats,
+    optimizeSectionBC,
+    optimizeSeriesBC,
+)
+from PyReconstruct.modules.datatypes.image_stats import getImageHistogram
+
+
+def _writeImages(series, tmp_path):
+    rng = np.random.default_rng(0)
+    src_dir = tmp_path / "images"
+    src_dir.mkdir()
+    series.src_dir = str(src_dir)
+    for snum in sorted(series.sections):
+        section = series.loadSection(snum)
+        section.src = f"img{snum}.png"
+        section.brightness, section.contrast = 0, 0
+        section.save()
+        image = rng.normal(60 + 20 * snum, 10 + 5 * snum, (64, 80))
+        cv2.imwrite(str(src_dir / section.src), np.clip(image, 0, 255).astype(np.uint8))
+
+
+def _bc(series):
+    return {
+        snum: (series.loadSection(snum).brightness, series.loadSection(snum).contrast)
+        for snum in sorted(series.sections)
+    }
+
+
+def test_matches_serial(real_series, tmp_path):
+    _writeImages(real_series, tmp_path)
+    expected = {}
+    for snum in sorted(real_series.sections):
+        fp = str(tmp_path / "images" / f"img{snum}.png")
+        expected[snum] = adjustPixelsToStats(cv2.imread(fp, cv2.IMREAD_GRAYSCALE), 100, 40)
+
+    optimizeSeriesBC(real_series, 100, 40, max_processes=2)
+    assert _bc(real_series) == expected
+
+    # a single section from the stored histogram
+    section = real_series.loadSection(2)
+    section.brightness, section.contrast = 0, 0
+    optimizeSectionBC(section, 100, 40)
+    assert (section.brightness, section.contrast) == expected[2]
+
+
+def test_uses_cached_stats(real_series, tmp_path, monkeypatch):
+    _writeImages(real_series, tmp_path)
+    optimizeSeriesBC(real_series, 128, 60, section_nums=[0, 1, 2], max_processes=2)
+    first = _bc(real_series)
+    assert first[3] == first[4] == (0, 0)
+
+    ## a second run only measures the new images
+    measured = []
+    class Pool:
+        def __init__(self, max_processes=None):
+            self.fps = []
+        def createWorker(self, fn, fp, name=None):
+            self.fps.append(fp)
+        def startAll(self, text, result_fn=None, cancel=False):
+            measured.extend(self.fps)
+            return [getImageHistogram(fp) for fp in self.fps]
+    monkeypatch.setattr("PyReconstruct.modules.backend.threading.ProcessPoolProgBar", Pool)
+
+    optimizeSeriesBC(real_series, 128, 60)
+    assert sorted(measured) == sorted(str(tmp_path / "images" / f"img{s}.png") for s in (3, 4))
+    assert {s: bc for s, bc in _bc(real_series).items() if s in (0, 1, 2)} == {
+        s: first[s] for s in (0, 1, 2)
+    }
+
+
+def test_missing_images(real_series, tmp_path):
+    real_series.src_dir = str(tmp_path / "nowhere")
+    before = _bc(real_series)
+    optimizeSeriesBC(real_series, 128, 60, max_processes=2)
+    assert _bc(real_series) == before
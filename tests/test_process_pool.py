@@ -0,0 +1,82 @@
+"""Worker failures in ProcessPoolProgBar are reported, not swallowed.
+
+A worker that raises does not stop the others; once the pool has drained,
+startAll raises a WorkerError that names every failed worker and carries the
+results of the ones that succeeded. Canceling keeps the results of every
+worker that finished.
+"""
+
+import time
+
+import pytest
+
+from PyReconstruct.modules.backend.threading import ProcessPoolProgBar, WorkerError
+
+
+def _delayed(value, delay):
+    time.sleep(delay)
+    return value
+
+
+def test_results_in_creation_order(qapp):
+    pool = ProcessPoolProgBar(2)
+    for s in ("3", "1", "2"):
+        pool.createWorker(int, s)
+    assert pool.startAll("Parsing...") == [3, 1, 2]
+    assert pool.workers == []
+
+
+def test_failures_are_raised_after_draining(qapp):
+    pool = ProcessPoolProgBar(2)
+    for snum, s in enumerate(["1", "x", "3", "y"]):
+        pool.createWorker(int, s, name=f"section {snum}")
+    applied = []
+
+    with pytest.raises(WorkerError) as info:
+        pool.startAll("Parsing...", result_fn=applied.append)
+
+    error = info.value
+    assert error.results == [1, None, 3, None]
+    assert applied == [1, 3]
+    assert [name for name, tb in error.failures] == ["section 1", "section 3"]
+    assert "ValueError" in error.failures[0][1]
+    assert "2 of 4 task(s) failed" in str(error)
+    assert "section 1: ValueError" in str(error)
+
+
+def test_failures_are_not_printed(qapp, capsys):
+    pool = ProcessPoolProgBar(1)
+    pool.createWorker(int, "x")
+    with pytest.raises(WorkerError):
+        pool.startAll("Parsing...")
+    assert capsys.readouterr().out == ""
+
+
+def test_cancel_keeps_finished_results(qapp, monkeypatch):
+    class Progbar:
+        def __init__(self):
+            self.value = 0
+        def setValue(self, value):
+            self.value = value
+        def wasCanceled(self):
+            return self.value >= 3
+        def close(self):
+            pass
+    monkeypatch.setattr(
+        "PyReconstruct.modules.backend.threading.processes.getProgbar",
+        lambda *args, **kwargs: Progbar()
+    )
+
+    # the first worker is still running when the others finish and the pool is canceled
+    pool = ProcessPoolProgBar(2)
+    pool.createWorker(_delayed, 0, 1.5)
+    for value in (1, 2, 3):
+        pool.createWorker(_delayed, value, 0)
+    for value in range(4, 14):
+        pool.createWorker(_delayed, value, 0.5)
+    applied = []
+    results = pool.startAll("Waiting...", result_fn=applied.append, cancel=True)
+
+    assert results[:4] == [0, 1, 2, 3]
+    assert results[-1] is None
+    assert applied == [r for r in results if r is not None]
@@ -0,0 +1,68 @@
+"""The series caches the z-values and transforms of its sections.
+
+Series.getZArray and Series.getTformArray are indexed by section number and
+are rebuilt only when a section thickness, a section transform or the set of
+sections changes.
+"""
+
+import numpy as np
+import pytest
+
+from PyReconstruct.modules.datatypes.transform import Transform
+
+
+def _zvalues(series):
+    zvals, z = {}, 0
+    for snum in sorted(series.sections):
+        z += series.data["sections"][snum]["thickness"]
+        zvals[snum] = z
+    return zvals
+
+
+def test_z_values(real_series):
+    zarr = real_series.getZArray()
+    assert real_series.getZArray() is zarr  # cached
+    assert real_series.getZValues() == pytest.approx(_zvalues(real_series))
+    for snum, z in _zvalues(real_series).items():
+        assert zarr[snum] == pytest.approx(z)
+
+    section = real_series.loadSection(2)
+    section.thickness = 0.5
+    section.save()
+    assert real_series.getZArray() is not zarr
+    assert real_series.getZValues() == pytest.approx(_zvalues(real_series))
+    assert real_series.getZValues()[4] - real_series.getZValues()[1] == pytest.approx(
+        0.5 + real_series.data["sections"][3]["thickness"] + real_series.data["sections"][4]["thickness"]
+    )
+
+
+def test_transforms(real_series):
+    tforms = real_series.getTformArray()
+    assert real_series.getTformArray(real_series.alignment) is tforms  # cached
+    for snum in real_series.sections:
+        expected = real_series.data["sections"][snum]["tforms"][real_series.alignment]
+        assert tforms[snum].tolist() == expected.getList()
+    assert np.array_equal(
+        real_series.getTformArray("no-alignment")[list(real_series.sections)],
+        np.tile([1, 0, 0, 0, 1, 0], (len(real_series.sections), 1))
+    )
+    assert np.isnan(real_series.getTformArray("missing")).all()
+
+    section = real_series.loadSection(3)
+    section.tform = Transform([1, 0, 5, 0, 1, -5])
+    section.save()
+    tforms = real_series.getTformArray()
+    assert tforms[3].tolist() == [1, 0, 5, 0, 1, -5]
+
+    # the thickness does not rebuild the transforms
+    section = real_series.loadSection(1)
+    section.thickness = 0.3
+    section.save()
+    assert real_series.getTformArray() is tforms
+
+
+def test_removed_section(real_series):
+    zarr = real_series.getZArray()
+    del real_series.sections[4]
+    assert real_series.getZArray() is not zarr
+    assert len(real_series.getZArray()) == 4
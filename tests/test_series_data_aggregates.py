@@ -0,0 +1,85 @@
+"""SeriesData keeps running per-object aggregates.
+
+The object metrics (count, flat area, volume, tags, radius, range and
+configuration) are maintained as traces are added and sections are cleared,
+and must always agree with a walk over the object's trace data.
+"""
+
+import pytest
+
+from PyReconstruct.modules.datatypes.trace import Trace
+
+
+def _walk(series, name):
+    """The object metrics computed from scratch over its TraceData."""
+    traces = series.data["objects"][name].traces
+    all_data = [(snum, t) for snum, tl in traces.items() for t in tl]
+    thickness = lambda snum: series.data["sections"][snum]["thickness"]
+    closed = sum(t.closed for _, t in all_data)
+    return {
+        "start": min(traces),
+        "end": max(traces),
+        "count": len(all_data),
+        "flat_area": sum(
+            t.getArea() if t.closed else t.getLength() * thickness(snum)
+            for snum, t in all_data
+        ),
+        "volume": sum(t.getArea() * thickness(snum) for snum, t in all_data),
+        "tags": set().union(*(t.getTags() for _, t in all_data)),
+        "radius": sum(t.getRadius() for _, t in all_data) / len(all_data),
+        "config": "open" if closed == 0 else "closed" if closed == len(all_data) else "mixed",
+    }
+
+
+def _read(series, name):
+    data = series.data
+    return {
+        "start": data.getStart(name),
+        "end": data.getEnd(name),
+        "count": data.getCount(name),
+        "flat_area": data.getFlatArea(name),
+        "volume": data.getVolume(name),
+        "tags": data.getTags(name),
+        "radius": data.getAvgRadius(name),
+        "config": data.getConfiguration(name),
+    }
+
+
+def _assert_matches(series, name):
+    read, walked = _read(series, name), _walk(series, name)
+    for key in ("flat_area", "volume", "radius"):
+        assert read.pop(key) == pytest.approx(walked.pop(key))
+    assert read == walked
+
+
+def test_aggregates_match_the_trace_data(real_series):
+    series = real_series
+    for name in series.data["objects"]:
+        _assert_matches(series, name)
+
+
+def test_aggregates_follow_section_updates(real_series):
+    series = real_series
+    section = series.loadSection(series.current_section)
+    name = next(iter(section.contours))
+
+    # add an open, tagged trace
+    trace = Trace(name, (255, 0, 0), closed=False)
+    trace.points = [(0, 0), (3, 0), (3, 4)]
+    trace.tags = {"new_tag"}
+    section.addTrace(trace, log_event=False)
+    series.data.updateSection(section, update_traces=True)
+    _assert_matches(series, name)
+    assert "new_tag" in series.data.getTags(name)
+    assert series.data.getConfiguration(name) == "mixed"
+
+    # changing the thickness updates flat area and volume
+    section.thickness *= 2
+    series.data.updateSection(section)
+    _assert_matches(series, name)
+
+    # removing the trace again
+    section.removeTrace(trace, log_event=False)
+    series.data.updateSection(section, update_traces=True)
+    _assert_matches(series, name)
+    assert "new_tag" not in series.data.getTags(name)
@@ -0,0 +1,114 @@
+"""Series.smoothObject smooths the sections in worker processes.
+
+Only the sections the objects are on are sent to the workers; the smoothed
+points are applied (and the series data updated) in the main process. The
+result must be the one Trace.smooth gives on each trace.
+"""
+
+import json
+import os
+
+import pytest
+
+from PyReconstruct.modules.backend.threading import WorkerError
+from PyReconstruct.modules.datatypes.trace import Trace
+
+
+def _points(series, names):
+    return {
+        (snum, name): [trace.points for trace in series.loadSection(snum).contours[name]]
+        for snum in sorted(series.sections)
+        for name in names
+        if name in series.loadSection(snum).contours
+    }
+
+
+def test_matches_serial_smoothing(real_series):
+    names = ["circle2", "square"]
+    window = real_series.getOption("roll_window")
+
+    ## add a trace too small to smooth
+    section = real_series.loadSection(1)
+    dust = Trace("square", (255, 0, 0))
+    dust.points = [(1, 1), (1.001, 1.001)]
+    section.addTrace(dust, log_event=False)
+    section.save()
+
+    expected = {}
+    for (snum, name), points_list in _points(real_series, names).items():
+        expected[(snum, name)] = []
+        for points in points_list:
+            trace = Trace(name, (0, 0, 0))
+            trace.points = points
+            trace.smooth(window=window, spacing=0.004)
+            expected[(snum, name)].append(trace.points)
+    untouched = _points(real_series, ["star", "triangle"])
+
+    malformed = real_series.smoothObject(names, log_event=False, max_processes=2)
+
+    assert _points(real_series, names) == expected
+    assert _points(real_series, ["star", "triangle"]) == untouched
+
+    assert [(r["name"], r["section"], r["reason"]) for r in malformed] == [
+        ("square", 1, "Fewer than 3 points")
+    ]
+    index = malformed[0]["index"]
+    assert real_series.loadSection(1).contours["square"][index].points == dust.points
+
+    # the series data follows the smoothed traces
+    for name in names:
+        for snum in real_series.data.getSections(name):
+            trace_data = real_series.data.getTraceData(name, snum)
+            assert len(trace_data) == len(expected[(snum, name)])
+
+
+def test_missing_object(real_series):
+    assert real_series.smoothObject(["missing"], log_event=False, max_processes=2) == []
+
+
+def test_failed_sections_are_reported(real_series):
+    names = ["circle2", "square"]
+    before = _points(real_series, names)
+    snum = real_series.data.getSections("square")[0]
+    fp = os.path.join(real_series.hidden_dir, real_series.sections[snum])
+    with open(fp) as f:
+        text = f.read()
+    with open(fp, "w") as f:
+        f.write("not json")
+
+    with pytest.raises(WorkerError, match=f"section {snum}"):
+        real_series.smoothObject(names, log_event=False, max_processes=2)
+
+    # nothing was applied
+    with open(fp, "w") as f:
+        f.write(text)
+    assert _points(real_series, names) == before
+
+
+def test_defective_traces_in_the_file(real_series):
+    """Traces the loaded section screens out must not shift the smoothed points."""
+    window = real_series.getOption("roll_window")
+    snum = real_series.data.getSections("square")[0]
+    fp = os.path.join(real_series.hidden_dir, real_series.sections[snum])
+    with open(fp) as f:
+        data = json.load(f)
+    real = data["contours"]["square"][0]
+    point = real[:1] + [real[1][:1], real[2][:1]] + real[3:]
+    line = real[:1] + [real[1][:2], real[2][:2]] + real[3:]
+    data["contours"]["square"] = [point, line] + data["contours"]["square"]
+    with open(fp, "w") as f:
+        json.dump(data, f)
+
+    traces = real_series.loadSection(snum).contours["square"].traces
+    assert len(traces) == len(data["contours"]["square"]) - 1
+    assert not traces[0].closed
+    expected = []
+    for trace in traces:
+        trace = trace.copy()
+        trace.smooth(window=window, spacing=0.004)
+        expected.append(trace.points)
+
+    malformed = real_series.smoothObject(["square"], log_event=False, max_processes=2)
+
+    assert [t.points for t in real_series.loadSection(snum).contours["square"]] == expected
+    assert [(r["section"], r["index"]) for r in malformed] == [(snum, 0)]
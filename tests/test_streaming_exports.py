@@ -0,0 +1,87 @@
+"""The trace, object and z-trace exports are streamed row by row.
+
+The rows are produced by generators and written with the csv module, so an
+export never builds its whole output in memory. Filepaths ending in .parquet
+(or .arrow/.feather) are written with pyarrow when it is installed.
+"""
+
+import csv
+
+import pytest
+
+
+def _read(fp, delimiter=","):
+    with open(fp, newline="") as f:
+        return list(csv.reader(f, delimiter=delimiter))
+
+
+def test_trace_export(real_series, tmp_path):
+    series = real_series
+    fp = str(tmp_path / "traces.csv")
+    series.data.exportTracesCSV(fp)
+
+    rows = _read(fp)
+    assert rows[0][:3] == ["Name", "Section", "Index"]
+    n_traces = sum(series.data.getCount(n) for n in series.data["objects"])
+    assert len(rows) == n_traces + 1
+
+    # sorted by object then section, one row per trace
+    keys = [(r[0], int(r[1]), int(r[2])) for r in rows[1:]]
+    assert keys == sorted(keys)
+    for name, snum, i in keys:
+        assert series.data.getTraceData(name, snum)[i]
+
+    # same text when no filepath is given
+    with open(fp) as f:
+        assert series.data.exportTracesCSV() == f.read()
+
+
+def test_object_and_ztrace_exports(real_series, tmp_path):
+    series = real_series
+    series.setAttr("circle2", "comment", "a|b, c")
+
+    fp = str(tmp_path / "objects.csv")
+    series.exportObjectsCSV(fp)
+    rows = _read(fp, "|")
+    assert rows[0][:2] == ["Series", "Name"]
+    by_name = {r[1]: r for r in rows[1:]}
+    assert set(by_name) == set(series.data["objects"])
+    assert by_name["circle2"][4] == str(series.data.getCount("circle2"))
+    assert by_name["circle2"][-1] == "a_b, c"
+
+    fp = str(tmp_path / "ztraces.csv")
+    series.exportZtracesCSV(fp)
+    rows = _read(fp, "|")
+    assert rows[0] == ["series", "ztrace", "start", "end", "length"]
+    assert {r[1] for r in rows[1:]} == set(series.ztraces)
+
+
+def test_parquet_export(real_series, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    series = real_series
+    fp = str(tmp_path / "traces.parquet")
+    series.data.exportTracesCSV(fp)
+
+    table = pq.read_table(fp)
+    n_traces = sum(series.data.getCount(n) for n in series.data["objects"])
+    assert table.num_rows == n_traces
+    assert table.column_names[:3] == ["Name", "Section", "Index"]
+    assert str(table.schema.field("Section").type) == "int64"
+
+
+def test_arrow_schema_is_declared(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    from pyarrow import feather
+
+    from PyReconstruct.modules.datatypes.table_export import writeTable
+
+    # the first batch has no users and integer areas; later batches have both
+    rows = [["a", None, 0], ["b", None, 1]] + [["c", "user", 0.5]] * 3
+    fp = str(tmp_path / "objects.arrow")
+    writeTable(fp, ["Name", "Last_User", "Flat_Area"], ["str", "str", "float"], rows, batch_size=2)
+
+    table = feather.read_table(fp)
+    assert table.schema.types == [pa.string(), pa.string(), pa.float64()]
+    assert table.column("Flat_Area").to_pylist() == [0.0, 1.0, 0.5, 0.5, 0.5]
+    assert table.column("Last_User").to_pylist() == [None, None, "user", "user", "user"]
@@ -0,0 +1,116 @@
+"""ThreadPoolProgBar completion is event driven.
+
+``startAll`` used to spin ``QApplication.processEvents`` until a counter
+caught up. It now waits on the pool's ``finished`` signal in a QEventLoop;
+these tests pin that every worker result is delivered before it returns, that
+a pool can be started without blocking, and that cancellation skips workers
+that have not started.
+"""
+import threading
+import time
+
+import pytest
+
+from PyReconstruct.modules.backend.threading import ThreadPool, ThreadPoolProgBar
+
+
+def _square(n):
+    time.sleep(0.01)
+    return n * n
+
+
+def test_start_all_waits_for_every_result(qapp):
+    pool = ThreadPoolProgBar()
+    results = []
+    for n in range(12):
+        worker = pool.createWorker(_square, n)
+        worker.signals.result.connect(results.append)
+
+    pool.startAll("Squaring...")
+
+    assert sorted(results) == [n * n for n in range(12)]
+    assert pool.isFinished()
+    assert pool.throughput > 0
+
+
+def test_non_blocking_start_then_wait(qapp):
+    release = threading.Event()
+    pool = ThreadPool(max_threads=2)
+    for _ in range(3):
+        pool.createWorker(release.wait, 5)
+
+    finished = []
+    pool.finished.connect(lambda: finished.append(True))
+    pool.startWorkers()
+
+    assert not pool.isFinished()
+    assert pool.throughput is None
+
+    release.set()
+    pool.wait()
+
+    assert finished == [True]
+    assert pool.n_finished == 3
+
+
+def test_bounded_concurrency(qapp):
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def task():
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.02)
+        with lock:
+            running.pop()
+
+    pool = ThreadPoolProgBar(max_threads=2)
+    for _ in range(8):
+        pool.createWorker(task)
+    pool.startAll()
+
+    assert max(peak) <= 2
+
+
+def test_cancel_skips_pending_workers(qapp):
+    pool = ThreadPoolProgBar(max_threads=1)
+    ran = []
+
+    def task(n):
+        ran.append(n)
+        if n == 0:
+            pool.cancel()
+
+    for n in range(6):
+        pool.createWorker(task, n)
+    pool.startAll()
+
+    assert ran == [0]
+    assert pool.canceled
+    assert pool.n_finished == 6
+
+
+def test_empty_pool_finishes_immediately(qapp):
+    pool = ThreadPoolProgBar()
+    pool.startAll("Nothing to do...")
+
+    assert pool.isFinished()
+
+
+def test_repeated_start_all(qapp):
+    pool = ThreadPoolProgBar()
+    results = []
+    for n in range(5):
+        pool.createWorker(_square, n).signals.result.connect(results.append)
+    pool.startAll("First...")
+    assert pool.workers == []
+
+    pool.createWorker(_square, 10).signals.result.connect(results.append)
+    pool.startAll("Second...")
+
+    # the first workers are not run again
+    assert sorted(results) == [0, 1, 4, 9, 16, 100]
+    assert pool.n_finished == 1
+    assert pool.receivers("2progress(int)") == 0
@@ -0,0 +1,94 @@
+"""Overlap ratios are computed exactly on shapely polygons.
+
+Trace.getOverlapRatio measures intersection over union on the trace polygons,
+which are cached on the trace (and rebuilt when its points change). The
+rasterized ratio stays available with raster=True and must agree with the
+exact ratio up to its pixel error. Trace.getOverlapRatios computes the ratios
+for every intersecting pair of two lists of traces at once.
+"""
+
+import math
+import random
+
+import pytest
+
+from PyReconstruct.modules.datatypes.trace import Trace
+
+
+def _trace(points, closed=True):
+    trace = Trace("a", (0, 0, 0), closed)
+    trace.points = list(points)
+    return trace
+
+
+def _blob(rng, cx, cy, r, n=16):
+    return _trace(
+        (cx + r * rng.uniform(0.7, 1.3) * math.cos(2 * math.pi * k / n),
+         cy + r * rng.uniform(0.7, 1.3) * math.sin(2 * math.pi * k / n))
+        for k in range(n)
+    )
+
+
+SQUARE = [(0, 0), (10, 0), (10, 10), (0, 10)]
+
+
+def test_exact_ratio():
+    a = _trace(SQUARE)
+    b = _trace([(x + 5, y + 5) for x, y in SQUARE])
+    assert a.getOverlapRatio(b) == pytest.approx(25 / 175)
+    assert a.getOverlapRatio(_trace(SQUARE)) == pytest.approx(1)
+    # touching edges do not overlap
+    assert a.getOverlapRatio(_trace([(x + 10, y) for x, y in SQUARE])) == 0
+
+
+def test_matches_the_raster_ratio():
+    rng = random.Random(2)
+    for _ in range(40):
+        a = _blob(rng, 0, 0, 5)
+        b = _blob(rng, rng.uniform(-4, 4), rng.uniform(-4, 4), rng.uniform(3, 6))
+        assert a.getOverlapRatio(b) == pytest.approx(
+            a.getOverlapRatio(b, raster=True), abs=0.03
+        )
+
+
+def test_geometry_follows_point_edits():
+    a = _trace(SQUARE)
+    b = _trace(SQUARE)
+    assert a.getOverlapRatio(b) == pytest.approx(1)
+
+    # in-place edits are picked up
+    for i, (x, y) in enumerate(b.points):
+        b.points[i] = (x + 5, y)
+    assert a.getOverlapRatio(b) == pytest.approx(50 / 150)
+
+    # copies share nothing that goes stale
+    c = b.copy()
+    c.points = SQUARE.copy()
+    assert a.getOverlapRatio(c) == pytest.approx(1)
+    assert a.getOverlapRatio(b) == pytest.approx(50 / 150)
+
+
+def test_self_intersecting_trace():
+    bowtie = _trace([(0, 0), (10, 10), (10, 0), (0, 10)])
+    assert 0 < bowtie.getOverlapRatio(_trace(SQUARE)) < 1
+    assert _trace([(0, 0), (1, 1)], closed=False).getOverlapRatio(bowtie) == 0
+
+
+def test_bulk_ratios_match_pairwise():
+    rng = random.Random(5)
+    traces1 = [_blob(rng, rng.uniform(0, 30), rng.uniform(0, 30), 2) for _ in range(30)]
+    traces2 = [_blob(rng, rng.uniform(0, 30), rng.uniform(0, 30), 2) for _ in range(30)]
+
+    i1, i2, ratios = Trace.getOverlapRatios(traces1, traces2)
+    bulk = {(i, j): r for i, j, r in zip(i1, i2, ratios)}
+    pairwise = {
+        (i, j): t1.getOverlapRatio(t2)
+        for i, t1 in enumerate(traces1)
+        for j, t2 in enumerate(traces2)
+        if t1.getOverlapRatio(t2) > 0
+    }
+    assert bulk.keys() == pairwise.keys()
+    for key, r in pairwise.items():
+        assert bulk[key] == pytest.approx(r)
+
+    assert [len(a) for a in Trace.getOverlapRatios([], traces2)] == [0, 0, 0]
@@ -0,0 +1,170 @@
+"""The undo history is kept within a configurable budget.
+
+Each section keeps at most ``undo_section_states`` undo states: the oldest
+states are folded into a single full state when the budget is exceeded, so the
+most recent actions can still be undone exactly. When the memory held by all
+sections exceeds ``undo_series_mb``, the least recently used sections are moved
+to disk and loaded back transparently when they are next needed.
+"""
+
+import os
+
+import pytest
+
+from PyReconstruct.modules.datatypes.trace import Trace
+
+
+def _snapshot(section):
+    """The contour contents of a section, for comparison."""
+    return {
+        name: sorted(tuple(map(tuple, t.points)) for t in contour)
+        for name, contour in section.contours.items()
+        if len(contour)
+    }
+
+
+def _act(section, series, states, i):
+    """Perform (and record) one action: add a trace to one of a few objects."""
+    trace = Trace(f"budget_{i % 3}", (255, 0, 0))
+    trace.points = [(i, 0), (i + 1, 0), (i + 1, 1)]
+    section.addTrace(trace, log_event=False)
+    states[section].addState(section, series)
+    section.clearTracking()
+
+
+@pytest.fixture
+def states_and_section(real_series):
+    from PyReconstruct.modules.backend.func.state_manager import SeriesStates
+
+    series = real_series
+    section = series.loadSection(series.current_section)
+    states = SeriesStates(series)
+    states[section]
+    return series, section, states
+
+
+def test_section_history_is_trimmed_but_recent_undos_are_exact(states_and_section):
+    series, section, states = states_and_section
+    series.setOption("undo_section_states", 10)
+
+    snapshots = [_snapshot(section)]
+    for i in range(30):
+        _act(section, series, states, i)
+        snapshots.append(_snapshot(section))
+
+    section_states = states[section]
+    n_undos = section_states.n_undos
+    assert 0 < n_undos <= 10
+    assert section_states.depth == 30
+
+    for expected in reversed(snapshots[-n_undos - 1:-1]):
+        section_states.undoState(section, series)
+        assert _snapshot(section) == expected
+
+    # the folded-away history cannot be undone
+    section_states.undoState(section, series)
+    assert _snapshot(section) == snapshots[30 - n_undos]
+
+
+def test_redo_after_trimming(states_and_section):
+    series, section, states = states_and_section
+    series.setOption("undo_section_states", 5)
+
+    for i in range(12):
+        _act(section, series, states, i)
+    final = _snapshot(section)
+
+    section_states = states[section]
+    n_undos = section_states.n_undos
+    for _ in range(n_undos):
+        section_states.undoState(section, series)
+    for _ in range(n_undos):
+        section_states.redoState(section, series)
+    assert _snapshot(section) == final
+    assert section_states.n_undos == n_undos
+
+
+def test_series_undo_is_refused_once_its_state_is_folded_away(states_and_section):
+    series, section, states = states_and_section
+    series.setOption("undo_section_states", 5)
+
+    states.addState()
+    _act(section, series, states, 0)
+    states.addSectionUndo(section.n)
+    assert states.canUndo(section.n)[0]
+
+    for i in range(1, 3):
+        _act(section, series, states, i)
+    # fold the series undo's section state into the oldest state
+    states[section].trim(2)
+    for _ in range(states[section].n_undos):
+        states[section].undoState(section, series)
+
+    # the section is back at the depth recorded by the series undo, but the
+    # state before it no longer exists
+    assert states[section].depth == 1
+    assert not states.canUndo(section.n)[0]
+
+
+def test_cold_sections_are_spilled_to_disk(states_and_section):
+    series, section, states = states_and_section
+    series.setOption("undo_series_mb", 1e-6)
+
+    other = series.loadSection(min(n for n in series.sections if n != section.n))
+    for i in range(3):
+        _act(other, series, states, i)
+    other_snapshots = _snapshot(other)
+
+    _act(section, series, states, 0)
+
+    other_states = states[other.n]
+    assert other_states.spill_fp and os.path.isfile(other_states.spill_fp)
+    assert other_states.nbytes == 0
+    assert not states[section.n].spill_fp
+
+    # spilled states are loaded back when used
+    spill_fp = other_states.spill_fp
+    assert other_states.n_undos == 3
+    other_states.undoState(other, series)
+    assert not os.path.isfile(spill_fp)
+    other_states.redoState(other, series)
+    assert _snapshot(other) == other_snapshots
+
+
+def test_spilled_sections_stay_on_disk_when_trimmed(states_and_section):
+    series, section, states = states_and_section
+    series.setOption("undo_series_mb", 1e-6)
+
+    other = series.loadSection(min(n for n in series.sections if n != section.n))
+    for i in range(6):
+        _act(other, series, states, i)
+    snapshots = [_snapshot(other)]
+    _act(section, series, states, 0)
+    other_states = states[other.n]
+    spill_fp = other_states.spill_fp
+    assert spill_fp
+
+    # the state budget folds the spilled section without loading it back
+    series.setOption("undo_series_mb", 100)
+    series.setOption("undo_series_states", 4)
+    for i in range(1, 3):
+        _act(section, series, states, i)
+    assert other_states.n_undos < 6
+    assert other_states.spill_fp == spill_fp and os.path.isfile(spill_fp)
+    assert other_states.nbytes == 0
+
+    other_states.undoState(other, series)
+    other_states.redoState(other, series)
+    assert _snapshot(other) == snapshots[0]
+
+
+def test_cached_geometry_is_not_stored():
+    from PyReconstruct.modules.backend.func.state_manager import encodeState
+
+    trace = Trace("a", (255, 0, 0))
+    trace.points = [(0, 0), (1, 0), (1, 1)]
+    size = len(encodeState(trace))
+    trace.getGeometry()
+    assert "_geometry" in trace.__dict__
+    assert len(encodeState(trace)) == size
+    assert "_geometry" not in trace.copy().__getstate__()
@@ -0,0 +1,133 @@
+"""Traces are merged as exact polygons in field coordinates.
+
+With the vector_merge option (the default) FieldWidget.mergeTraces takes the
+shapely union of the traces instead of drawing their screen pixels on a grid,
+so the merged outline does not depend on the zoom. The raster merge is kept
+for vector_merge = False.
+"""
+
+import types
+
+import pytest
+from shapely.geometry import Polygon
+
+from PyReconstruct.modules.calc import mergeTraces
+from PyReconstruct.modules.datatypes.section import Section
+from PyReconstruct.modules.datatypes.trace import Trace
+from PyReconstruct.modules.datatypes.transform import Transform
+from PyReconstruct.modules.gui.main.field_widget_2_trace import FieldWidgetTrace
+
+
+def _square(x, y, size):
+    return [(x, y), (x + size, y), (x + size, y + size), (x, y + size)]
+
+
+def test_union_of_overlapping_squares():
+    merged = mergeTraces([_square(0, 0, 1), _square(0.5, 0.5, 1)], vector=True)
+    assert len(merged) == 1
+    assert Polygon(merged[0]).area == pytest.approx(1.75)
+
+
+def test_disjoint_traces_stay_separate():
+    merged = mergeTraces([_square(0, 0, 1), _square(2, 0, 1)], vector=True)
+    assert sorted(Polygon(t).area for t in merged) == pytest.approx([1, 1])
+
+
+def test_holes_are_dropped():
+    # a ring of four bars around an empty center
+    bars = [
+        [(0, 0), (3, 0), (3, 1), (0, 1)],
+        [(0, 2), (3, 2), (3, 3), (0, 3)],
+        [(0, 0), (1, 0), (1, 3), (0, 3)],
+        [(2, 0), (3, 0), (3, 3), (2, 3)],
+    ]
+    merged = mergeTraces(bars, vector=True)
+    assert len(merged) == 1
+    assert Polygon(merged[0]).area == pytest.approx(9)
+
+
+def test_self_intersecting_trace_is_repaired():
+    # two triangles of area 1 (left and right), the square sticks out of the left one by 1/8
+    bowtie = [(0, 0), (2, 2), (2, 0), (0, 2)]
+    merged = mergeTraces([bowtie, _square(0, 0, 0.5)], vector=True)
+    assert sum(Polygon(t).area for t in merged) == pytest.approx(2.125)
+
+
+@pytest.fixture
+def field(qapp):
+    series = types.SimpleNamespace(
+        alignment="default",
+        window=[0, 0, 10, 10],
+        options={"vector_merge": True},
+    )
+    series.getOption = lambda name, *args: series.options.get(name, False)
+    series.getAttr = lambda *args: False
+    series.addLog = lambda *args: None
+
+    section = Section.__new__(Section)
+    section.n = 0
+    section.series = series
+    section.contours = {}
+    section.selected_traces = []
+    section.selected_ztraces = []
+    section.selected_flags = []
+    section.added_traces = []
+    section.removed_traces = []
+    section.modified_contours = set()
+    section.tforms = {"default": Transform([1, 0, 0.5, 0, 1, 0])}
+    section.mag = 1.0
+
+    f = types.SimpleNamespace(
+        series=series, section=section, hide_trace_layer=False,
+        pixmap_dim=(100, 100), series_states=None,
+    )
+    f.table_manager = types.SimpleNamespace(
+        activeTable=lambda cls: None, updateAll=lambda *a, **k: None
+    )
+    f.mainwindow = types.SimpleNamespace(saveAllData=lambda: None)
+    for name in ("saveState", "generateView", "update", "updateData", "endPendingEvents"):
+        setattr(f, name, lambda *a, **k: None)
+
+    tform = section.tforms["default"]
+    def traceToPix(trace):
+        return [
+            (round(x * 10), round(100 - y * 10))
+            for x, y in tform.map(trace.points)
+        ]
+    f.section_layer = types.SimpleNamespace(traceToPix=traceToPix)
+    f.newTrace = types.MethodType(FieldWidgetTrace.newTrace, f)
+    f.mergeTraces = types.MethodType(FieldWidgetTrace.mergeTraces, f)
+    return f
+
+
+def _add(section, points, tags=()):
+    trace = Trace("obj", (255, 0, 0))
+    trace.points = points
+    trace.tags = set(tags)
+    section.addTrace(trace, log_event=False)
+    return trace
+
+
+@pytest.mark.parametrize("vector", [True, False])
+def test_field_merge(field, vector):
+    field.series.options["vector_merge"] = vector
+    traces = [
+        _add(field.section, _square(1, 1, 2.03), tags={"a"}),
+        _add(field.section, _square(2, 2, 2.03)),
+    ]
+
+    field.section.selected_traces = traces.copy()
+    field.mergeTraces()
+    merged = field.section.contours["obj"].getTraces()
+    assert len(merged) == 1
+    assert merged[0].tags == {"a"}
+
+    area = Polygon(merged[0].points).area
+    exact = 2 * 2.03 ** 2 - 1.03 ** 2
+    if vector:
+        # exact, in the untransformed trace coordinates
+        assert area == pytest.approx(exact)
+        assert min(x for x, y in merged[0].points) == pytest.approx(1)
+    else:
+        # within the pixel size of the view
+        assert area == pytest.approx(exact, abs=0.5)
@@ -38,11 +38,12 @@ files, is not exercised).
 import math
 import types
 
+import numpy as np
 import pytest
 
 from PyReconstruct.modules.datatypes.ztrace import Ztrace
 from PyReconstruct.modules.datatypes.transform import Transform
-from PyReconstruct.modules.datatypes.log import Log, LogSet, LogSetPair
+from PyReconstruct.modules.datatypes.log import Log, LogSet, LogSetPair, LogCSV
 
 
 # --------------------------------------------------------------------------- #
@@ -66,6 +67,18 @@ def _make_series(tform_list, zvals, align="align", ztrace_align="align"):
     stub = types.SimpleNamespace(data={"sections": sections}, alignment=align)
     stub.getZValues = lambda: dict(zvals)
     stub.getAttr = lambda name, key, ztrace=False: ztrace_align
+
+    # the section tables (indexed by section number) built from the same values
+    size = max(zvals) + 1
+    zarr = np.full(size, np.nan)
+    tforms = np.full((size, 6), np.nan)
+    for s, z in zvals.items():
+        zarr[s] = z
+        tforms[s] = tform.getList()
+    stub.getZArray = lambda: zarr
+    stub.getTformArray = lambda alignment=None: (
+        tforms if (alignment or align) == align else np.full((size, 6), np.nan)
+    )
     return stub
 
 
@@ -557,6 +570,87 @@ def test_logset_get_last_index_none_range_matches_any_section():
     assert ls.getLastIndex(123, "A") == 0
 
 
+def test_logset_get_last_index_min_index():
+    ls = LogSet()
+    ls.addExistingLog(Log("26-06-29", "1200", "u", "A", 1, "modified"))   # 0
+    ls.addExistingLog(Log("26-06-29", "1201", "u", "B", 1, "modified"))   # 1
+
+    assert ls.getLastIndex(1, "A", min_index=0) == 0
+    # logs before min_index are not considered
+    assert ls.getLastIndex(1, "A", min_index=1) == -1
+
+
+def test_logset_index_follows_dynamic_and_removed_logs():
+    ls = LogSet()
+    ls.addLog("u", "A", 1, "modified")   # dynamic log, extended below
+    ls.addLog("u", "B", 1, "modified")
+    ls.addLog("u", "A", None, "manually curated")
+    ls.addLog("u", "A", 4, "modified")   # extends the first log to 1, 4
+
+    # the curation log has no section, so it matches any section
+    assert ls.getLastIndex(4, "A") == 2
+    assert ls.getObjectIndices("A", snum=4) == [0, 2]
+    assert ls.getObjectIndices("A", snum=2) == [2]
+
+    ls.removeCuration("A")
+    assert ls.getObjectIndices("A") == [0]
+    assert ls.getLastIndex(4, "A") == 0
+    assert ls.getLastIndex(1, "B") == 1
+
+    ls.addLog("u", "A", None, "Delete object")
+    assert ls.getObjectIndices("A") == [1]
+    assert ls.getObjectIndices("B") == [0]
+
+    ls.addExistingLog(Log("26-06-29", "1200", "u", "B", 3, "modified"))
+    assert ls.getLastIndex(3, "B") == 2
+
+
+# --------------------------------------------------------------------------- #
+# LogCSV
+# --------------------------------------------------------------------------- #
+
+_CSV_ROWS = [
+    "Date, Time, User, Obj, Sections, Event\n",
+    "26-06-29, 1200, u, A, 1-3 7, event, with comma\n",
+    "\n",
+    "26-06-29, 1201, u, -, -, static\n",
+    "26-06-29, 1202, u, bro\n",  # corrupt: return key in the name
+    "ken, 4, modified\n",
+]
+
+
+def test_logcsv_matches_fromlist(tmp_path):
+    csv_fp = tmp_path / "existing_log.csv"
+    csv_fp.write_text("".join(_CSV_ROWS))
+
+    ls = LogCSV(str(csv_fp)).getLogSet()
+
+    assert ls.getList() == LogSet.fromList(_CSV_ROWS[1:]).getList()
+    assert len(ls.all_logs) == 3
+
+
+def test_logcsv_reuses_sidecar_until_csv_changes(tmp_path, monkeypatch):
+    csv_fp = tmp_path / "existing_log.csv"
+    csv_fp.write_text("".join(_CSV_ROWS[:2]))
+    LogCSV(str(csv_fp)).getRows()
+    assert (tmp_path / "existing_log.csv.idx").is_file()
+
+    # a new reader loads the parsed rows from the sidecar
+    parse = LogCSV.parse
+    monkeypatch.setattr(LogCSV, "parse", lambda fp: pytest.fail("CSV re-parsed"))
+    reader = LogCSV(str(csv_fp))
+    assert len(reader.getLogSet().all_logs) == 1
+
+    # the logs handed out are independent of the cached rows
+    reader.getLogSet().all_logs[0].addSection(9)
+    assert reader.getLogSet().all_logs[0].section_ranges == [(1, 3), (7, 7)]
+
+    # changing the CSV rebuilds the rows
+    monkeypatch.setattr(LogCSV, "parse", parse)
+    csv_fp.write_text("".join(_CSV_ROWS))
+    assert len(reader.getLogSet().all_logs) == 3
+
+
 # --------------------------------------------------------------------------- #
 # LogSetPair
 # --------------------------------------------------------------------------- #
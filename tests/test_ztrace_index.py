@@ -0,0 +1,106 @@
+"""The ztrace index keeps the ztrace points and segments by section.
+
+Series.ztrace_index must give the points and lines Ztrace.getSectionData
+computes, and must follow edits to the ztrace points (which bump
+Ztrace.version), the section transforms and the series alignment. An entry
+that is up to date is returned without comparing the points.
+"""
+
+import random
+
+import pytest
+
+from PyReconstruct.modules.datatypes.transform import Transform
+from PyReconstruct.modules.datatypes.ztrace import Ztrace
+
+
+def _ztraces(series, rng, n=20):
+    snums = sorted(series.sections)
+    ztraces = []
+    for k in range(n):
+        points = [
+            (rng.uniform(-5, 5), rng.uniform(-5, 5), rng.choice(snums))
+            for _ in range(rng.randint(1, 8))
+        ]
+        ztrace = Ztrace(f"z{k}", (255, 0, 0), points)
+        series.ztraces[ztrace.name] = ztrace
+        ztraces.append(ztrace)
+    return ztraces
+
+
+def _assertSame(series, ztrace, section):
+    pts, lines = series.ztrace_index.getSectionData(ztrace, section)
+    exp_pts, exp_lines = ztrace.getSectionData(series, section)
+    assert pts == pytest.approx(exp_pts)
+    assert len(lines) == len(exp_lines)
+    for l, exp_l in zip(lines, exp_lines):
+        assert l[0] == pytest.approx(exp_l[0])
+        assert l[1] == pytest.approx(exp_l[1])
+
+
+def test_matches_section_data(real_series):
+    ztraces = _ztraces(real_series, random.Random(3))
+    for snum in real_series.sections:
+        section = real_series.loadSection(snum)
+        for ztrace in ztraces:
+            _assertSame(real_series, ztrace, section)
+
+
+def test_follows_edits(real_series):
+    ztraces = _ztraces(real_series, random.Random(4))
+    section = real_series.loadSection(2)
+    for ztrace in ztraces:
+        real_series.ztrace_index.getEntry(ztrace)
+
+    # point edits
+    ztraces[0].setPoint(0, (1.0, 2.0, 2))
+    ztraces[1].points = ztraces[1].points + [(3.0, 3.0, 4)]
+    ztraces[2].magScale(ztraces[2].points[0][2], 1, 2)
+    # unsaved transform on the current section
+    section.tform = Transform([1, 0.1, 2, 0, 1, -1])
+    for ztrace in ztraces:
+        _assertSame(real_series, ztrace, section)
+
+    # saved transform on another section
+    other = real_series.loadSection(3)
+    other.tform = Transform([0.9, 0, 1, 0, 1.1, 0])
+    other.save()
+    for ztrace in ztraces:
+        _assertSame(real_series, ztrace, section)
+
+    # another alignment
+    real_series.alignment = "no-alignment"
+    for ztrace in ztraces:
+        _assertSame(real_series, ztrace, real_series.loadSection(2))
+
+
+def test_find_closest_ztrace_point(real_series):
+    real_series.setOption("show_ztraces", True)
+    ztrace = Ztrace("zclose", (0, 0, 0), [(1, 1, 0), (40, 40, 1), (50, 50, 2)])
+    real_series.ztraces[ztrace.name] = ztrace
+
+    section = real_series.loadSection(1)
+    x, y = section.tform.map(40, 40)
+    closest, closest_type = section.findClosest(x, y, radius=1)
+    assert closest_type == "ztrace_pt"
+    assert closest == (ztrace, 1)
+
+    # the point is moved to another section
+    ztrace.setPoint(1, (40, 40, 2))
+    closest, closest_type = section.findClosest(x, y, radius=1)
+    assert closest_type != "ztrace_pt"
+
+
+def test_entries_are_reused_without_comparing_points(real_series):
+    ztrace = _ztraces(real_series, random.Random(5), n=1)[0]
+    entry = real_series.ztrace_index.getEntry(ztrace)
+
+    class Points(list):
+        def __eq__(self, other):
+            raise AssertionError("points compared")
+    ztrace._points = Points(ztrace.points)
+    assert real_series.ztrace_index.getEntry(ztrace) is entry
+
+    # a restored copy (e.g. from an undo state) gets its own entry
+    restored = ztrace.copy()
+    assert real_series.ztrace_index.getEntry(restored) is not entry
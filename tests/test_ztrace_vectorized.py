@@ -0,0 +1,100 @@
+"""Ztraces are smoothed and measured with array operations.
+
+Ztrace.smoothZtraces and Ztrace.getDistances transform the points of many
+ztraces at once (one transform lookup per alignment and section) and must give
+the results of transforming and averaging the points one at a time.
+"""
+
+import random
+
+import pytest
+
+from PyReconstruct.modules.calc import distance3D, rolling_average
+from PyReconstruct.modules.calc.quantification import get_window_points
+from PyReconstruct.modules.datatypes.ztrace import Ztrace
+
+
+def _ztraces(series, rng, n=15):
+    snums = sorted(series.sections)
+    ztraces = []
+    for k in range(n):
+        points = [
+            (rng.uniform(-5, 5), rng.uniform(-5, 5), rng.choice(snums))
+            for _ in range(rng.choice([0, 1, 2, 5, 12, 30]))
+        ]
+        ztraces.append(Ztrace(f"z{k}", (0, 0, 0), points))
+    return ztraces
+
+
+def _tform(series, ztrace, snum):
+    alignment = series.getAttr(ztrace.name, "alignment", ztrace=True) or series.alignment
+    return series.data["sections"][snum]["tforms"][alignment]
+
+
+def _serialDistance(series, ztrace):
+    zvals = series.getZValues()
+    pts = [(*_tform(series, ztrace, s).map(x, y), zvals[s]) for x, y, s in ztrace.points]
+    return sum(distance3D(*pts[i], *pts[i+1]) for i in range(len(pts) - 1))
+
+
+def _serialSmooth(series, ztrace, smooth):
+    pts = [_tform(series, ztrace, s).map(x, y) for x, y, s in ztrace.points]
+    pts = rolling_average(pts, smooth, edge_mode="padded")
+    return [
+        (*_tform(series, ztrace, s).map(x, y, inverted=True), s)
+        for (x, y), (_, _, s) in zip(pts, ztrace.points)
+    ]
+
+
+@pytest.mark.parametrize("mode", ["padded", "shrinking", "circular"])
+def test_rolling_average_matches_windows(mode):
+    rng = random.Random(1)
+    for _ in range(200):
+        pts = [(rng.uniform(-100, 100), rng.uniform(-100, 100)) for _ in range(rng.randint(1, 30))]
+        window = rng.randint(0, 20)
+        expected = []
+        for i in range(len(pts)):
+            wx, wy = get_window_points(pts, i, window, mode)
+            expected.append((round(sum(wx) / len(wx), 4), round(sum(wy) / len(wy), 4)))
+        averages = rolling_average(pts, window, mode)
+        assert len(averages) == len(expected)
+        for p, exp_p in zip(averages, expected):
+            assert p == pytest.approx(exp_p, abs=1.01e-4)
+    assert rolling_average([], 10, mode) == []
+
+
+def test_distances_match_serial(real_series):
+    ztraces = _ztraces(real_series, random.Random(2))
+    real_series.setAttr("z3", "alignment", "no-alignment", ztrace=True)
+    expected = [_serialDistance(real_series, z) for z in ztraces]
+    assert Ztrace.getDistances(real_series, ztraces) == pytest.approx(expected)
+    assert ztraces[5].getDistance(real_series) == pytest.approx(expected[5])
+    assert Ztrace.getDistances(real_series, []) == []
+
+
+@pytest.mark.parametrize("smooth", [1, 4, 10])
+def test_smoothing_matches_serial(real_series, smooth):
+    ztraces = _ztraces(real_series, random.Random(smooth))
+    real_series.setAttr("z3", "alignment", "no-alignment", ztrace=True)
+    expected = [_serialSmooth(real_series, z, smooth) for z in ztraces]
+
+    Ztrace.smoothZtraces(real_series, ztraces, smooth)
+    for ztrace, exp in zip(ztraces, expected):
+        assert len(ztrace.points) == len(exp)
+        for pt, exp_pt in zip(ztrace.points, exp):
+            assert pt[:2] == pytest.approx(exp_pt[:2], abs=1e-6)
+            assert pt[2] == exp_pt[2] and type(pt[2]) is int
+
+
+def test_series_smooth_ztraces(real_series):
+    ztraces = _ztraces(real_series, random.Random(9), n=3)
+    for ztrace in ztraces:
+        real_series.ztraces[ztrace.name] = ztrace
+    expected = _serialSmooth(real_series, ztraces[1], 5)
+
+    real_series.smoothZtraces(["z1"], 5, newztrace=True, log_event=False)
+    assert real_series.ztraces["z1"] is ztraces[1]
+    smoothed = real_series.ztraces["z1_smooth5"].points
+    assert len(smoothed) == len(expected)
+    for pt, exp_pt in zip(smoothed, expected):
+        assert pt[:2] == pytest.approx(exp_pt[:2], abs=1e-6)